@@ -0,0 +1,74 @@
+"""Process-wide pool of Bedrock Runtime clients shared by the Bedrock adapters."""
+
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Tuple
+
+import config
+from app.cassettes import CassetteBedrockClient
+from app.prompt_cache import PromptCachingBedrockClient
+from app.rate_limit import RateLimitedBedrockClient
+
+logger = logging.getLogger(__name__)
+
+_clients: Dict[Tuple[str | None, str | None], PromptCachingBedrockClient] = {}
+_lock = threading.Lock()  # Adapters may ask for clients from worker threads
+
+
+def max_pool_connections() -> int:
+    """Connections each client keeps: one per evaluation (and hedged duplicate) in flight."""
+    if config.BEDROCK_MAX_POOL_CONNECTIONS:
+        return config.BEDROCK_MAX_POOL_CONNECTIONS
+    attempts = config.HEDGING_MAX_ATTEMPTS if config.HEDGING_ENABLED else 1
+    return max(10, config.MAX_CONCURRENCY * attempts)  # botocore's default is 10
+
+
+def get_bedrock_client(region: str | None = None, profile: str | None = None) -> PromptCachingBedrockClient:
+    """Return the shared ``bedrock-runtime`` client for a region and profile, creating it on first use.
+
+    Clients are rate limited, recorded to or replayed from cassettes, and
+    add prompt cache points for models that support them. botocore's own
+    retries are disabled so throttling is retried (and timed) only by the
+    rate limiter. ``None`` means the default region or profile of the
+    environment.
+    """
+    profile = profile or os.environ.get("AWS_PROFILE")
+    key = (region, profile)
+    with _lock:
+        if key not in _clients:
+            import boto3  # Deferred so runs that schedule no Bedrock models never load it
+            from botocore.config import Config
+
+            start = time.perf_counter()
+            session = boto3.session.Session(profile_name=profile, region_name=region)
+            client = session.client(
+                "bedrock-runtime",
+                config=Config(
+                    retries={"total_max_attempts": 1, "mode": "standard"},
+                    read_timeout=300,
+                    connect_timeout=60,
+                    max_pool_connections=max_pool_connections(),
+                ),
+            )
+            _clients[key] = PromptCachingBedrockClient(CassetteBedrockClient(RateLimitedBedrockClient(client)))
+            logger.info(
+                f"☁️  Created Bedrock client for {client.meta.region_name} "
+                f"({max_pool_connections()} connections) in {(time.perf_counter() - start) * 1000:.0f} ms"
+            )
+        return _clients[key]
+
+
+class PooledBotoSession:
+    """Stands in for a boto3 Session in SDKs that build their own client (e.g. strands' BedrockModel).
+
+    ``client()`` hands out the pooled client instead of constructing one.
+    """
+
+    def __init__(self, region: str | None = None, profile: str | None = None):
+        self._client = get_bedrock_client(region, profile)
+        self.region_name = self._client.meta.region_name
+
+    def client(self, *args: Any, **kwargs: Any) -> PromptCachingBedrockClient:
+        return self._client
@@ -0,0 +1,304 @@
+"""Disk cache of model calls: compressed JSON storage, bounded size, namespaces, single-flight.
+
+``config.CACHE_MODE`` (or ``run_evaluation.py --cache-mode``) selects how
+cached functions behave:
+
+- ``off``: always call the endpoint, never read or write the cache
+- ``record``: always call the endpoint and store (overwrite) the response
+- ``replay``: only serve stored responses; a miss raises CacheMissError
+- ``read-through``: serve stored responses, calling the endpoint on a miss
+
+Keys include the run number and sampling seed of the current evaluation run,
+so repeated runs of a cell are cached separately instead of replaying run 1,
+and the attempt number of hedged duplicates, so a hedge makes its own request
+instead of waiting on the slow call it is meant to race.
+
+Usage from the command line::
+
+    python -m app.cache stats [--top N]
+    python -m app.cache clear [--namespace NAMESPACE]
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from functools import lru_cache, wraps
+from typing import Any, Callable, Dict, Iterator, List
+
+import diskcache
+
+import config
+from app.utils import current_run
+
+CACHE_MODES = ("off", "record", "replay", "read-through")
+
+
+class CacheMissError(Exception):
+    """A call had no stored response in replay mode."""
+
+
+@lru_cache(maxsize=None)
+def get_cache() -> diskcache.Cache:
+    """Open the cache configured in config.py, once per process.
+
+    Values are stored as zlib-compressed JSON rather than pickles, and each
+    entry is tagged with its namespace so namespaces can be evicted on their
+    own.
+    """
+    return diskcache.Cache(
+        config.CACHE_DIR,
+        disk=diskcache.JSONDisk,
+        disk_compress_level=config.CACHE_COMPRESS_LEVEL,
+        size_limit=config.CACHE_SIZE_LIMIT,
+        eviction_policy=config.CACHE_EVICTION_POLICY,
+        tag_index=True,
+        statistics=True,  # Persistent hit/miss counters, shared by all processes
+    )
+
+
+@dataclass
+class CacheStats:
+    """Outcome counts of cached calls."""
+    hits: int = 0  # Served from the disk cache
+    misses: int = 0  # Went to the endpoint
+    coalesced: int = 0  # Waited on an identical in-flight call instead of making their own
+
+    def add(self, other: "CacheStats") -> None:
+        self.hits += other.hits
+        self.misses += other.misses
+        self.coalesced += other.coalesced
+
+
+# Totals for this process, plus the counts of the evaluation attempt being run
+process_cache_stats = CacheStats()
+_current_cache_stats: ContextVar[CacheStats | None] = ContextVar("cache_stats", default=None)
+
+
+@contextmanager
+def track_cache_stats() -> Iterator[CacheStats]:
+    """Count cache outcomes of the cached calls made inside the block."""
+    stats = CacheStats()
+    token = _current_cache_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_cache_stats.reset(token)
+
+
+def _count_cache(outcome: str) -> None:
+    for stats in (process_cache_stats, _current_cache_stats.get()):
+        if stats is not None:
+            setattr(stats, outcome, getattr(stats, outcome) + 1)
+
+
+def _make_cache_key_generic(func, args, kwargs):
+    # Canonicalize all args/kwargs to a stable JSON string, then hash
+    run = current_run()
+    key_data = {
+        "func_module": func.__module__,
+        "func_name": func.__name__,
+        "args": args,
+        "kwargs": kwargs,
+        # Each run of a cell gets its own responses
+        "run_number": run.run_number if run else None,
+        "seed": run.seed if run else None,
+    }
+    if run and run.attempt > 1:
+        # Only hedges carry it, so first attempts keep the keys of existing entries
+        key_data["attempt"] = run.attempt
+    key_str = json.dumps(key_data, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(key_str.encode()).hexdigest()
+
+
+# Calls currently being made, by cache key, with the number of callers waiting on each
+_inflight: Dict[str, asyncio.Task] = {}
+_inflight_waiters: Dict[asyncio.Task, int] = {}
+
+# Cross-process lock entries live in the cache itself; expiry frees locks of crashed workers
+_LOCK_PREFIX = "lock:"
+_LOCK_EXPIRE = 600
+_LOCK_POLL_INTERVAL = 0.05
+_MISSING = object()
+
+
+def _forget_inflight(key: str, task: asyncio.Task) -> None:
+    if _inflight.get(key) is task:
+        del _inflight[key]
+
+
+def cache_mode() -> str:
+    mode = config.CACHE_MODE
+    if mode not in CACHE_MODES:
+        raise ValueError(f"Unknown CACHE_MODE {mode!r}, expected one of {', '.join(CACHE_MODES)}")
+    return mode
+
+
+async def _fill_cache(key: str, namespace: str, func, args, kwargs, reuse: bool = True):
+    """Make the real call under a cache-directory lock, unless another process fills the entry first.
+
+    With ``reuse`` False (record mode) the call is always made, but still only
+    once across processes at a time.
+    """
+    cache = get_cache()
+    lock_key = _LOCK_PREFIX + key
+    while not cache.add(lock_key, os.getpid(), expire=_LOCK_EXPIRE):
+        await asyncio.sleep(_LOCK_POLL_INTERVAL)
+        if reuse and key in cache:
+            _count_cache("coalesced")
+            return cache[key]
+    try:
+        if reuse and key in cache:
+            _count_cache("coalesced")
+            return cache[key]
+        _count_cache("misses")
+        result = await func(*args, **kwargs)
+        cache.set(key, result, expire=config.CACHE_TTL, tag=namespace)
+        return result
+    finally:
+        cache.delete(lock_key)
+
+
+def disk_cache_async(func: Callable | None = None, *, namespace: Callable[..., str] | None = None):
+    """Generic async disk cache decorator for any function signature.
+
+    ``namespace`` maps the call's arguments to the namespace its entry is
+    tagged with (e.g. endpoint and model), so a namespace can be cleared
+    without touching the rest of the cache; by default the function's
+    qualified name is used.
+
+    Calls are single-flight: concurrent callers with the same key share one
+    in-flight call, and processes sharing the cache directory take turns
+    through a lock entry, so N identical concurrent requests reach the
+    endpoint once. The shared call is cancelled only when every caller
+    waiting on it has been cancelled.
+
+    The cache mode is read on every call; see the module docstring.
+    """
+    if func is None:
+        return lambda f: disk_cache_async(f, namespace=namespace)
+
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        mode = cache_mode()
+        if mode == "off":
+            return await func(*args, **kwargs)
+
+        key = _make_cache_key_generic(func, args, kwargs)
+        if mode != "record":
+            cached = get_cache().get(key, default=_MISSING)
+            if cached is not _MISSING:
+                _count_cache("hits")
+                return cached
+            if mode == "replay":
+                raise CacheMissError(f"No cached response for {func.__qualname__} (replay mode, key {key[:12]})")
+
+        task = _inflight.get(key)
+        if task is None:
+            tag = namespace(*args, **kwargs) if namespace else f"{func.__module__}.{func.__qualname__}"
+            task = asyncio.ensure_future(
+                _fill_cache(key, tag, func, args, kwargs, reuse=mode != "record")
+            )
+            _inflight[key] = task
+            _inflight_waiters[task] = 0
+            task.add_done_callback(lambda done: _forget_inflight(key, done))
+        else:
+            _count_cache("coalesced")
+
+        _inflight_waiters[task] += 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if _inflight_waiters[task] == 1:
+                # Last caller gone: stop the call, and let new callers start a fresh one
+                task.cancel()
+                _forget_inflight(key, task)
+            raise
+        finally:
+            _inflight_waiters[task] -= 1
+            if not _inflight_waiters[task]:
+                del _inflight_waiters[task]
+    return wrapper
+
+
+def _entry_sizes(cache: diskcache.Cache) -> List[tuple]:
+    """(key, namespace, bytes) of every entry; small values live in SQLite, large ones in files."""
+    rows = cache._sql(
+        "SELECT key, raw, tag, CASE WHEN filename IS NULL THEN length(value) ELSE size END FROM Cache"
+    ).fetchall()
+    entries = []
+    for db_key, raw, tag, size in rows:
+        key = cache.disk.get(db_key, raw)  # Keys are stored compressed, like values
+        if not str(key).startswith(_LOCK_PREFIX):
+            entries.append((key, tag, size or 0))
+    return entries
+
+
+def cache_report(top: int = 10) -> Dict[str, Any]:
+    """Entry counts, bytes, hit ratio and largest entries of the cache."""
+    cache = get_cache()
+    entries = _entry_sizes(cache)
+    hits, misses = cache.stats()
+    namespaces: Dict[str, Dict[str, int]] = {}
+    for _, tag, size in entries:
+        ns = namespaces.setdefault(tag or "(none)", {"entries": 0, "bytes": 0})
+        ns["entries"] += 1
+        ns["bytes"] += size
+    return {
+        "directory": cache.directory,
+        "entries": len(entries),
+        "bytes": sum(size for _, _, size in entries),
+        "volume": cache.volume(),
+        "size_limit": cache.size_limit,
+        "eviction_policy": cache.eviction_policy,
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": hits / (hits + misses) if hits + misses else None,
+        "namespaces": namespaces,
+        "largest": sorted(entries, key=lambda entry: entry[2], reverse=True)[:top],
+    }
+
+
+def clear_cache(namespace: str | None = None) -> int:
+    """Remove every entry, or only those of one namespace; return the number removed."""
+    cache = get_cache()
+    if namespace is None:
+        return cache.clear()
+    return cache.evict(namespace)
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.cache", description="Inspect or clear the model call cache.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    stats_parser = commands.add_parser("stats", help="Show entry counts, bytes, hit ratio and largest entries")
+    stats_parser.add_argument("--top", type=int, default=10, help="Number of largest entries to list")
+    clear_parser = commands.add_parser("clear", help="Remove cached entries")
+    clear_parser.add_argument("--namespace", help="Only remove entries of this namespace")
+    args = parser.parse_args(argv)
+
+    if args.command == "clear":
+        removed = clear_cache(args.namespace)
+        print(f"Removed {removed} entries")
+        return
+
+    report = cache_report(args.top)
+    ratio = f"{report['hit_ratio']:.1%}" if report["hit_ratio"] is not None else "n/a"
+    print(f"Cache: {report['directory']}")
+    print(f"  Entries: {report['entries']} ({report['bytes'] / 1024:.1f} KiB of values, "
+          f"{report['volume'] / 1024:.1f} KiB on disk, limit {report['size_limit'] / 1024 ** 2:.0f} MiB, "
+          f"{report['eviction_policy']})")
+    print(f"  Hits: {report['hits']}  Misses: {report['misses']}  Hit ratio: {ratio}")
+    print("  Namespaces:")
+    for name, ns in sorted(report["namespaces"].items()):
+        print(f"    {name}: {ns['entries']} entries, {ns['bytes'] / 1024:.1f} KiB")
+    print("  Largest entries:")
+    for key, tag, size in report["largest"]:
+        print(f"    {size / 1024:8.1f} KiB  {tag}  {key}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,332 @@
+"""Record/replay cassettes of all model traffic.
+
+With ``config.CASSETTE_MODE`` (or ``run_evaluation.py --cassettes``) set to
+``record``, every model exchange of an evaluation run is written to a JSON
+cassette: HTTP requests of OpenAI-compatible adapters, captured by
+``CassetteTransport``, and Bedrock Converse calls, captured by
+``CassetteBedrockClient``. In ``replay`` mode the same exchanges are served
+from the cassettes without any network access or AWS credentials, so the
+whole matrix re-runs at CPU speed and measures only framework and runner
+overhead.
+
+Cassettes live at ``CASSETTE_DIR/v<version>/<puzzle>/<framework>/<model>/run_<n>.json``.
+Requests are matched on their method, URL (or Bedrock operation) and
+canonicalized body, in recorded order; AWS account IDs are redacted both in
+the files and for matching.
+"""
+
+import base64
+import json
+import logging
+import os
+import re
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+
+import httpx
+
+import config
+
+logger = logging.getLogger(__name__)
+
+CASSETTE_VERSION = 1
+CASSETTE_MODES = ("off", "record", "replay")
+
+# Account IDs in ARNs, e.g. arn:aws:bedrock:us-west-2:123456789012:inference-profile/...
+_ACCOUNT_ID = re.compile(r"(arn:aws:[a-z0-9-]*:[a-z0-9-]*:)\d{12}(?=:)")
+# Not replayable, or re-derived by httpx from the stored (decoded) body
+_DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+
+class CassetteMissError(Exception):
+    """Replay found no recorded exchange for a request."""
+
+
+def _redact(text: str) -> str:
+    return _ACCOUNT_ID.sub(r"\1{account_id}", text)
+
+
+def _canonical(value: Any) -> Any:
+    """JSON-compatible copy of a request or response with account IDs redacted."""
+    return json.loads(_redact(json.dumps(value, sort_keys=True, default=str)))
+
+
+def _slug(text: str) -> str:
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", _redact(text)).strip("_")
+
+
+def cassette_path(puzzle: str, framework: str, model: str, run_number: int) -> Path:
+    """Where the cassette of one evaluation run is stored."""
+    return (Path(config.CASSETTE_DIR) / f"v{CASSETTE_VERSION}" / puzzle / framework
+            / _slug(model) / f"run_{run_number}.json")
+
+
+class Cassette:
+    """Recorded exchanges of one evaluation run.
+
+    Bedrock calls are made from worker threads, so access is locked.
+    """
+
+    def __init__(self, path: Path, interactions: List[Dict[str, Any]] | None = None):
+        self.path = path
+        self.interactions = interactions or []
+        self._used: set[int] = set()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: Path) -> "Cassette":
+        if not path.exists():
+            raise CassetteMissError(f"No cassette recorded at {path}")
+        data = json.loads(path.read_text(encoding="utf-8"))
+        if data.get("version") != CASSETTE_VERSION:
+            raise CassetteMissError(
+                f"Cassette {path} has version {data.get('version')}, expected {CASSETTE_VERSION}; re-record it"
+            )
+        return cls(path, data["interactions"])
+
+    def save(self) -> None:
+        """Write the cassette atomically, so an interrupted run never leaves a truncated file."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            "version": CASSETTE_VERSION,
+            "recorded_at": datetime.now().isoformat(),
+            "interactions": self.interactions,
+        }
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(data, indent=2, default=str), encoding="utf-8")
+        os.replace(tmp_path, self.path)
+
+    def record(self, interaction: Dict[str, Any]) -> None:
+        with self._lock:
+            self.interactions.append(interaction)
+
+    def play(self, kind: str, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Return the next unused exchange recorded for ``request``.
+
+        Once every matching exchange has been played, the last one is served
+        again, so duplicated requests (e.g. hedged attempts) still replay.
+        """
+        with self._lock:
+            last_match = None
+            for index, interaction in enumerate(self.interactions):
+                if interaction["kind"] != kind or interaction["request"] != request:
+                    continue
+                if index not in self._used:
+                    self._used.add(index)
+                    return interaction
+                last_match = interaction
+        if last_match is not None:
+            return last_match
+        summary = request.get("url") or request.get("operation")
+        raise CassetteMissError(f"No recorded {kind} exchange in {self.path} matches this {summary} request")
+
+
+_current_cassette: ContextVar[Cassette | None] = ContextVar("cassette", default=None)
+
+
+def cassette_mode() -> str:
+    mode = config.CASSETTE_MODE
+    if mode not in CASSETTE_MODES:
+        raise ValueError(f"Unknown CASSETTE_MODE {mode!r}, expected one of {', '.join(CASSETTE_MODES)}")
+    return mode
+
+
+@contextmanager
+def use_cassette(puzzle: str, framework: str, model: str, run_number: int) -> Iterator[Cassette | None]:
+    """Record or replay the model traffic of one evaluation run made inside the block.
+
+    A recorded cassette is saved even when the run fails, so failures can be
+    reproduced offline.
+    """
+    mode = cassette_mode()
+    if mode == "off":
+        yield None
+        return
+
+    path = cassette_path(puzzle, framework, model, run_number)
+    cassette = Cassette.load(path) if mode == "replay" else Cassette(path)
+    token = _current_cassette.set(cassette)
+    try:
+        yield cassette
+    finally:
+        _current_cassette.reset(token)
+        if mode == "record":
+            cassette.save()
+            logger.debug(f"📼 Recorded {len(cassette.interactions)} exchanges to {path}")
+
+
+def _http_request_record(request: httpx.Request, body: bytes) -> Dict[str, Any]:
+    try:
+        content: Any = json.loads(body) if body else None
+    except ValueError:
+        content = body.decode(errors="replace")
+    return _canonical({"method": request.method, "url": str(request.url), "body": content})
+
+
+def _encode_body(body: bytes) -> Dict[str, str]:
+    try:
+        return {"body": body.decode("utf-8")}
+    except UnicodeDecodeError:
+        return {"body_b64": base64.b64encode(body).decode("ascii")}
+
+
+def _decode_body(response: Dict[str, Any]) -> bytes:
+    if "body_b64" in response:
+        return base64.b64decode(response["body_b64"])
+    return response["body"].encode("utf-8")
+
+
+class _RecordingStream(httpx.AsyncByteStream):
+    """Passes the (decoded) response body through, recording it once fully read.
+
+    Streamed responses keep their timing while being recorded.
+    """
+
+    def __init__(self, response: httpx.Response, on_complete):
+        self._response = response
+        self._on_complete = on_complete
+
+    async def __aiter__(self):
+        chunks = []
+        async for chunk in self._response.aiter_bytes():
+            chunks.append(chunk)
+            yield chunk
+        self._on_complete(b"".join(chunks))
+
+    async def aclose(self) -> None:
+        await self._response.aclose()
+
+
+class CassetteTransport(httpx.AsyncBaseTransport):
+    """httpx transport that records exchanges to, or replays them from, the current cassette.
+
+    It wraps the rate-limited transport, so recordings hold the final
+    response after throttling retries and replays never wait on rate limits.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self._transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        cassette = _current_cassette.get()
+        if cassette is None:
+            return await self._transport.handle_async_request(request)
+
+        body = await request.aread()
+        request_record = _http_request_record(request, body)
+        if cassette_mode() == "replay":
+            interaction = cassette.play("http", request_record)
+            if "error" in interaction:
+                error_type = getattr(httpx, interaction["error"]["type"], httpx.TransportError)
+                raise error_type(interaction["error"]["message"], request=request)
+            recorded = interaction["response"]
+            return httpx.Response(
+                recorded["status"],
+                headers=recorded["headers"],
+                content=_decode_body(recorded),
+                request=request,
+            )
+
+        try:
+            response = await self._transport.handle_async_request(request)
+        except httpx.TransportError as e:
+            cassette.record({
+                "kind": "http",
+                "request": request_record,
+                "error": {"type": type(e).__name__, "message": str(e)},
+            })
+            raise
+
+        headers = [(k, v) for k, v in response.headers.multi_items() if k.lower() not in _DROPPED_HEADERS]
+
+        def on_complete(content: bytes) -> None:
+            cassette.record({
+                "kind": "http",
+                "request": request_record,
+                "response": {"status": response.status_code, "headers": headers, **_encode_body(content)},
+            })
+
+        return httpx.Response(
+            response.status_code,
+            headers=headers,
+            stream=_RecordingStream(response, on_complete),
+            extensions=response.extensions,
+            request=request,
+        )
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+class CassetteBedrockClient:
+    """Proxy around a (rate-limited) ``bedrock-runtime`` client that records or replays Converse calls.
+
+    botocore event streams cannot be replayed from raw bytes in practice, so
+    exchanges are captured at the Converse API level: parsed responses,
+    stream events, and service errors.
+    """
+
+    def __init__(self, client: Any):
+        self._client = client
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._client, name)
+
+    def _replay(self, operation: str, request: Dict[str, Any], cassette: Cassette) -> Dict[str, Any]:
+        interaction = cassette.play("bedrock", request)
+        if "error" in interaction:
+            from botocore.exceptions import ClientError
+
+            raise ClientError(interaction["error"], operation)
+        return interaction["response"]
+
+    def _recorded_call(self, operation: str, request: Dict[str, Any], cassette: Cassette, kwargs):
+        try:
+            return getattr(self._client, operation)(**kwargs)
+        except Exception as e:
+            error = getattr(e, "response", None)
+            if isinstance(error, dict):  # botocore ClientError
+                cassette.record({"kind": "bedrock", "request": request, "error": _canonical(error)})
+            raise
+
+    def converse(self, **kwargs) -> Dict[str, Any]:
+        cassette = _current_cassette.get()
+        if cassette is None:
+            return self._client.converse(**kwargs)
+
+        request = _canonical({"operation": "converse", "params": kwargs})
+        if cassette_mode() == "replay":
+            return self._replay("converse", request, cassette)
+        response = self._recorded_call("converse", request, cassette, kwargs)
+        cassette.record({"kind": "bedrock", "request": request, "response": _canonical(response)})
+        return response
+
+    def converse_stream(self, **kwargs) -> Dict[str, Any]:
+        cassette = _current_cassette.get()
+        if cassette is None:
+            return self._client.converse_stream(**kwargs)
+
+        request = _canonical({"operation": "converse_stream", "params": kwargs})
+        if cassette_mode() == "replay":
+            recorded = self._replay("converse_stream", request, cassette)
+            return {**recorded["metadata"], "stream": iter(recorded["events"])}
+        response = self._recorded_call("converse_stream", request, cassette, kwargs)
+        metadata = {k: v for k, v in response.items() if k != "stream"}
+        return {**response, "stream": self._recorded_events(response["stream"], request, metadata, cassette)}
+
+    @staticmethod
+    def _recorded_events(stream, request: Dict[str, Any], metadata: Dict[str, Any], cassette: Cassette):
+        """Pass stream events through, recording them once the stream is exhausted."""
+        events = []
+        for event in stream:
+            events.append(event)
+            yield event
+        cassette.record({
+            "kind": "bedrock",
+            "request": request,
+            "response": _canonical({"metadata": metadata, "events": events}),
+        })
@@ -0,0 +1,172 @@
+"""Context-management policies for long tool-calling loops.
+
+An agent loop that appends every assistant message and tool result to its
+conversation pays for a prompt that grows with each turn. A policy rewrites
+the conversation sent on each turn, while the loop keeps the full transcript:
+
+- ``full``: send everything (the default)
+- ``last_turns:K``: keep the system prompt, the task and the last K turns;
+  older turns are replaced by a note listing the tool calls made in them
+- ``collapse_state``: keep only the latest output of the state-reading tools
+  (e.g. ``get_tower_state``); earlier ones are replaced by a stub
+- ``drop_superseded``: replace the output of a read-only tool once the same
+  tool has been called again with the same arguments
+
+The policy is chosen per evaluation by a model entry's ``"context_policy"``,
+falling back to ``config.CONTEXT_POLICY`` (``run_evaluation.py --context-policy``).
+Rewriting earlier messages changes the prompt prefix, so compaction trades
+provider prefix caching for fewer prompt tokens.
+"""
+
+import json
+from typing import Any, Dict, List, Sequence, Tuple
+
+import config
+
+CONTEXT_POLICIES = ("full", "last_turns", "collapse_state", "drop_superseded")
+
+Message = Dict[str, Any]
+
+
+def _stub(reason: str) -> str:
+    return json.dumps({"omitted": reason})
+
+
+def _split_turns(messages: List[Message]) -> Tuple[List[Message], List[List[Message]]]:
+    """The leading system/user messages, and the turns after them (an assistant message and its tool results)."""
+    start = next((i for i, m in enumerate(messages) if m.get("role") == "assistant"), len(messages))
+    turns: List[List[Message]] = []
+    for message in messages[start:]:
+        if message.get("role") == "assistant" or not turns:
+            turns.append([])
+        turns[-1].append(message)
+    return messages[:start], turns
+
+
+def _tool_calls(messages: List[Message]) -> Dict[str, Tuple[str, str]]:
+    """Tool call ID -> (tool name, canonical arguments) of every tool call."""
+    calls = {}
+    for message in messages:
+        for call in message.get("tool_calls") or []:
+            function = call.get("function") or {}
+            try:
+                arguments = json.dumps(json.loads(function.get("arguments") or "{}"), sort_keys=True)
+            except ValueError:
+                arguments = function.get("arguments") or ""
+            calls[call.get("id")] = (function.get("name", ""), arguments)
+    return calls
+
+
+def _replace_outputs(messages: List[Message], stale: Dict[int, str]) -> List[Message]:
+    """Copy of ``messages`` with the tool results at the given indices replaced by stubs."""
+    return [
+        {**message, "content": _stub(stale[index])} if index in stale else message
+        for index, message in enumerate(messages)
+    ]
+
+
+class ContextPolicy:
+    """Sends the whole conversation; the base of the compacting policies."""
+    name = "full"
+
+    def compact(self, messages: List[Message]) -> List[Message]:
+        """The messages to send for the next turn; ``messages`` itself is not modified."""
+        return messages
+
+
+class KeepLastTurns(ContextPolicy):
+    """Keep the last ``turns`` turns, summarizing the tool calls of the older ones in the task message."""
+
+    def __init__(self, turns: int):
+        if turns < 1:
+            raise ValueError("last_turns needs at least one turn, e.g. last_turns:4")
+        self.turns = turns
+        self.name = f"last_turns:{turns}"
+
+    def compact(self, messages: List[Message]) -> List[Message]:
+        prefix, turns = _split_turns(messages)
+        if len(turns) <= self.turns or not prefix:
+            return messages
+        dropped = [message for turn in turns[:-self.turns] for message in turn]
+        calls = _tool_calls(dropped)
+        lines = []
+        for message in dropped:
+            if message.get("role") == "tool" and message.get("tool_call_id") in calls:
+                name, arguments = calls[message["tool_call_id"]]
+                lines.append(f"- {name} {arguments} -> {message.get('content')}")
+        note = "Earlier turns were removed to save context. Tool calls made in them, in order:\n" + "\n".join(lines)
+        # Appended to the task rather than sent as a message of its own, so roles still alternate
+        task = prefix[-1]
+        prefix = [*prefix[:-1], {**task, "content": f"{task.get('content') or ''}\n\n{note}"}]
+        return prefix + [message for turn in turns[-self.turns:] for message in turn]
+
+
+class CollapseStateOutputs(ContextPolicy):
+    """Keep only the latest output of the state-reading tools."""
+    name = "collapse_state"
+
+    def __init__(self, state_tools: Sequence[str]):
+        self.state_tools = tuple(state_tools)
+
+    def compact(self, messages: List[Message]) -> List[Message]:
+        calls = _tool_calls(messages)
+        outputs = [
+            index for index, message in enumerate(messages)
+            if message.get("role") == "tool" and calls.get(message.get("tool_call_id"), ("",))[0] in self.state_tools
+        ]
+        return _replace_outputs(messages, {index: "superseded by a later state read" for index in outputs[:-1]})
+
+
+class DropSupersededOutputs(ContextPolicy):
+    """Replace outputs of read-only tools that were called again later with the same arguments."""
+    name = "drop_superseded"
+
+    def __init__(self, read_only_tools: Sequence[str]):
+        self.read_only_tools = tuple(read_only_tools)
+
+    def compact(self, messages: List[Message]) -> List[Message]:
+        calls = _tool_calls(messages)
+        latest: Dict[Tuple[str, str], int] = {}
+        for index, message in enumerate(messages):
+            call = calls.get(message.get("tool_call_id")) if message.get("role") == "tool" else None
+            if call is not None and call[0] in self.read_only_tools:
+                latest[call] = index
+        stale = {
+            index: f"superseded by a later {calls[message['tool_call_id']][0]} call"
+            for index, message in enumerate(messages)
+            if message.get("role") == "tool"
+            and calls.get(message.get("tool_call_id")) in latest
+            and latest[calls[message["tool_call_id"]]] != index
+        }
+        return _replace_outputs(messages, stale)
+
+
+def parse_context_policy(
+    spec: str,
+    state_tools: Sequence[str] = (),
+    read_only_tools: Sequence[str] = (),
+) -> ContextPolicy:
+    """The policy named by ``spec``; the agent names its state-reading and read-only tools."""
+    kind, _, argument = (spec or "full").partition(":")
+    if kind == "full":
+        return ContextPolicy()
+    if kind == "last_turns":
+        try:
+            return KeepLastTurns(int(argument))
+        except ValueError:
+            raise ValueError(f"Invalid context policy {spec!r}; use last_turns:K with a number of turns K")
+    if kind == "collapse_state":
+        return CollapseStateOutputs(state_tools)
+    if kind == "drop_superseded":
+        return DropSupersededOutputs(read_only_tools)
+    raise ValueError(f"Unknown context policy {spec!r}, expected one of {', '.join(CONTEXT_POLICIES)}")
+
+
+def get_context_policy(
+    model_config: Dict[str, Any],
+    state_tools: Sequence[str] = (),
+    read_only_tools: Sequence[str] = (),
+) -> ContextPolicy:
+    """The policy selected for a model entry, or ``config.CONTEXT_POLICY``."""
+    spec = model_config.get("context_policy", config.CONTEXT_POLICY)
+    return parse_context_policy(spec, state_tools, read_only_tools)
@@ -0,0 +1,191 @@
+"""Keeping synchronous agent work off the event loop, and measuring what still blocks it.
+
+All evaluations of a process share one asyncio loop, so an adapter that
+calls a synchronous SDK (e.g. Strands' ``agent(prompt)``) from its
+``run_agent`` coroutine freezes every other evaluation for the whole call.
+Such adapters hand the work to :func:`run_sync`, which runs it on a
+dedicated thread pool of ``config.SYNC_AGENT_THREADS`` threads, with the
+caller's context variables (run number, cassettes, usage trackers) copied
+into the thread.
+
+Adapters doing so declare ``SYNC_AGENT = True``; the runner then takes one
+of ``config.SYNC_AGENT_THREADS`` slots (:func:`acquire_sync_slot`) before
+the run's clock and deadline start, so time queued for a thread is reported
+as queue time rather than execution time or a timeout. Work on a thread
+cannot be cancelled: an attempt cancelled by its deadline or by losing a
+hedge leaves its thread running to completion (still calling the model and
+writing to that attempt's trackers, which the runner no longer reads). Such
+threads are counted as abandoned, and their slot is only released once the
+thread finishes, so later runs wait for it instead of queueing on the clock.
+
+:func:`measure_loop_blocking` runs an adapter's coroutine and times each
+step it takes on the loop; steps longer than
+``config.LOOP_BLOCK_THRESHOLD`` are counted as blocking, attributing the
+stall to the adapter that caused it.
+"""
+
+import asyncio
+import contextvars
+import functools
+import threading
+import time
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Generator, Iterator, TypeVar
+
+import config
+
+T = TypeVar("T")
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=config.SYNC_AGENT_THREADS, thread_name_prefix="sync-agent"
+            )
+        return _executor
+
+
+class SyncSlot:
+    """One of ``config.SYNC_AGENT_THREADS`` slots, held by an attempt of a threaded adapter."""
+
+    def __init__(self, semaphore: asyncio.Semaphore, queue_time: float):
+        self.queue_time = queue_time  # Seconds waited for the slot
+        self.abandoned_threads = 0  # Threads still running when their attempt was cancelled
+        self._semaphore = semaphore
+        self._threads = 0
+        self._closed = False
+        self._held = True
+
+    def release(self) -> None:
+        """Give the slot back once no thread started under it is still running; idempotent."""
+        self._closed = True
+        self._release_if_idle()
+
+    def _thread_done(self) -> None:
+        self._threads -= 1
+        self._release_if_idle()
+
+    def _release_if_idle(self) -> None:
+        if self._held and self._closed and not self._threads:
+            self._held = False
+            self._semaphore.release()
+
+
+# One semaphore per event loop; asyncio primitives cannot be shared between loops
+_slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+_current_slot: ContextVar[SyncSlot | None] = ContextVar("sync_slot", default=None)
+
+
+async def acquire_sync_slot() -> SyncSlot:
+    """Wait for a free sync-agent thread and reserve it."""
+    loop = asyncio.get_running_loop()
+    semaphore = _slots.get(loop)
+    if semaphore is None:
+        semaphore = _slots[loop] = asyncio.Semaphore(config.SYNC_AGENT_THREADS)
+    start = time.perf_counter()
+    await semaphore.acquire()
+    return SyncSlot(semaphore, time.perf_counter() - start)
+
+
+@contextmanager
+def use_sync_slot(slot: SyncSlot | None) -> Iterator[None]:
+    """Run the :func:`run_sync` calls made inside the block under ``slot``, releasing it afterwards."""
+    token = _current_slot.set(slot)
+    try:
+        yield
+    finally:
+        _current_slot.reset(token)
+        if slot is not None:
+            slot.release()
+
+
+async def run_sync(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a blocking call on the sync-agent thread pool and await its result.
+
+    Calls beyond the pool size queue rather than starting more threads; under
+    a slot (see :func:`use_sync_slot`) a thread is free, and a thread left
+    running by cancellation keeps the slot until it finishes.
+    """
+    context = contextvars.copy_context()
+    call = functools.partial(context.run, func, *args, **kwargs)
+    slot = _current_slot.get()
+    future: Future = _get_executor().submit(call)
+    if slot is None:
+        return await asyncio.wrap_future(future)
+
+    loop = asyncio.get_running_loop()
+
+    def thread_done(_: Future) -> None:
+        try:
+            loop.call_soon_threadsafe(slot._thread_done)
+        except RuntimeError:  # The loop closed while the abandoned thread ran
+            pass
+
+    slot._threads += 1
+    future.add_done_callback(thread_done)
+    try:
+        return await asyncio.wrap_future(future)
+    except asyncio.CancelledError:
+        # Only a call still queued can be cancelled; a running thread carries on
+        if not future.cancel() and not future.done():
+            slot.abandoned_threads += 1
+        raise
+
+
+@dataclass
+class LoopBlocking:
+    """Time a coroutine held the event loop in steps longer than ``config.LOOP_BLOCK_THRESHOLD``."""
+    blocked_time: float = 0.0  # Seconds, summed over the blocking steps
+    blocking_steps: int = 0
+    longest_step: float = 0.0  # Seconds of the longest step, blocking or not
+
+
+class _TimedSteps:
+    """Awaitable driving a coroutine step by step and timing each step."""
+
+    def __init__(self, coroutine: Awaitable[T], blocking: LoopBlocking):
+        self._coroutine = coroutine
+        self._blocking = blocking
+
+    def _record(self, seconds: float) -> None:
+        self._blocking.longest_step = max(self._blocking.longest_step, seconds)
+        if seconds > config.LOOP_BLOCK_THRESHOLD:
+            self._blocking.blocked_time += seconds
+            self._blocking.blocking_steps += 1
+
+    def __await__(self) -> Generator[Any, Any, T]:
+        steps = self._coroutine.__await__()
+        send, value = steps.send, None
+        while True:
+            start = time.perf_counter()
+            try:
+                yielded = send(value)
+            except StopIteration as done:
+                self._record(time.perf_counter() - start)
+                return done.value
+            except BaseException:
+                self._record(time.perf_counter() - start)
+                raise
+            self._record(time.perf_counter() - start)
+            try:
+                send, value = steps.send, (yield yielded)
+            except BaseException as e:  # Cancellation and errors thrown into the awaiting task
+                send, value = steps.throw, e
+
+
+async def measure_loop_blocking(coroutine: Awaitable[T], blocking: LoopBlocking) -> T:
+    """Await ``coroutine``, adding the time its steps block the loop to ``blocking``.
+
+    Only steps of the coroutine's own task are timed; work it starts in other
+    tasks is not attributed to it.
+    """
+    return await _TimedSteps(coroutine, blocking)
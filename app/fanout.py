@@ -0,0 +1,180 @@
+"""Shared first turns: one ``n>1`` chat completion forked into the runs of a cell.
+
+Every run of a cell starts with the same request (system prompt, user prompt
+and tool schemas). With ``config.FANOUT_FIRST_TURN`` the runner gives the
+initial runs it schedules for a cell one :class:`FanoutCell`; the first of
+them to reach its first turn asks for ``n`` choices, one per scheduled run,
+and each run continues its own conversation from its own choice, so the
+prompt is prefilled once instead of once per run. Runs resumed from the
+journal are not scheduled, so they are not paid for.
+
+Endpoints that ignore ``n`` (returning fewer choices) or reject it (HTTP
+400/422 naming ``n``) are remembered, and their runs fall back to making
+their own first request. Any other failure of a shared request (throttling,
+server or network errors) only sends the runs waiting on it back to their
+own requests.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Set, Tuple
+
+from app.utils import current_run
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class FanoutStats:
+    """First turns served from a shared request, and what sharing saved."""
+    shared_turns: int = 0
+    saved_prompt_tokens: int = 0  # Prefill the run would have paid for with its own request
+    saved_request_time: float = 0.0  # Endpoint time of the request the run did not make
+
+
+_current_stats: ContextVar[FanoutStats | None] = ContextVar("fanout_stats", default=None)
+
+
+@contextmanager
+def track_fanout() -> Iterator[FanoutStats]:
+    """Collect fan-out savings of the first turns made inside the block."""
+    stats = FanoutStats()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+@dataclass
+class _Group:
+    """A shared request and the runs that have claimed a choice from it."""
+    task: asyncio.Task
+    leader: int  # run number that made the request
+    claimed: Set[int] = field(default_factory=set)
+
+
+@dataclass(eq=False)
+class FanoutCell:
+    """The initial runs of one cell that share first-turn requests, and those requests.
+
+    Owned by the cell's jobs, so its requests are released with them.
+    """
+    runs: Tuple[int, ...]  # Run numbers, in choice order
+    _requests: Dict[str, _Group] = field(default_factory=dict)  # In flight, by request
+    _finished: Set[str] = field(default_factory=set)  # Requests whose shared call has completed
+
+
+_ignores_n: Set[Tuple[str, str]] = set()  # (base_url, model) of endpoints without n>1 support
+
+_CLIENT_ERROR = re.compile(r"API request failed: (?:400|422)\b")  # As raised by the raw_openai_api adapters
+_NAMES_N = re.compile(r"(?<![\w\\])n\b")  # "n" as a word, not the n of an escaped "\n"
+
+
+def _rejects_n(error: Exception) -> bool:
+    """Whether a failed request was refused for its ``n`` parameter."""
+    message = str(error)
+    return bool(_CLIENT_ERROR.search(message) and _NAMES_N.search(message))
+
+
+def _group_key(base_url: str, model: str, messages: List[Dict[str, Any]], tools: List[Dict[str, Any]] | None) -> str:
+    payload = json.dumps([base_url, model, messages, tools], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+async def _timed(request: Awaitable[Dict[str, Any]]) -> Tuple[Dict[str, Any], float]:
+    start = time.perf_counter()
+    response = await request
+    return response, time.perf_counter() - start
+
+
+async def shared_first_turn(
+    base_url: str,
+    model: str,
+    messages: List[Dict[str, Any]],
+    tools: List[Dict[str, Any]] | None,
+    call: Callable[[int], Awaitable[Dict[str, Any]]],
+) -> Dict[str, Any] | None:
+    """Serve the current run's first turn from a shared ``n>1`` request.
+
+    ``call(n)`` makes the completion request for ``n`` choices. Returns a
+    single-choice response shaped like the endpoint's own, or None when the
+    run must make its own request (fan-out disabled, a run beyond the
+    initial ones, or an endpoint without ``n`` support).
+    """
+    run = current_run()
+    cell = run.fanout if run is not None else None
+    if cell is None or len(cell.runs) <= 1 or run.run_number not in cell.runs or (base_url, model) in _ignores_n:
+        return None
+
+    key = _group_key(base_url, model, messages, tools)
+    group = cell._requests.get(key)
+    if group is None:
+        if key in cell._finished:
+            return None  # Reached its first turn after the shared call completed
+        group = _Group(task=asyncio.ensure_future(_timed(call(len(cell.runs)))), leader=run.run_number)
+        cell._requests[key] = group
+
+        def finished(_task: asyncio.Task) -> None:
+            # Runs already waiting hold the group; later arrivals make their own request
+            del cell._requests[key]
+            cell._finished.add(key)
+
+        group.task.add_done_callback(finished)
+    group.claimed.add(run.run_number)
+
+    try:
+        # Shielded: a timed-out run must not cancel the request the other runs wait on
+        response, duration = await asyncio.shield(group.task)
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        if not _rejects_n(e):
+            # Transient or unrelated; only the runs of this request fall back
+            if run.run_number == group.leader:
+                logger.warning(f"⚠️  Shared first turn failed on {base_url} ({model}), its runs will make their own: {e}")
+            return None
+        if (base_url, model) not in _ignores_n:
+            logger.warning(f"⚠️  {base_url} ({model}) rejected n>1, not fanning out first turns for it any more: {e}")
+        _ignores_n.add((base_url, model))
+        return None
+
+    choices = response.get("choices") or []
+    if len(choices) < len(cell.runs) and (base_url, model) not in _ignores_n:
+        logger.warning(
+            f"⚠️  {base_url} ({model}) returned {len(choices)} of {len(cell.runs)} requested choices; "
+            "not fanning out first turns for it any more"
+        )
+        _ignores_n.add((base_url, model))
+    index = cell.runs.index(run.run_number)
+    if index >= len(choices):
+        return None
+
+    # Each run reports usage as if it had made the request alone
+    usage = response.get("usage") or {}
+    prompt_tokens = usage.get("prompt_tokens") or 0
+    completion_tokens = (usage.get("completion_tokens") or 0) // len(choices)
+    stats = _current_stats.get()
+    if stats is not None and len(choices) > 1:
+        stats.shared_turns += 1
+        if run.run_number != group.leader:
+            stats.saved_prompt_tokens += prompt_tokens
+            stats.saved_request_time += duration
+
+    return {
+        **response,
+        "choices": [{**choices[index], "index": 0}],
+        "usage": {
+            **usage,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    }
@@ -0,0 +1,80 @@
+"""Latency tracking and hedged execution of agent runs."""
+
+import asyncio
+import math
+from collections import deque
+from typing import Awaitable, Callable, Dict, Hashable, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class LatencyTracker:
+    """Rolling window of observed latencies per key (e.g. framework/model)."""
+
+    def __init__(self, window: int = 100):
+        self._window = window
+        self._samples: Dict[Hashable, deque] = {}
+
+    def record(self, key: Hashable, seconds: float) -> None:
+        """Add one latency sample for ``key``."""
+        if key not in self._samples:
+            self._samples[key] = deque(maxlen=self._window)
+        self._samples[key].append(seconds)
+
+    def percentile(self, key: Hashable, q: float, min_samples: int = 1) -> float | None:
+        """Return the ``q`` quantile (0-1) for ``key``, or None with too few samples."""
+        samples = sorted(self._samples.get(key, ()))
+        if len(samples) < max(1, min_samples):
+            return None
+        # Nearest-rank percentile
+        rank = max(1, math.ceil(q * len(samples)))
+        return samples[rank - 1]
+
+
+async def run_hedged(
+    make_attempt: Callable[[], Awaitable[T]],
+    hedge_after: float | None,
+    max_attempts: int = 2
+) -> Tuple[T, int]:
+    """Run ``make_attempt`` and hedge it with duplicates when it runs long.
+
+    A new attempt is started every ``hedge_after`` seconds while no attempt has
+    finished, up to ``max_attempts``. The first attempt to succeed wins and
+    the others are cancelled. Failed attempts are not retried; once every
+    started attempt has failed, the first failure is raised. Returns the
+    winning result and the number of attempts started.
+    """
+    tasks: list[asyncio.Task] = [asyncio.ensure_future(make_attempt())]
+    first_error: BaseException | None = None
+    try:
+        while True:
+            can_hedge = hedge_after is not None and len(tasks) < max_attempts
+            running = [task for task in tasks if not task.done()]
+            if not running:
+                # Hedging covers slow attempts, not failed ones: no retry on error
+                assert first_error is not None
+                raise first_error
+
+            done, _ = await asyncio.wait(
+                running,
+                timeout=hedge_after if can_hedge else None,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+
+            # Prefer results in start order so ties resolve deterministically
+            for task in tasks:
+                if task not in done:
+                    continue
+                if task.exception() is None:
+                    return task.result(), len(tasks)
+                if first_error is None:
+                    first_error = task.exception()
+
+            if not done and can_hedge:
+                tasks.append(asyncio.ensure_future(make_attempt()))
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+        # Let cancelled attempts unwind before returning
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,146 @@
+"""Process-wide pool of keep-alive httpx clients for OpenAI-compatible endpoints."""
+
+import asyncio
+import importlib.util
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Tuple
+
+import httpx
+import logfire
+
+import config
+from app.cassettes import CassetteTransport
+from app.rate_limit import RateLimitedTransport
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PoolStats:
+    """Connection usage of one pooled client."""
+    requests: int = 0
+    new_connections: int = 0
+    connect_time: float = 0.0  # seconds spent opening connections (TCP + TLS)
+    acquire_wait: float = 0.0  # seconds spent waiting for a free connection
+
+    @property
+    def reused_connections(self) -> int:
+        return self.requests - self.new_connections
+
+
+class _TelemetryTransport(httpx.AsyncBaseTransport):
+    """Uses httpcore trace events to tell reused from new connections and time pool waits."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, base_url: str, stats: PoolStats):
+        self._transport = transport
+        self._base_url = base_url
+        self._stats = stats
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        start = time.perf_counter()
+        timings: Dict[str, float] = {}
+
+        async def trace(event_name: str, info: Dict[str, Any]) -> None:
+            if event_name in ("connection.connect_tcp.started", "connection.start_tls.complete",
+                              "connection.connect_tcp.complete"):
+                timings[event_name] = time.perf_counter()
+            elif event_name.endswith(".send_request_headers.started"):
+                timings.setdefault("headers", time.perf_counter())
+
+        request.extensions = {**request.extensions, "trace": trace}
+        response = await self._transport.handle_async_request(request)
+
+        new_connection = "connection.connect_tcp.started" in timings
+        connect_time = 0.0
+        if new_connection:
+            connected = timings.get("connection.start_tls.complete",
+                                    timings.get("connection.connect_tcp.complete", start))
+            connect_time = connected - timings["connection.connect_tcp.started"]
+        # Time before the request could be written, other than opening a connection
+        acquire_wait = max(0.0, timings.get("headers", start) - start - connect_time)
+
+        self._stats.requests += 1
+        self._stats.new_connections += int(new_connection)
+        self._stats.connect_time += connect_time
+        self._stats.acquire_wait += acquire_wait
+        logfire.debug(
+            "http_pool_request",
+            base_url=self._base_url,
+            reused_connection=not new_connection,
+            connect_ms=connect_time * 1000,
+            acquire_wait_ms=acquire_wait * 1000,
+        )
+        return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+_clients: Dict[str, Tuple[httpx.AsyncClient, PoolStats]] = {}
+_loop: asyncio.AbstractEventLoop | None = None
+
+
+def _http2_available() -> bool:
+    if not config.HTTP2:
+        return False
+    if importlib.util.find_spec("h2") is None:
+        logger.warning("⚠️  HTTP2 is enabled but the h2 package is not installed; using HTTP/1.1")
+        return False
+    return True
+
+
+def get_http_client(base_url: str) -> httpx.AsyncClient:
+    """Return the shared client for ``base_url``, creating it on first use.
+
+    Clients are bound to the event loop they were created on; a new loop
+    (e.g. a second ``asyncio.run``) starts a fresh pool.
+    """
+    global _loop
+    loop = asyncio.get_running_loop()
+    if _loop is not loop:
+        _clients.clear()
+        _loop = loop
+
+    if base_url not in _clients:
+        stats = PoolStats()
+        limits = httpx.Limits(
+            max_connections=config.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=config.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=config.HTTP_KEEPALIVE_EXPIRY,
+        )
+        transport = httpx.AsyncHTTPTransport(limits=limits, http2=_http2_available())
+        client = httpx.AsyncClient(
+            timeout=config.HTTP_TIMEOUT,
+            transport=CassetteTransport(RateLimitedTransport(_TelemetryTransport(transport, base_url, stats))),
+        )
+        _clients[base_url] = (client, stats)
+    return _clients[base_url][0]
+
+
+def pool_stats() -> Dict[str, PoolStats]:
+    """Return connection statistics per base_url."""
+    return {base_url: stats for base_url, (_, stats) in _clients.items()}
+
+
+async def close_http_clients() -> None:
+    """Close every pooled client, logging how well connections were reused."""
+    for base_url, (client, stats) in list(_clients.items()):
+        if stats.requests:
+            logger.info(
+                f"🔌 {base_url}: {stats.requests} requests, {stats.reused_connections} on reused connections, "
+                f"{stats.new_connections} new ({stats.connect_time:.2f}s connecting), "
+                f"{stats.acquire_wait:.2f}s waiting for a connection"
+            )
+            logfire.info(
+                "http_pool_closed",
+                base_url=base_url,
+                requests=stats.requests,
+                reused_connections=stats.reused_connections,
+                new_connections=stats.new_connections,
+                connect_time=stats.connect_time,
+                acquire_wait=stats.acquire_wait,
+            )
+        await client.aclose()
+    _clients.clear()
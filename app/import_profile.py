@@ -0,0 +1,41 @@
+"""Import timing, reported at startup to show where launch time goes."""
+
+import importlib
+import logging
+import sys
+import time
+from types import ModuleType
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+_import_times: Dict[str, float] = {}
+
+
+def timed_import(module_name: str) -> ModuleType:
+    """Import a module, recording how long it took if it was not loaded yet.
+
+    Times are inclusive: the first module to pull in a shared dependency
+    (pydantic_ai, strands, boto3, ...) is charged for loading it.
+    """
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    start = time.perf_counter()
+    try:
+        return importlib.import_module(module_name)
+    finally:
+        _import_times[module_name] = time.perf_counter() - start
+
+
+def import_times() -> Dict[str, float]:
+    """Return the recorded import times in seconds, by module name."""
+    return dict(_import_times)
+
+
+def log_import_report(title: str = "Import cost") -> None:
+    """Log the recorded import times, most expensive first."""
+    if not _import_times:
+        return
+    logger.info(f"📦 {title}:")
+    for module_name, seconds in sorted(_import_times.items(), key=lambda item: item[1], reverse=True):
+        logger.info(f"   {module_name:<50} {seconds * 1000:8.1f} ms")
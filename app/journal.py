@@ -0,0 +1,88 @@
+"""Append-only journal of evaluation results, used to resume interrupted runs."""
+
+import json
+import logging
+import os
+from dataclasses import asdict, fields
+from pathlib import Path
+from typing import List, Tuple
+
+from app.reporting import EvaluationResult
+from app.scheduler import EvaluationCell, EvaluationJob, model_label
+
+logger = logging.getLogger(__name__)
+
+ResultKey = Tuple[str, str, str, int]
+CellKey = Tuple[str, str, str]
+
+
+def result_key(result: EvaluationResult) -> ResultKey:
+    """Identify a result by (puzzle, framework, model, run_number)."""
+    return (result.puzzle, result.framework, result.model, result.run_number)
+
+
+def job_key(job: EvaluationJob) -> ResultKey:
+    """Identify the result a job will produce."""
+    return (*cell_key(job.cell), job.run_number)
+
+
+def cell_key(cell: EvaluationCell) -> CellKey:
+    """Identify a cell by (puzzle, framework, model)."""
+    return (cell.puzzle, cell.framework, model_label(cell.model))
+
+
+class ResultJournal:
+    """JSONL file that every finished EvaluationResult is appended to.
+
+    Each record is flushed and fsynced before ``append`` returns, so a crash
+    or interrupt loses at most the evaluations that were still running.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+
+    def reset(self) -> None:
+        """Start a new, empty journal."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text("")
+
+    def append(self, result: EvaluationResult) -> None:
+        """Durably append one result."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        line = json.dumps(asdict(result), default=str)
+        with self.path.open("a", encoding="utf-8") as f:
+            f.write(line + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def load(self) -> List[EvaluationResult]:
+        """Read back all journaled results, later records winning on duplicate keys.
+
+        A record torn by a crash mid-write is dropped from the file so that
+        later appends start on a fresh line.
+        """
+        if not self.path.exists():
+            return []
+
+        data = self.path.read_bytes()
+        if data and not data.endswith(b"\n"):
+            complete = data[:data.rfind(b"\n") + 1]
+            logger.warning(f"⚠️  Dropping torn final record from {self.path}")
+            with self.path.open("r+b") as f:
+                f.truncate(len(complete))
+            data = complete
+
+        known_fields = {f.name for f in fields(EvaluationResult)}
+        results: dict[ResultKey, EvaluationResult] = {}
+        for line_number, line in enumerate(data.decode("utf-8").splitlines(), start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning(f"⚠️  Skipping unreadable journal record at {self.path}:{line_number}")
+                continue
+            result = EvaluationResult(**{k: v for k, v in record.items() if k in known_fields})
+            results[result_key(result)] = result
+        return list(results.values())
@@ -0,0 +1,381 @@
+"""Scripted OpenAI-compatible mock server for load-testing the custom endpoint adapters.
+
+Implements ``/v1/chat/completions`` (plain and streamed, with tool calls) and
+``/v1/models``. Instead of a model it plays a scripted trajectory that solves
+the puzzle the request belongs to, recognized from the offered tools:
+
+- fruit_count: call the orange and apple tools, then answer with their counts
+- towers_of_hanoi: read the tower state, make the optimal moves one per turn,
+  check the puzzle is solved, then answer with the moves and final state
+
+Each turn is derived from the conversation so far, so the server is
+stateless and any number of evaluations can run against it concurrently.
+The final answer is a ``final_result`` tool call when the client offers one
+(pydantic-ai output tools) and a JSON message otherwise. Plain requests with
+``n`` > 1 get ``n`` choices (pass ``--ignore-n`` to mimic servers that don't).
+Like a server with prefix caching, the usage reports the prompt tokens of the
+longest message prefix seen before as ``prompt_tokens_details.cached_tokens``.
+
+Latency is drawn per request from configurable distributions for time to
+first token and decode rate, and a share of requests can be failed with 429
+or 500 responses::
+
+    python -m app.mock_server --port 8910 --ttft lognormal:0.3,1.0 --tokens-per-sec 80 --throttle-rate 0.05
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import random
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Tuple
+
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+CHARS_PER_TOKEN = 4
+STREAM_CHUNK_TOKENS = 4  # Tokens per streamed chunk, to keep event counts realistic but bounded
+PREFIX_CACHE_ENTRIES = 100_000
+_Z_99 = 2.3263  # Standard normal quantile of the 99th percentile
+
+
+@dataclass
+class Distribution:
+    """Seconds drawn from ``fixed:S``, ``uniform:LOW,HIGH``, ``exponential:MEAN`` or ``lognormal:P50,P99``.
+
+    ``lognormal`` takes the median and 99th percentile, as ``--tool-latency`` does.
+    """
+    kind: str
+    params: Tuple[float, ...]
+
+    @classmethod
+    def parse(cls, spec: str) -> "Distribution":
+        kind, _, args = spec.partition(":")
+        params = tuple(float(a) for a in args.split(",") if a)
+        expected = {"fixed": 1, "uniform": 2, "exponential": 1, "lognormal": 2}
+        valid = kind in expected and len(params) == expected[kind]
+        if not valid or (kind == "lognormal" and not 0 < params[0] <= params[1]):
+            raise argparse.ArgumentTypeError(
+                f"Invalid distribution {spec!r}; use fixed:S, uniform:LOW,HIGH, exponential:MEAN or lognormal:P50,P99"
+            )
+        return cls(kind, params)
+
+    def sample(self) -> float:
+        if self.kind == "fixed":
+            return self.params[0]
+        if self.kind == "uniform":
+            return random.uniform(*self.params)
+        if self.kind == "exponential":
+            return random.expovariate(1 / self.params[0]) if self.params[0] > 0 else 0.0
+        p50, p99 = self.params
+        return random.lognormvariate(math.log(p50), math.log(p99 / p50) / _Z_99)
+
+
+@dataclass
+class MockSettings:
+    ttft: Distribution
+    tokens_per_sec: float  # decode rate; 0 means instant
+    throttle_rate: float = 0.0  # share of requests answered with 429
+    error_rate: float = 0.0  # share of requests answered with 500
+    retry_after: float = 1.0  # seconds, sent with 429 responses
+    ignore_n: bool = False  # answer n>1 requests with a single choice
+
+
+# --- Scripted trajectories ---------------------------------------------------
+
+
+def _find_tool(tools: List[str], *fragments: str) -> str | None:
+    """First offered tool whose name contains all ``fragments``."""
+    for name in tools:
+        if all(fragment in name for fragment in fragments):
+            return name
+    return None
+
+
+def _tool_results(messages: List[Dict[str, Any]]) -> List[Tuple[str, Dict[str, Any], str]]:
+    """(tool name, arguments, result content) of every answered tool call, in order."""
+    calls: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+    results = []
+    for message in messages:
+        for call in message.get("tool_calls") or []:
+            function = call.get("function") or {}
+            try:
+                arguments = json.loads(function.get("arguments") or "{}")
+            except ValueError:
+                arguments = {}
+            calls[call.get("id")] = (function.get("name", ""), arguments)
+        if message.get("role") == "tool" and message.get("tool_call_id") in calls:
+            name, arguments = calls[message["tool_call_id"]]
+            content = message.get("content")
+            if isinstance(content, list):  # content parts
+                content = "".join(part.get("text", "") for part in content if isinstance(part, dict))
+            results.append((name, arguments, content or ""))
+    return results
+
+
+def _parse(content: str) -> Any:
+    try:
+        return json.loads(content)
+    except ValueError:
+        return content
+
+
+def _next_hanoi_move(state: Dict[str, List[int]], disk: int, target: str) -> Tuple[str, str] | None:
+    """Optimal next move bringing disks ``1..disk`` onto ``target`` from any legal state, or None if they are there."""
+    if disk == 0:
+        return None
+    position = next(name for name, disks in state.items() if disk in disks)
+    if position == target:
+        return _next_hanoi_move(state, disk - 1, target)
+    spare = next(name for name in state if name not in (position, target))
+    # Clear the smaller disks onto the spare tower, then move this one
+    return _next_hanoi_move(state, disk - 1, spare) or (position, target)
+
+
+def _fruit_count_turn(tools: List[str], results) -> Tuple[List[Tuple[str, Dict[str, Any]]], Dict[str, Any] | None]:
+    counts: Dict[str, int] = {}
+    for name, _, content in results:
+        for fruit in ("orange", "apple"):
+            if fruit in name:
+                counts[fruit] = int(_parse(content))
+    missing = [fruit for fruit in ("orange", "apple") if fruit not in counts]
+    if missing:
+        return [(_find_tool(tools, fruit), {}) for fruit in missing], None
+    return [], {"fruit_count_by_color": counts}
+
+
+def _towers_of_hanoi_turn(tools: List[str], results) -> Tuple[List[Tuple[str, Dict[str, Any]]], Dict[str, Any] | None]:
+    # The current state is the latest state read plus the successful moves since; clients that
+    # compact their history may have dropped older reads, in which case the state is read again
+    state = None
+    moves = []
+    for name, arguments, content in results:
+        outcome = _parse(content)
+        if "tower_state" in name and isinstance(outcome, dict) and all(isinstance(d, list) for d in outcome.values()):
+            state = {tower: list(disks) for tower, disks in outcome.items()}
+        elif "move_disk" in name and isinstance(outcome, dict) and outcome.get("success") is True:
+            move = {"from": arguments.get("from_tower"), "to": arguments.get("to_tower")}
+            moves.append(move)
+            if state is not None and state.get(move["from"]) and move["to"] in state:
+                state[move["to"]].append(state[move["from"]].pop())
+    if state is None:
+        return [(_find_tool(tools, "tower_state"), {})], None
+
+    target = list(state)[-1]
+    move = _next_hanoi_move(state, sum(len(disks) for disks in state.values()), target)
+    if move is not None:
+        return [(_find_tool(tools, "move_disk"), {"from_tower": move[0], "to_tower": move[1]})], None
+
+    check_tool = _find_tool(tools, "check_if_solved")
+    last_tool = results[-1][0] if results else ""
+    if check_tool and "check_if_solved" not in last_tool:
+        return [(check_tool, {})], None
+    return [], {"moves": moves, "solved": True, "final_state": state}
+
+
+def next_turn(messages: List[Dict[str, Any]], tools: List[str]) -> Tuple[List[Tuple[str, Dict[str, Any]]], Dict[str, Any] | None]:
+    """Decide the assistant's next turn: tool calls to make, or the final answer."""
+    results = _tool_results(messages)
+    # Follow-up requests may omit the tools, so also look at the calls already made
+    seen = tools + [name for name, _, _ in results]
+    if _find_tool(seen, "move_disk"):
+        return _towers_of_hanoi_turn(tools, results)
+    if _find_tool(seen, "orange"):
+        return _fruit_count_turn(tools, results)
+    return [], None
+
+
+def build_message(messages: List[Dict[str, Any]], tools: List[str]) -> Tuple[Dict[str, Any], str]:
+    """Assistant message and finish reason for the next turn."""
+    calls, answer = next_turn(messages, tools)
+    output_tool = _find_tool(tools, "final_result")
+    if answer is not None and output_tool:
+        calls = [(output_tool, answer)]
+    if calls:
+        tool_calls = [
+            {
+                "id": f"call_{uuid.uuid4().hex[:12]}",
+                "type": "function",
+                "function": {"name": name, "arguments": json.dumps(arguments)},
+            }
+            for name, arguments in calls
+        ]
+        return {"role": "assistant", "content": None, "tool_calls": tool_calls}, "tool_calls"
+    content = json.dumps(answer) if answer is not None else "I can only solve the bundled puzzles."
+    return {"role": "assistant", "content": content}, "stop"
+
+
+# --- HTTP handlers -----------------------------------------------------------
+
+
+def _tokens(text: str) -> int:
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+def _cached_prefix_tokens(prefix_cache: "OrderedDict[str, None]", messages: List[Dict[str, Any]]) -> int:
+    """Prompt tokens of the longest message prefix seen before; remembers every prefix of this prompt."""
+    cached = 0
+    for length in range(1, len(messages) + 1):
+        prefix = json.dumps(messages[:length], sort_keys=True)
+        if prefix in prefix_cache:
+            prefix_cache.move_to_end(prefix)
+            cached = _tokens(prefix)
+        else:
+            prefix_cache[prefix] = None
+    while len(prefix_cache) > PREFIX_CACHE_ENTRIES:
+        prefix_cache.popitem(last=False)
+    return cached
+
+
+def _chunks(text: str) -> List[str]:
+    size = CHARS_PER_TOKEN * STREAM_CHUNK_TOKENS
+    return [text[i:i + size] for i in range(0, len(text), size)] or [""]
+
+
+async def chat_completions(request: web.Request) -> web.StreamResponse:
+    settings: MockSettings = request.app["settings"]
+    stats = request.app["stats"]
+    stats["requests"] += 1
+    body = await request.json()
+
+    roll = random.random()
+    if roll < settings.throttle_rate:
+        stats["throttled"] += 1
+        return web.json_response(
+            {"error": {"message": "Rate limit exceeded (mock)", "type": "rate_limit_error"}},
+            status=429,
+            headers={"Retry-After": str(settings.retry_after)},
+        )
+    if roll < settings.throttle_rate + settings.error_rate:
+        stats["errors"] += 1
+        return web.json_response({"error": {"message": "Internal error (mock)", "type": "server_error"}}, status=500)
+
+    tools = [t.get("function", {}).get("name", "") for t in body.get("tools") or []]
+    message, finish_reason = build_message(body.get("messages") or [], tools)
+    generated = message["content"] or "".join(c["function"]["arguments"] for c in message.get("tool_calls", []))
+    # Choices are decoded in parallel, so n only multiplies the completion tokens billed
+    n = 1 if body.get("stream") or settings.ignore_n else max(1, int(body.get("n") or 1))
+    usage = {
+        "prompt_tokens": _tokens(json.dumps(body.get("messages"))),
+        "completion_tokens": _tokens(generated) * n,
+        "prompt_tokens_details": {
+            "cached_tokens": _cached_prefix_tokens(request.app["prefix_cache"], body.get("messages") or []),
+        },
+    }
+    usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+    completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+    created = int(time.time())
+    model = body.get("model", "mock")
+    decode_time = _tokens(generated) / settings.tokens_per_sec if settings.tokens_per_sec > 0 else 0.0
+
+    await asyncio.sleep(max(0.0, settings.ttft.sample()))
+
+    if not body.get("stream"):
+        choices = [{"index": 0, "message": message, "finish_reason": finish_reason}]
+        for index in range(1, n):
+            other, other_reason = build_message(body.get("messages") or [], tools)  # Fresh tool call IDs
+            choices.append({"index": index, "message": other, "finish_reason": other_reason})
+        await asyncio.sleep(decode_time)
+        return web.json_response({
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": choices,
+            "usage": usage,
+        })
+
+    response = web.StreamResponse(headers={"Content-Type": "text/event-stream", "Cache-Control": "no-cache"})
+    await response.prepare(request)
+
+    async def send(choices: List[Dict[str, Any]], **extra) -> None:
+        chunk = {"id": completion_id, "object": "chat.completion.chunk", "created": created,
+                 "model": model, "choices": choices, **extra}
+        await response.write(f"data: {json.dumps(chunk)}\n\n".encode())
+
+    deltas: List[Dict[str, Any]] = []
+    if message.get("tool_calls"):
+        for index, call in enumerate(message["tool_calls"]):
+            for position, piece in enumerate(_chunks(call["function"]["arguments"])):
+                delta: Dict[str, Any] = {"index": index, "function": {"arguments": piece}}
+                if position == 0:
+                    delta.update(id=call["id"], type="function")
+                    delta["function"]["name"] = call["function"]["name"]
+                deltas.append({"tool_calls": [delta]})
+    else:
+        deltas = [{"content": piece} for piece in _chunks(message["content"])]
+    deltas[0] = {"role": "assistant", **deltas[0]}
+
+    pause = decode_time / len(deltas)
+    for position, delta in enumerate(deltas):
+        if position:
+            await asyncio.sleep(pause)
+        await send([{"index": 0, "delta": delta, "finish_reason": None}])
+    await send([{"index": 0, "delta": {}, "finish_reason": finish_reason}])
+    if (body.get("stream_options") or {}).get("include_usage"):
+        await send([], usage=usage)
+    await response.write(b"data: [DONE]\n\n")
+    await response.write_eof()
+    return response
+
+
+async def list_models(request: web.Request) -> web.Response:
+    return web.json_response({"object": "list", "data": [{"id": "mock", "object": "model", "owned_by": "agentgym"}]})
+
+
+def create_app(settings: MockSettings) -> web.Application:
+    app = web.Application(client_max_size=16 * 1024 ** 2)
+    app["settings"] = settings
+    app["stats"] = {"requests": 0, "throttled": 0, "errors": 0}
+    app["prefix_cache"] = OrderedDict()
+    app.router.add_post("/v1/chat/completions", chat_completions)
+    app.router.add_get("/v1/models", list_models)
+
+    async def report(app: web.Application) -> None:
+        stats = app["stats"]
+        logger.info(f"🧪 Mock server served {stats['requests']} requests "
+                    f"({stats['throttled']} throttled, {stats['errors']} errors)")
+
+    app.on_shutdown.append(report)
+    return app
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.mock_server", description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8910)
+    parser.add_argument("--ttft", type=Distribution.parse, default=Distribution("fixed", (0.05,)),
+                        help="Time to first token distribution in seconds (default: fixed:0.05)")
+    parser.add_argument("--tokens-per-sec", type=float, default=200.0,
+                        help="Decode rate; 0 answers instantly (default: 200)")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Share of requests answered with 429")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with 500")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds sent with 429s")
+    parser.add_argument("--ignore-n", action="store_true", help="Answer n>1 requests with a single choice")
+    parser.add_argument("--seed", type=int, help="Seed latency and error sampling")
+    args = parser.parse_args(argv)
+
+    if args.seed is not None:
+        random.seed(args.seed)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    settings = MockSettings(
+        ttft=args.ttft,
+        tokens_per_sec=args.tokens_per_sec,
+        throttle_rate=args.throttle_rate,
+        error_rate=args.error_rate,
+        retry_after=args.retry_after,
+        ignore_n=args.ignore_n,
+    )
+    logger.info(f"🧪 Mock OpenAI-compatible server on http://{args.host}:{args.port}/v1 ({settings})")
+    # A large backlog so thousands of concurrent clients are queued rather than refused
+    web.run_app(create_app(settings), host=args.host, port=args.port, backlog=4096, print=None, access_log=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""Provider prompt caching and cached-token accounting.
+
+Agent loops resend the same system prompt and tool schemas, plus a growing
+history, on every turn. Providers can reuse the prefill of a repeated prefix:
+
+- Bedrock Converse caches up to explicit ``cachePoint`` blocks, which
+  ``PromptCachingBedrockClient`` adds after the system prompt, the tool
+  schemas and the latest message for models in ``config.BEDROCK_CACHE_POINTS``.
+- llama.cpp-style servers reuse the KV cache of a matching prefix when asked
+  with ``cache_prompt``; custom endpoints opt in with ``"prompt_cache": True``.
+- OpenAI and vLLM cache prefixes automatically and only need accounting.
+
+Cached prompt tokens are read from each response's usage: normalized into
+``cached_tokens`` for OpenAI-compatible responses (summed by
+``aggregate_usages``), and collected per run by ``track_prompt_usage`` for
+Bedrock calls, whose adapters do not return usage to the runner.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List
+
+import config
+
+CACHE_POINT = {"cachePoint": {"type": "default"}}
+
+
+@dataclass
+class PromptUsage:
+    """Token usage of the Bedrock calls of a run, including prompt cache reads and writes."""
+    calls: int = 0
+    prompt_tokens: int = 0  # All input tokens, cached or not
+    completion_tokens: int = 0
+    cached_tokens: int = 0  # Input tokens read from the prompt cache
+    cache_write_tokens: int = 0  # Input tokens written to the prompt cache
+
+
+_current_usage: ContextVar[PromptUsage | None] = ContextVar("prompt_usage", default=None)
+
+
+@contextmanager
+def track_prompt_usage() -> Iterator[PromptUsage]:
+    """Collect token usage of the Bedrock calls made inside the block."""
+    usage = PromptUsage()
+    token = _current_usage.set(usage)
+    try:
+        yield usage
+    finally:
+        _current_usage.reset(token)
+
+
+def _record_converse_usage(usage: Dict[str, Any]) -> None:
+    stats = _current_usage.get()
+    if stats is None or not usage:
+        return
+    cached = usage.get("cacheReadInputTokens") or 0
+    written = usage.get("cacheWriteInputTokens") or 0
+    stats.calls += 1
+    # Converse counts cache reads and writes separately from inputTokens
+    stats.prompt_tokens += (usage.get("inputTokens") or 0) + cached + written
+    stats.completion_tokens += usage.get("outputTokens") or 0
+    stats.cached_tokens += cached
+    stats.cache_write_tokens += written
+
+
+def prompt_cache_enabled(model_config: Dict[str, Any]) -> bool:
+    """Whether requests to a custom endpoint should ask for prefix reuse (``cache_prompt``)."""
+    return config.PROMPT_CACHING and bool(model_config.get("prompt_cache", False))
+
+
+def openai_usage(response: Dict[str, Any]) -> Dict[str, Any]:
+    """The usage of an OpenAI-compatible response, with cached prompt tokens as ``cached_tokens``.
+
+    OpenAI and vLLM report them in ``usage.prompt_tokens_details``;
+    llama.cpp reports reused KV-cache tokens as ``timings.cache_n``.
+    """
+    usage = dict(response.get("usage") or {})
+    details = usage.get("prompt_tokens_details") or {}
+    cached = details.get("cached_tokens")
+    if cached is None:
+        cached = (response.get("timings") or {}).get("cache_n")
+    if cached is not None:
+        usage["cached_tokens"] = cached
+    return usage
+
+
+def cache_point_targets(model_id: str) -> tuple:
+    """Parts of a Converse request a model accepts cache points in; empty if it has no prompt caching."""
+    if not config.PROMPT_CACHING:
+        return ()
+    for fragment, targets in config.BEDROCK_CACHE_POINTS.items():
+        if fragment in model_id:
+            return targets
+    return ()
+
+
+def _with_cache_point(blocks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    if not blocks or "cachePoint" in blocks[-1]:
+        return blocks
+    return [*blocks, CACHE_POINT]
+
+
+def add_cache_points(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Converse parameters with cache points after the system prompt, tools and latest message.
+
+    The caller's parameters are not modified.
+    """
+    targets = cache_point_targets(params.get("modelId", ""))
+    if not targets:
+        return params
+    params = dict(params)
+    if "system" in targets and params.get("system"):
+        params["system"] = _with_cache_point(params["system"])
+    if "tools" in targets and (params.get("toolConfig") or {}).get("tools"):
+        params["toolConfig"] = {**params["toolConfig"], "tools": _with_cache_point(params["toolConfig"]["tools"])}
+    if "messages" in targets and params.get("messages"):
+        # Caching through the latest message lets the next turn reuse the whole history
+        *history, latest = params["messages"]
+        params["messages"] = [*history, {**latest, "content": _with_cache_point(latest.get("content") or [])}]
+    return params
+
+
+class PromptCachingBedrockClient:
+    """Proxy around a ``bedrock-runtime`` client that adds Converse cache points and records usage.
+
+    It is the outermost wrapper, so cassettes hold the requests as sent and
+    replayed responses are accounted like live ones.
+    """
+
+    def __init__(self, client: Any):
+        self._client = client
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._client, name)
+
+    def converse(self, **kwargs) -> Dict[str, Any]:
+        response = self._client.converse(**add_cache_points(kwargs))
+        _record_converse_usage(response.get("usage") or {})
+        return response
+
+    def converse_stream(self, **kwargs) -> Dict[str, Any]:
+        response = self._client.converse_stream(**add_cache_points(kwargs))
+        return {**response, "stream": self._metered(response["stream"])}
+
+    @staticmethod
+    def _metered(stream):
+        """Pass stream events through, recording the usage of the final metadata event."""
+        for event in stream:
+            if "metadata" in event:
+                _record_converse_usage(event["metadata"].get("usage") or {})
+            yield event
@@ -0,0 +1,305 @@
+"""Per-model request/token rate limiting with throttling-aware retries.
+
+Every adapter's model calls go through one of two wrappers: an httpx
+transport for OpenAI-compatible endpoints, or a proxy around boto3
+``bedrock-runtime`` clients. Both acquire the model's RPM/TPM budget before
+sending, charge the budget with the ``usage`` the model reports, and retry
+429/ThrottlingException responses with jittered exponential backoff. Time
+spent waiting is accumulated in the current evaluation's ThrottleStats so it
+can be reported separately from model latency.
+"""
+
+import asyncio
+import json
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, Tuple
+
+import httpx
+
+import config
+
+logger = logging.getLogger(__name__)
+
+# Bedrock error codes that mean "slow down" rather than "failed"
+THROTTLING_ERROR_CODES = {"ThrottlingException", "TooManyRequestsException", "ServiceUnavailableException"}
+THROTTLING_STATUS_CODES = {429}
+
+
+@dataclass
+class ThrottleStats:
+    """Time spent waiting on rate limits and throttling backoff."""
+    wait_time: float = 0.0
+    retries: int = 0
+
+
+_current_stats: ContextVar[ThrottleStats | None] = ContextVar("throttle_stats", default=None)
+
+
+@contextmanager
+def track_throttling() -> Iterator[ThrottleStats]:
+    """Collect throttling waits of the model calls made inside the block."""
+    stats = ThrottleStats()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+def _record_wait(seconds: float, retry: bool = False) -> None:
+    stats = _current_stats.get()
+    if stats is None:
+        return
+    stats.wait_time += seconds
+    if retry:
+        stats.retries += 1
+
+
+def backoff_delay(retry: int, retry_after: float | None = None) -> float:
+    """Full-jitter exponential backoff, never shorter than a server-provided Retry-After."""
+    ceiling = min(config.THROTTLE_BACKOFF_CAP, config.THROTTLE_BACKOFF_BASE * 2 ** retry)
+    delay = random.uniform(0, ceiling)
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return delay
+
+
+def estimate_tokens(body: bytes | str) -> int:
+    """Rough prompt size (~4 bytes per token) used until the real usage is known."""
+    return max(1, len(body) // 4)
+
+
+class TokenBucket:
+    """Budget refilled continuously at ``per_minute``, holding at most a minute's worth.
+
+    ``take`` reserves immediately and may drive the level negative; the
+    caller then waits until the debt would have been refilled. Reserving up
+    front keeps concurrent callers in FIFO order without polling.
+    """
+
+    def __init__(self, per_minute: float):
+        self.rate = per_minute / 60.0
+        self.capacity = float(per_minute)
+        self.level = float(per_minute)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()  # Bedrock calls are made from worker threads
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def take(self, amount: float) -> float:
+        """Reserve ``amount`` and return how long to wait before using it."""
+        with self._lock:
+            self._refill()
+            self.level -= amount
+            return max(0.0, -self.level / self.rate)
+
+    def adjust(self, amount: float) -> None:
+        """Charge (positive) or refund (negative) after the fact."""
+        with self._lock:
+            self._refill()
+            self.level = min(self.capacity, self.level - amount)
+
+
+class ModelRateLimiter:
+    """RPM and TPM budgets for one model."""
+
+    def __init__(self, rpm: float | None = None, tpm: float | None = None):
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+
+    def reserve(self, estimated_tokens: int) -> float:
+        """Reserve one request and its estimated tokens; return the wait in seconds."""
+        wait = 0.0
+        if self.requests is not None:
+            wait = max(wait, self.requests.take(1))
+        if self.tokens is not None:
+            wait = max(wait, self.tokens.take(estimated_tokens))
+        return wait
+
+    def record_usage(self, estimated_tokens: int, actual_tokens: int | None) -> None:
+        """Replace the estimate with the token count the model reported."""
+        if self.tokens is not None and actual_tokens is not None:
+            self.tokens.adjust(actual_tokens - estimated_tokens)
+
+    async def acquire(self, estimated_tokens: int) -> None:
+        wait = self.reserve(estimated_tokens)
+        if wait > 0:
+            _record_wait(wait)
+            await asyncio.sleep(wait)
+
+    def acquire_sync(self, estimated_tokens: int) -> None:
+        wait = self.reserve(estimated_tokens)
+        if wait > 0:
+            _record_wait(wait)
+            time.sleep(wait)
+
+
+_limiters: Dict[str, ModelRateLimiter | None] = {}
+_limiters_lock = threading.Lock()
+_share = 1
+
+
+def set_rate_limit_share(shared_by: int) -> None:
+    """Split the configured budgets evenly between ``shared_by`` worker processes."""
+    global _share
+    with _limiters_lock:
+        _share = max(1, shared_by)
+        _limiters.clear()
+
+
+def get_rate_limiter(model: str) -> ModelRateLimiter | None:
+    """Return the limiter for a model (as named in API requests), or None if unlimited."""
+    with _limiters_lock:
+        if model not in _limiters:
+            limits = None
+            for key, value in config.RATE_LIMITS.items():
+                # Keys may use the same {account_id} placeholder as the model list
+                if model == key or ("{account_id}" in key and model == config.resolve_model(key)):
+                    limits = value
+                    break
+            if limits is None:
+                limits = config.DEFAULT_RATE_LIMIT
+            if limits and (limits.get("rpm") or limits.get("tpm")):
+                _limiters[model] = ModelRateLimiter(
+                    rpm=limits["rpm"] / _share if limits.get("rpm") else None,
+                    tpm=limits["tpm"] / _share if limits.get("tpm") else None,
+                )
+            else:
+                _limiters[model] = None
+        return _limiters[model]
+
+
+def _retry_after(response: httpx.Response) -> float | None:
+    value = response.headers.get("retry-after")
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+class RateLimitedTransport(httpx.AsyncBaseTransport):
+    """httpx transport that rate limits and retries OpenAI-compatible model calls.
+
+    The model is read from the JSON request body, so one transport serves
+    every model behind an endpoint.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport | None = None):
+        self._transport = transport or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        body = request.content
+        try:
+            model = json.loads(body).get("model") if body else None
+        except (ValueError, AttributeError):
+            model = None
+        limiter = get_rate_limiter(model) if model else None
+        estimated = estimate_tokens(body)
+
+        retry = 0
+        while True:
+            if limiter is not None:
+                await limiter.acquire(estimated)
+            response = await self._transport.handle_async_request(request)
+
+            if response.status_code in THROTTLING_STATUS_CODES and retry < config.THROTTLE_MAX_RETRIES:
+                # Drain the body so the connection can go back to the pool
+                await response.aread()
+                await response.aclose()
+                if limiter is not None:
+                    # A rejected request consumed no tokens
+                    limiter.record_usage(estimated, 0)
+                delay = backoff_delay(retry, _retry_after(response))
+                logger.warning(f"🐢 {model} throttled (HTTP {response.status_code}), retrying in {delay:.1f}s")
+                _record_wait(delay, retry=True)
+                await asyncio.sleep(delay)
+                retry += 1
+                continue
+
+            if limiter is not None and limiter.tokens is not None:
+                if "json" in response.headers.get("content-type", ""):
+                    await response.aread()
+                    try:
+                        usage = json.loads(response.content).get("usage") or {}
+                    except ValueError:
+                        usage = {}
+                    limiter.record_usage(estimated, usage.get("total_tokens"))
+            return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+def _is_throttling_error(error: Exception) -> bool:
+    response = getattr(error, "response", None)
+    if not isinstance(response, dict):
+        return False
+    return response.get("Error", {}).get("Code") in THROTTLING_ERROR_CODES
+
+
+class RateLimitedBedrockClient:
+    """Proxy around a boto3 ``bedrock-runtime`` client that rate limits Converse calls.
+
+    Everything other than ``converse``/``converse_stream`` is passed through
+    to the wrapped client. Calls are synchronous, as in boto3: frameworks
+    already run them off the event loop.
+    """
+
+    def __init__(self, client: Any):
+        self._client = client
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._client, name)
+
+    def _call(self, operation: str, **kwargs) -> Tuple[Dict[str, Any], ModelRateLimiter | None, int]:
+        model = kwargs.get("modelId", "")
+        limiter = get_rate_limiter(model)
+        estimated = estimate_tokens(json.dumps(
+            {k: kwargs.get(k) for k in ("messages", "system", "toolConfig")}, default=str
+        ))
+
+        retry = 0
+        while True:
+            if limiter is not None:
+                limiter.acquire_sync(estimated)
+            try:
+                return getattr(self._client, operation)(**kwargs), limiter, estimated
+            except Exception as e:
+                if not _is_throttling_error(e) or retry >= config.THROTTLE_MAX_RETRIES:
+                    raise
+                if limiter is not None:
+                    limiter.record_usage(estimated, 0)
+                delay = backoff_delay(retry)
+                logger.warning(f"🐢 {model} throttled ({e.response['Error']['Code']}), retrying in {delay:.1f}s")
+                _record_wait(delay, retry=True)
+                time.sleep(delay)
+                retry += 1
+
+    def converse(self, **kwargs) -> Dict[str, Any]:
+        response, limiter, estimated = self._call("converse", **kwargs)
+        if limiter is not None:
+            limiter.record_usage(estimated, response.get("usage", {}).get("totalTokens"))
+        return response
+
+    def converse_stream(self, **kwargs) -> Dict[str, Any]:
+        response, limiter, estimated = self._call("converse_stream", **kwargs)
+        if limiter is not None:
+            response = {**response, "stream": self._metered(response["stream"], limiter, estimated)}
+        return response
+
+    @staticmethod
+    def _metered(stream, limiter: ModelRateLimiter, estimated: int):
+        """Pass stream events through, charging the usage from the final metadata event."""
+        for event in stream:
+            if "metadata" in event:
+                limiter.record_usage(estimated, event["metadata"].get("usage", {}).get("totalTokens"))
+            yield event
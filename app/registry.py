@@ -0,0 +1,104 @@
+"""Discovery of puzzle checkers and framework agents."""
+
+import logging
+import time
+from functools import lru_cache
+from pathlib import Path
+from types import ModuleType
+from typing import Callable, Dict, Set, Tuple
+
+from app.import_profile import timed_import
+from app.utils import instrument_loaded_frameworks
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+
+class PluginRegistry:
+    """Entry points found under ``puzzles/*/checker.py`` and ``frameworks/*/*/agent.py``.
+
+    Discovery only scans the tree; a module is imported when one of its cells
+    is scheduled (see ``preload``), so frameworks that are not scheduled (and
+    their SDKs) are never loaded. An implementation that fails to import (typically a missing
+    optional dependency) makes its runs fail with the import error rather
+    than silently disappearing from the report.
+    """
+
+    def __init__(self, root: Path = PROJECT_ROOT):
+        self.root = Path(root)
+        self.puzzles: Set[str] = set()
+        self.implementations: Set[Tuple[str, str]] = set()  # (framework, puzzle)
+        self._modules: Dict[str, ModuleType] = {}
+        self._import_errors: Dict[str, str] = {}
+
+    def discover(self) -> "PluginRegistry":
+        """Scan the tree for puzzle checkers and framework agents."""
+        self.puzzles = {path.parent.name for path in self.root.glob("puzzles/*/checker.py")}
+        self.implementations = {
+            (path.parent.parent.name, path.parent.name)
+            for path in self.root.glob("frameworks/*/*/agent.py")
+        }
+        logger.info(
+            f"🔌 Found {len(self.puzzles)} puzzle checkers and "
+            f"{len(self.implementations)} agent implementations"
+        )
+        return self
+
+    def unavailable_reason(self, puzzle: str, framework: str) -> str | None:
+        """Explain why a cell cannot run, or return None if it has an implementation."""
+        if puzzle not in self.puzzles:
+            return f"No checker for {puzzle} puzzle"
+        if (framework, puzzle) not in self.implementations:
+            return f"No implementation for {puzzle} puzzle"
+        return None
+
+    def _module(self, module_name: str) -> ModuleType:
+        """Import a module on first use."""
+        if module_name in self._modules:
+            return self._modules[module_name]
+        if module_name in self._import_errors:
+            raise ImportError(self._import_errors[module_name])
+
+        start = time.perf_counter()
+        try:
+            module = timed_import(module_name)
+        except Exception as e:
+            logger.warning(f"⚠️  Could not import {module_name}: {e}")
+            self._import_errors[module_name] = str(e)
+            raise
+        logger.info(f"📦 Loaded {module_name} in {(time.perf_counter() - start) * 1000:.0f} ms")
+        instrument_loaded_frameworks()
+
+        self._modules[module_name] = module
+        return module
+
+    def _load(self, module_name: str, attribute: str) -> Callable:
+        """Import a module on first use and return its entry point."""
+        return getattr(self._module(module_name), attribute)
+
+    def checker(self, puzzle: str) -> Callable:
+        """Return the puzzle's ``check`` function."""
+        return self._load(f"puzzles.{puzzle}.checker", "check")
+
+    def agent(self, framework: str, puzzle: str) -> Callable:
+        """Return the framework's ``run_agent`` function for the puzzle."""
+        return self._load(f"frameworks.{framework}.{puzzle}.agent", "run_agent")
+
+    def preload(self, framework: str, puzzle: str) -> None:
+        """Import a cell's checker and agent now; import errors surface again when its runs load them."""
+        for module_name in (f"puzzles.{puzzle}.checker", f"frameworks.{framework}.{puzzle}.agent"):
+            try:
+                self._module(module_name)
+            except Exception:
+                pass  # Logged and cached by _module
+
+    def runs_on_threads(self, framework: str, puzzle: str) -> bool:
+        """Whether the agent declares ``SYNC_AGENT = True``, running on the sync-agent threads."""
+        return bool(getattr(self._module(f"frameworks.{framework}.{puzzle}.agent"), "SYNC_AGENT", False))
+
+
+@lru_cache(maxsize=None)
+def get_registry() -> PluginRegistry:
+    """Return this process's registry, discovering plugins on first use."""
+    return PluginRegistry().discover()
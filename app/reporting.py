@@ -5,17 +5,19 @@ import logging
 import re
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Any
-from dataclasses import dataclass
+from typing import Dict, List, Any, Tuple
+from dataclasses import asdict, dataclass, field
 from jinja2 import Template
 
+from app.stats import wilson_interval
+
 logger = logging.getLogger(__name__)
 
 
 def redact_aws_account(s: str) -> str:
     """Redact AWS account numbers in ARNs and similar strings."""
-    # Replace 12-digit numbers in ARNs with '***'
-    return re.sub(r'(arn:aws:bedrock:[^:]+:)(\d{12})(:inference-profile/)', r'\1***\3', s)
+    # Replace 12-digit numbers (or the unresolved {account_id} placeholder) in ARNs with '***'
+    return re.sub(r'(arn:aws:bedrock:[^:]+:)(\d{12}|\{account_id\})(:inference-profile/)', r'\1***\3', s)
 
 
 @dataclass
@@ -25,11 +27,39 @@ class EvaluationResult:
     framework: str
     model: str
     run_number: int
-    status: str  # "Pass" or "Fail"
+    status: str  # "Pass", "Fail", "Timeout" or "Not Available"
     error_message: str | None = None
     execution_time: float | None = None
     prompt_tokens: int | None = None
     prediction_tokens: int | None = None
+    cached_prompt_tokens: int | None = None  # Prompt tokens read from the provider's prompt cache, where reported
+    cache_write_tokens: int | None = None  # Prompt tokens written to the cache (Bedrock cache points)
+    context_policy: str | None = None  # How the agent loop compacted its history, where it supports that
+    tool_time: float | None = None  # Seconds of tool execution, summed over calls (adapters using app.tool_dispatch)
+    tool_wall_time: float | None = None  # Seconds the run actually spent on tools, with independent calls overlapped
+    tool_calls: int | None = None  # Calls of tools declared with app.tool_meta
+    redundant_tool_calls: int | None = None  # Repeated read-only calls with no state change in between
+    tool_latency: str | None = None  # Simulated tool latency profile (app.tool_latency)
+    simulated_tool_time: float | None = None  # Seconds of execution_time spent in simulated tool waits
+    attempts: int = 1  # Agent attempts started, including hedged duplicates
+    throttle_time: float = 0.0  # Seconds spent waiting on rate limits and throttling backoff
+    throttle_retries: int = 0  # Model calls retried after being throttled
+    cache_hits: int = 0  # Cached model calls served from disk
+    cache_misses: int = 0  # Cached model calls that reached the endpoint
+    cache_coalesced: int = 0  # Cached model calls that shared an identical in-flight call
+    from_cache: bool = False  # Some model responses were replayed from the cache; timing is not live
+    fanout_shared: bool = False  # First turn was a choice of a request shared with the cell's other runs
+    fanout_saved_prompt_tokens: int = 0  # Prefill not paid because another run made the shared request
+    fanout_saved_time: float = 0.0  # Seconds of endpoint time of that request
+    loop_blocked_time: float = 0.0  # Seconds the adapter held the event loop in steps over LOOP_BLOCK_THRESHOLD
+    longest_loop_step: float = 0.0  # Seconds of the adapter's longest step on the event loop
+    sync_queue_time: float | None = None  # Seconds waited for a sync-agent thread before the clock started
+    abandoned_threads: int = 0  # Sync-agent threads left running by cancelled attempts
+    # Streaming latency (raw_openai_api with streaming enabled), averaged over the run's model calls
+    time_to_first_token: float | None = None  # seconds
+    inter_token_latency: float | None = None  # seconds per token after the first chunk (see StreamCallMetrics)
+    decode_tokens_per_sec: float | None = None
+    call_metrics: List[Dict[str, Any]] = field(default_factory=list)  # Per streamed call
 
 
 @dataclass
@@ -55,6 +85,95 @@ def collect_results(results: List[EvaluationResult]) -> Dict[str, Any]:
     return organized
 
 
+def collect_cell_metrics(results: List[EvaluationResult]) -> Dict[str, Dict[Tuple[str, str], Dict[str, Any]]]:
+    """Aggregate run-level metrics as: puzzle -> (framework, model) -> metrics.
+
+    Includes the 95% Wilson interval on each cell's pass rate and, for
+    streamed runs, mean time-to-first-token, inter-token latency and decode rate.
+    Runs served from the cache are counted but left out of latency means.
+    Fan-out savings are summed over the runs that shared a first turn.
+    Prompt cache usage is averaged over the runs that reported it, and
+    prompt tokens and time per context policy over the runs that used one.
+    Tool time is summed over the runs whose adapter dispatched its tool calls.
+    """
+    def mean(values: List[float | None]) -> float | None:
+        values = [v for v in values if v is not None]
+        return sum(values) / len(values) if values else None
+
+    cells: Dict[str, Dict[Tuple[str, str], List[EvaluationResult]]] = {}
+    for result in results:
+        cells.setdefault(result.puzzle, {}).setdefault((result.framework, result.model), []).append(result)
+
+    metrics = {}
+    for puzzle, by_cell in cells.items():
+        metrics[puzzle] = {}
+        for key, runs in by_cell.items():
+            testable = [r for r in runs if r.status != "Not Available"]
+            live = [r for r in runs if not r.from_cache]
+            cache_reported = [r for r in runs if r.cached_prompt_tokens is not None]
+            cache_prompt_total = sum(r.prompt_tokens or 0 for r in cache_reported)
+            policy_runs = [r for r in runs if r.context_policy is not None]
+            tool_runs = [r for r in runs if r.tool_time is not None]
+            call_runs = [r for r in runs if r.tool_calls is not None]
+            latency_runs = [r for r in runs if r.simulated_tool_time is not None]
+            tool_calls = sum(r.tool_calls for r in call_runs)
+            passes = len([r for r in testable if r.status == "Pass"])
+            ci_low, ci_high = wilson_interval(passes, len(testable)) if testable else (None, None)
+            metrics[puzzle][key] = {
+                "ci_low": ci_low,
+                "ci_high": ci_high,
+                "timeouts": sum(1 for r in runs if r.status == "Timeout"),
+                "extra_attempts": sum(max(0, (r.attempts or 1) - 1) for r in runs),
+                "throttle_time": sum(r.throttle_time or 0.0 for r in runs),
+                "throttle_retries": sum(r.throttle_retries or 0 for r in runs),
+                "cached_runs": sum(1 for r in runs if r.from_cache),
+                "prompt_cache_runs": len(cache_reported),
+                "avg_prompt_tokens": mean([r.prompt_tokens for r in cache_reported]),
+                "avg_cached_tokens": mean([r.cached_prompt_tokens for r in cache_reported]),
+                "avg_cache_write_tokens": mean([r.cache_write_tokens for r in cache_reported]),
+                "cached_share": (
+                    sum(r.cached_prompt_tokens for r in cache_reported) / cache_prompt_total
+                    if cache_prompt_total else None
+                ),
+                "avg_cache_run_time": mean([r.execution_time for r in cache_reported if not r.from_cache]),
+                "context_policies": ", ".join(sorted({r.context_policy for r in policy_runs})),
+                "policy_runs": len(policy_runs),
+                "policy_prompt_tokens": sum(r.prompt_tokens or 0 for r in policy_runs),
+                "policy_avg_prompt_tokens": mean([r.prompt_tokens for r in policy_runs]),
+                "policy_avg_time": mean([r.execution_time for r in policy_runs if not r.from_cache]),
+                "tool_runs": len(tool_runs),
+                "tool_time": sum(r.tool_time for r in tool_runs),
+                "tool_wall_time": sum(r.tool_wall_time for r in tool_runs),
+                "latency_profiles": ", ".join(sorted({r.tool_latency for r in latency_runs})),
+                "latency_runs": len(latency_runs),
+                "avg_simulated_time": mean([r.simulated_tool_time for r in latency_runs]),
+                "latency_avg_time": mean([r.execution_time for r in latency_runs if not r.from_cache]),
+                "latency_avg_time_excluded": mean([
+                    max(r.execution_time - r.simulated_tool_time, 0.0) for r in latency_runs if not r.from_cache
+                ]),
+                "call_runs": len(call_runs),
+                "avg_tool_calls": mean([r.tool_calls for r in call_runs]),
+                "avg_redundant_calls": mean([r.redundant_tool_calls for r in call_runs]),
+                "redundant_share": (
+                    sum(r.redundant_tool_calls for r in call_runs) / tool_calls if tool_calls else None
+                ),
+                "fanout_runs": sum(1 for r in runs if r.fanout_shared),
+                "fanout_saved_prompt_tokens": sum(r.fanout_saved_prompt_tokens for r in runs),
+                "fanout_saved_time": sum(r.fanout_saved_time for r in runs),
+                "blocking_runs": sum(1 for r in runs if r.loop_blocked_time),
+                "avg_loop_blocked_time": mean([r.loop_blocked_time for r in testable]),
+                "longest_loop_step": max((r.longest_loop_step for r in runs), default=0.0),
+                "threaded_runs": sum(1 for r in runs if r.sync_queue_time is not None),
+                "avg_sync_queue_time": mean([r.sync_queue_time for r in runs]),
+                "max_sync_queue_time": max((r.sync_queue_time or 0.0 for r in runs), default=0.0),
+                "abandoned_threads": sum(r.abandoned_threads for r in runs),
+                "time_to_first_token": mean([r.time_to_first_token for r in live]),
+                "inter_token_latency": mean([r.inter_token_latency for r in live]),
+                "decode_tokens_per_sec": mean([r.decode_tokens_per_sec for r in live]),
+            }
+    return metrics
+
+
 def generate_markdown_report(summary: EvaluationSummary, output_path: Path) -> None:
     """Generate a Markdown report suitable for GitHub Pages, with token columns."""
 
@@ -65,16 +184,21 @@ Generated on: {{ timestamp }}
 ## Summary
 
 Total evaluations: {{ total_runs }}
+{%- set cached_count = results | selectattr('from_cache') | list | length %}
+{%- if cached_count %}
+
+Served from cache: {{ cached_count }} runs (excluded from Avg Time and latency columns)
+{%- endif %}
 
 ## Results by Puzzle
-{%- set status_emoji = {'Pass': '✅', 'Fail': '❌', 'Not Available': '⚪'} -%}
+{%- set status_emoji = {'Pass': '✅', 'Fail': '❌', 'Timeout': '⏱️', 'Not Available': '⚪'} -%}
 {%- for puzzle_name, results in organized_results.items() %}
 
 ### {{ puzzle_name | title }}
 
 {% set max_runs = results.values() | map('length') | max -%}
-| Framework | Model{%- for i in range(1, max_runs+1) -%} | Run {{ i }}{%- endfor -%} | Success Rate | Prompt Tokens | Prediction Tokens | Avg Time (s) |
-|-----------|-------{%- for i in range(1, max_runs+1) -%}|-------{%- endfor -%}|--------------|--------------|------------------|--------------|
+| Framework | Model{%- for i in range(1, max_runs+1) -%} | Run {{ i }}{%- endfor -%} | Success Rate | 95% CI | Prompt Tokens | Prediction Tokens | Avg Time (s) |
+|-----------|-------{%- for i in range(1, max_runs+1) -%}|-------{%- endfor -%}|--------------|--------|--------------|------------------|--------------|
 {% for (framework, model), runs in results.items() %}
 {%- set run_objs = results_all | selectattr('framework', 'equalto', framework) | selectattr('model', 'equalto', model) | selectattr('puzzle', 'equalto', puzzle_name) | list -%}
 {%- set prompt_sum = run_objs | map(attribute='prompt_tokens') | select('number') | sum -%}
@@ -82,17 +206,173 @@ Total evaluations: {{ total_runs }}
 {%- set n = run_objs | length -%}
 {%- set avg_prompt = (prompt_sum / n) if n > 0 else 'N/A' -%}
 {%- set avg_pred = (pred_sum / n) if n > 0 else 'N/A' -%}
-{%- set avg_time = (run_objs | map(attribute='execution_time') | select('number') | sum / n) if n > 0 else 'N/A' -%}
-| {{ framework }} | {{ model }}{%- for i in range(max_runs) -%} | {{ status_emoji.get(runs[i], runs[i]) if runs|length > i else 'N/A' }}{%- endfor -%} | {{ ((runs | select('equalto', 'Pass') | list | length) / (runs | select('ne', 'Not Available') | list | length) * 100) | round(1) if (runs | select('ne', 'Not Available') | list | length) > 0 else 'N/A' }}% | {{ avg_prompt if avg_prompt != 'N/A' else '' }} | {{ avg_pred if avg_pred != 'N/A' else '' }} | {{ avg_time | round(2) if avg_time != 'N/A' else '' }} |
+{%- set times = run_objs | rejectattr('from_cache') | map(attribute='execution_time') | select('number') | list -%}
+{%- set avg_time = (times | sum / times | length) if times else 'N/A' -%}
+{%- set cell = cell_metrics[puzzle_name][(framework, model)] -%}
+{%- set ci = ((cell.ci_low * 100) | round(0) | int) ~ '–' ~ ((cell.ci_high * 100) | round(0) | int) ~ '%' if cell.ci_low is not none else 'N/A' -%}
+| {{ framework }} | {{ model }}{%- for i in range(max_runs) -%} | {{ status_emoji.get(runs[i], runs[i]) if runs|length > i else 'N/A' }}{%- endfor -%} | {{ ((runs | select('equalto', 'Pass') | list | length) / (runs | select('ne', 'Not Available') | list | length) * 100) | round(1) if (runs | select('ne', 'Not Available') | list | length) > 0 else 'N/A' }}% | {{ ci }} | {{ avg_prompt if avg_prompt != 'N/A' else '' }} | {{ avg_pred if avg_pred != 'N/A' else '' }} | {{ avg_time | round(2) if avg_time != 'N/A' else '' }} |
+{% endfor %}
+
+{%- endfor %}
+
+## Overhead
+{%- for puzzle_name, cells in cell_metrics.items() %}
+
+### {{ puzzle_name | title }}
+
+| Framework | Model | Timeouts | Extra Attempts | Throttle Time (s) | Throttle Retries | Cached Runs |
+|-----------|-------|----------|----------------|-------------------|------------------|-------------|
+{% for (framework, model), metrics in cells.items() -%}
+| {{ framework }} | {{ model }} | {{ metrics.timeouts }} | {{ metrics.extra_attempts }} | {{ metrics.throttle_time | round(2) }} | {{ metrics.throttle_retries }} | {{ metrics.cached_runs }} |
+{% endfor %}
+{%- endfor %}
+
+{%- if results | selectattr('time_to_first_token') | list %}
+
+## Streaming Latency
+
+Inter-token latency and decode rate count the tokens after the first chunk; when the server reports no per-chunk usage, the first chunk's tokens are estimated from its share of the streamed characters.
+{%- for puzzle_name, cells in cell_metrics.items() if cells.values() | selectattr('time_to_first_token') | list %}
+
+### {{ puzzle_name | title }}
+
+| Framework | Model | TTFT (s) | Inter-token (ms) | Decode (tok/s) |
+|-----------|-------|----------|------------------|----------------|
+{% for (framework, model), metrics in cells.items() if metrics.time_to_first_token is not none -%}
+| {{ framework }} | {{ model }} | {{ metrics.time_to_first_token | round(3) }} | {{ (metrics.inter_token_latency * 1000) | round(1) if metrics.inter_token_latency is not none else '' }} | {{ metrics.decode_tokens_per_sec | round(1) if metrics.decode_tokens_per_sec is not none else '' }} |
+{% endfor %}
+{%- endfor %}
+{%- endif %}
+
+{%- if results | selectattr('cached_prompt_tokens', 'number') | list %}
+
+## Prompt Caching
+{%- for puzzle_name, cells in cell_metrics.items() if cells.values() | selectattr('prompt_cache_runs') | list %}
+
+### {{ puzzle_name | title }}
+
+| Framework | Model | Runs | Avg Prompt Tokens | Avg Cached Tokens | Cached Share | Avg Cache Writes | Avg Time (s) |
+|-----------|-------|------|-------------------|-------------------|--------------|------------------|--------------|
+{% for (framework, model), metrics in cells.items() if metrics.prompt_cache_runs -%}
+| {{ framework }} | {{ model }} | {{ metrics.prompt_cache_runs }} | {{ metrics.avg_prompt_tokens | round(0) | int if metrics.avg_prompt_tokens is not none else '' }} | {{ metrics.avg_cached_tokens | round(0) | int }} | {{ ((metrics.cached_share * 100) | round(1) ~ '%') if metrics.cached_share is not none else '' }} | {{ metrics.avg_cache_write_tokens | round(0) | int if metrics.avg_cache_write_tokens is not none else '' }} | {{ metrics.avg_cache_run_time | round(2) if metrics.avg_cache_run_time is not none else '' }} |
 {% endfor %}
+{%- endfor %}
+{%- endif %}
+
+{%- if results | selectattr('tool_time', 'number') | list %}
+
+## Tool Execution
+{%- for puzzle_name, cells in cell_metrics.items() if cells.values() | selectattr('tool_runs') | list %}
+
+### {{ puzzle_name | title }}
 
+| Framework | Model | Runs | Summed Tool Time (s) | Tool Wall Time (s) | Saved by Concurrency (s) |
+|-----------|-------|------|----------------------|--------------------|--------------------------|
+{% for (framework, model), metrics in cells.items() if metrics.tool_runs -%}
+| {{ framework }} | {{ model }} | {{ metrics.tool_runs }} | {{ metrics.tool_time | round(2) }} | {{ metrics.tool_wall_time | round(2) }} | {{ ([metrics.tool_time - metrics.tool_wall_time, 0] | max) | round(2) }} |
+{% endfor %}
 {%- endfor %}
+{%- endif %}
+
+{%- if results | selectattr('simulated_tool_time', 'number') | list %}
+
+## Simulated Tool Latency
+{%- for puzzle_name, cells in cell_metrics.items() if cells.values() | selectattr('latency_runs') | list %}
+
+### {{ puzzle_name | title }}
+
+| Framework | Model | Profile | Runs | Avg Simulated (s) | Avg Time (s) | Avg Time excl. Simulated (s) |
+|-----------|-------|---------|------|-------------------|--------------|------------------------------|
+{% for (framework, model), metrics in cells.items() if metrics.latency_runs -%}
+| {{ framework }} | {{ model }} | {{ metrics.latency_profiles }} | {{ metrics.latency_runs }} | {{ metrics.avg_simulated_time | round(2) }} | {{ metrics.latency_avg_time | round(2) if metrics.latency_avg_time is not none else '' }} | {{ metrics.latency_avg_time_excluded | round(2) if metrics.latency_avg_time_excluded is not none else '' }} |
+{% endfor %}
+{%- endfor %}
+{%- endif %}
+
+{%- if results | selectattr('tool_calls', 'number') | list %}
+
+## Agent Efficiency
+{%- for puzzle_name, cells in cell_metrics.items() if cells.values() | selectattr('call_runs') | list %}
+
+### {{ puzzle_name | title }}
+
+| Framework | Model | Runs | Avg Tool Calls | Avg Redundant Calls | Redundant Share |
+|-----------|-------|------|----------------|---------------------|-----------------|
+{% for (framework, model), metrics in cells.items() if metrics.call_runs -%}
+| {{ framework }} | {{ model }} | {{ metrics.call_runs }} | {{ metrics.avg_tool_calls | round(1) }} | {{ metrics.avg_redundant_calls | round(1) }} | {{ ((metrics.redundant_share * 100) | round(1) ~ '%') if metrics.redundant_share is not none else '' }} |
+{% endfor %}
+{%- endfor %}
+{%- endif %}
+
+{%- if results | selectattr('context_policy') | list %}
+
+## Context Management
+{%- for puzzle_name, cells in cell_metrics.items() if cells.values() | selectattr('policy_runs') | list %}
+
+### {{ puzzle_name | title }}
+
+| Framework | Model | Policy | Runs | Total Prompt Tokens | Avg Prompt Tokens | Avg Time (s) |
+|-----------|-------|--------|------|---------------------|-------------------|--------------|
+{% for (framework, model), metrics in cells.items() if metrics.policy_runs -%}
+| {{ framework }} | {{ model }} | {{ metrics.context_policies }} | {{ metrics.policy_runs }} | {{ metrics.policy_prompt_tokens }} | {{ metrics.policy_avg_prompt_tokens | round(0) | int if metrics.policy_avg_prompt_tokens is not none else '' }} | {{ metrics.policy_avg_time | round(2) if metrics.policy_avg_time is not none else '' }} |
+{% endfor %}
+{%- endfor %}
+{%- endif %}
+
+{%- if results | selectattr('loop_blocked_time') | list %}
+
+## Event Loop Blocking
+{%- for puzzle_name, cells in cell_metrics.items() if cells.values() | selectattr('blocking_runs') | list %}
+
+### {{ puzzle_name | title }}
+
+| Framework | Model | Blocking Runs | Avg Blocked (s) | Longest Step (s) |
+|-----------|-------|---------------|-----------------|------------------|
+{% for (framework, model), metrics in cells.items() if metrics.blocking_runs -%}
+| {{ framework }} | {{ model }} | {{ metrics.blocking_runs }} | {{ metrics.avg_loop_blocked_time | round(2) }} | {{ metrics.longest_loop_step | round(2) }} |
+{% endfor %}
+{%- endfor %}
+{%- endif %}
+
+{%- if results | selectattr('sync_queue_time') | list or results | selectattr('abandoned_threads') | list %}
+
+## Sync-Agent Threads
+{%- for puzzle_name, cells in cell_metrics.items() if cells.values() | selectattr('threaded_runs') | list %}
+
+### {{ puzzle_name | title }}
+
+| Framework | Model | Runs | Avg Queued (s) | Max Queued (s) | Abandoned Threads |
+|-----------|-------|------|----------------|----------------|-------------------|
+{% for (framework, model), metrics in cells.items() if metrics.threaded_runs -%}
+| {{ framework }} | {{ model }} | {{ metrics.threaded_runs }} | {{ metrics.avg_sync_queue_time | round(2) }} | {{ metrics.max_sync_queue_time | round(2) }} | {{ metrics.abandoned_threads }} |
+{% endfor %}
+{%- endfor %}
+{%- endif %}
+
+{%- if results | selectattr('fanout_shared') | list %}
+
+## First-Turn Fan-out
+{%- for puzzle_name, cells in cell_metrics.items() if cells.values() | selectattr('fanout_runs') | list %}
+
+### {{ puzzle_name | title }}
+
+| Framework | Model | Shared First Turns | Prefill Tokens Saved | Request Time Saved (s) |
+|-----------|-------|--------------------|----------------------|------------------------|
+{% for (framework, model), metrics in cells.items() if metrics.fanout_runs -%}
+| {{ framework }} | {{ model }} | {{ metrics.fanout_runs }} | {{ metrics.fanout_saved_prompt_tokens }} | {{ metrics.fanout_saved_time | round(2) }} |
+{% endfor %}
+{%- endfor %}
+{%- endif %}
 
 ## Detailed Results
 {%- for result in results %}
 - **{{ result.puzzle }}** / {{ result.framework }} / {{ result.model }} / Run {{ result.run_number }}: {{ status_emoji.get(result.status, result.status) }}
 {%- if result.error_message %}  - Error: {{ result.error_message }}{% endif %}
 {%- if result.execution_time %}  - Time: {{ result.execution_time|round(2) }}s{% endif %}
+{%- if result.attempts > 1 %}  - Attempts: {{ result.attempts }}{% endif %}
+{%- if result.throttle_time %}  - Throttled: {{ result.throttle_time|round(2) }}s{% endif %}
+{%- if result.from_cache %}  - Served from cache{% endif %}
+{%- if result.fanout_shared %}  - Shared first turn{% endif %}
 {%- endfor %}
 
 ---
@@ -129,7 +409,8 @@ Total evaluations: {{ total_runs }}
         organized_results=redacted_organized,
         frameworks=frameworks,
         results=redacted_results,
-        results_all=redacted_results
+        results_all=redacted_results,
+        cell_metrics=collect_cell_metrics(redacted_results)
     )
     output_path.write_text(content)
     logger.info(f"📊 Markdown report generated: {output_path}")
@@ -157,20 +438,14 @@ def generate_json_report(summary: EvaluationSummary, output_path: Path) -> None:
         "timestamp": summary.timestamp.isoformat(),
         "total_runs": summary.total_runs,
         "results": [
-            {
-                "puzzle": r.puzzle,
-                "framework": r.framework,
-                "model": redact_aws_account(r.model),
-                "run_number": r.run_number,
-                "status": r.status,
-                "error_message": r.error_message,
-                "execution_time": r.execution_time,
-                "prompt_tokens": r.prompt_tokens,
-                "prediction_tokens": r.prediction_tokens
-            }
+            {**asdict(r), "model": redact_aws_account(r.model)}
             for r in summary.results
         ],
-        "organized_results": organized_results
+        "organized_results": organized_results,
+        "cell_metrics": {
+            puzzle: {f"{fw}|{redact_aws_account(model)}": m for (fw, model), m in cells.items()}
+            for puzzle, cells in collect_cell_metrics(summary.results).items()
+        }
     }
     output_path.write_text(json.dumps(data, indent=2))
     logger.info(f"📊 JSON report generated: {output_path}")
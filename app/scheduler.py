@@ -0,0 +1,107 @@
+"""Concurrent scheduling of evaluation jobs with per-target concurrency limits."""
+
+import asyncio
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Tuple
+
+
+@dataclass(frozen=True)
+class EvaluationCell:
+    """A (puzzle, framework, model) combination of the evaluation matrix."""
+    index: int  # Position in the plan, used to keep results in a stable order
+    puzzle: str
+    framework: str
+    model: Any  # Bedrock model ID/ARN (str) or custom endpoint config (dict)
+
+
+@dataclass(frozen=True)
+class EvaluationJob:
+    """A single run of a cell."""
+    cell: EvaluationCell
+    run_number: int
+    fanout: Any = field(default=None, compare=False)  # app.fanout.FanoutCell of the cell's initial runs
+
+    @property
+    def puzzle(self) -> str:
+        return self.cell.puzzle
+
+    @property
+    def framework(self) -> str:
+        return self.cell.framework
+
+    @property
+    def model(self) -> Any:
+        return self.cell.model
+
+    @property
+    def order(self) -> Tuple[int, int]:
+        """Sort key that keeps results in plan order."""
+        return (self.cell.index, self.run_number)
+
+
+def model_label(model_config) -> str:
+    """Return the display identifier for a model config."""
+    if isinstance(model_config, dict):
+        return model_config.get("name", "custom_endpoint")
+    return model_config
+
+
+def target_key(model_config) -> str:
+    """Return the key concurrency limits are applied to for a model config.
+
+    Custom endpoints are limited per ``base_url`` (several models usually share
+    one local server), Bedrock models per model ID/ARN.
+    """
+    if isinstance(model_config, dict):
+        return model_config.get("base_url", model_label(model_config))
+    return model_config
+
+
+class ConcurrencyLimiter:
+    """Caps concurrent evaluations globally, per target and per puzzle."""
+
+    def __init__(
+        self,
+        global_limit: int,
+        default_target_limit: int,
+        target_limits: Dict[str, int] | None = None,
+        puzzle_limits: Dict[str, int] | None = None,
+    ):
+        self._global = asyncio.Semaphore(global_limit)
+        self._default_target_limit = default_target_limit
+        self._target_limits = target_limits or {}
+        self._puzzle_limits = puzzle_limits or {}
+        self._targets: Dict[str, asyncio.Semaphore] = {}
+        self._puzzles: Dict[str, asyncio.Semaphore] = {}
+
+    def _target_semaphore(self, key: str) -> asyncio.Semaphore:
+        if key not in self._targets:
+            limit = self._target_limits.get(key, self._default_target_limit)
+            self._targets[key] = asyncio.Semaphore(limit)
+        return self._targets[key]
+
+    def _puzzle_semaphore(self, puzzle: str) -> asyncio.Semaphore | None:
+        if puzzle not in self._puzzle_limits:
+            return None
+        if puzzle not in self._puzzles:
+            self._puzzles[puzzle] = asyncio.Semaphore(self._puzzle_limits[puzzle])
+        return self._puzzles[puzzle]
+
+    @asynccontextmanager
+    async def slot(self, job: EvaluationJob):
+        """Hold a scheduling slot for the job.
+
+        The narrower limits are acquired first so a job waiting on a busy
+        target does not sit on one of the global slots.
+        """
+        puzzle_semaphore = self._puzzle_semaphore(job.puzzle)
+        if puzzle_semaphore is not None:
+            await puzzle_semaphore.acquire()
+        try:
+            async with self._target_semaphore(target_key(job.model)):
+                async with self._global:
+                    yield
+        finally:
+            if puzzle_semaphore is not None:
+                puzzle_semaphore.release()
@@ -0,0 +1,21 @@
+"""Statistics helpers for evaluation results."""
+
+import math
+from typing import Tuple
+
+
+def wilson_interval(successes: int, trials: int, z: float = 1.96) -> Tuple[float, float]:
+    """Wilson score interval for a binomial pass rate.
+
+    Unlike the normal approximation it stays inside [0, 1] and behaves well
+    for the small sample sizes and 0%/100% rates typical of agent runs.
+    Returns (0.0, 1.0) when there are no trials.
+    """
+    if trials <= 0:
+        return 0.0, 1.0
+    p = successes / trials
+    z2 = z * z
+    denominator = 1 + z2 / trials
+    center = (p + z2 / (2 * trials)) / denominator
+    half_width = z * math.sqrt(p * (1 - p) / trials + z2 / (4 * trials * trials)) / denominator
+    return max(0.0, center - half_width), min(1.0, center + half_width)
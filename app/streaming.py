@@ -0,0 +1,185 @@
+"""Streaming (SSE) chat completions with per-call latency metrics."""
+
+import json
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterator, List
+
+import httpx
+
+import config
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StreamCallMetrics:
+    """Latency breakdown of one streamed model call."""
+    time_to_first_token: float  # seconds from sending the request to the first token (queueing + prefill)
+    # Mean seconds per token decoded after the first chunk (usage tokens, not SSE chunks). The tokens of
+    # the first chunk come from per-chunk usage when the server sends it, else are estimated from its
+    # share of the streamed characters
+    inter_token_latency: float | None
+    decode_tokens_per_sec: float | None
+    completion_tokens: int
+    total_time: float
+
+
+_current_calls: ContextVar[List[StreamCallMetrics] | None] = ContextVar("stream_calls", default=None)
+
+
+@contextmanager
+def track_stream_metrics() -> Iterator[List[StreamCallMetrics]]:
+    """Collect metrics of the streamed calls made inside the block."""
+    calls: List[StreamCallMetrics] = []
+    token = _current_calls.set(calls)
+    try:
+        yield calls
+    finally:
+        _current_calls.reset(token)
+
+
+def streaming_enabled(model_config: Dict[str, Any]) -> bool:
+    """Whether a custom endpoint should be called with ``stream: true``."""
+    return bool(model_config.get("stream", config.RAW_OPENAI_STREAMING))
+
+
+def summarize_calls(calls: List[StreamCallMetrics]) -> Dict[str, Any]:
+    """Aggregate per-call metrics into EvaluationResult fields."""
+    if not calls:
+        return {}
+    gaps = [c.inter_token_latency for c in calls if c.inter_token_latency is not None]
+    rates = [c.decode_tokens_per_sec for c in calls if c.decode_tokens_per_sec is not None]
+    return {
+        "time_to_first_token": sum(c.time_to_first_token for c in calls) / len(calls),
+        "inter_token_latency": sum(gaps) / len(gaps) if gaps else None,
+        "decode_tokens_per_sec": sum(rates) / len(rates) if rates else None,
+        "call_metrics": [asdict(c) for c in calls],
+    }
+
+
+def _merge_tool_call_delta(tool_calls: List[Dict[str, Any]], delta: Dict[str, Any]) -> None:
+    """Fold one streamed tool-call fragment into the assembled tool calls."""
+    index = delta.get("index", len(tool_calls))
+    while len(tool_calls) <= index:
+        tool_calls.append({"id": None, "type": "function", "function": {"name": "", "arguments": ""}})
+    call = tool_calls[index]
+    if delta.get("id"):
+        call["id"] = delta["id"]
+    function = delta.get("function") or {}
+    if function.get("name"):
+        call["function"]["name"] += function["name"]
+    if function.get("arguments"):
+        call["function"]["arguments"] += function["arguments"]
+
+
+async def stream_chat_completion(
+    client: httpx.AsyncClient,
+    url: str,
+    payload: Dict[str, Any],
+    headers: Dict[str, str]
+) -> Dict[str, Any]:
+    """POST a chat completion with ``stream: true`` and assemble the full response.
+
+    The returned dict has the same shape as a non-streaming completion, so
+    callers can treat both alike. Timing of the call is appended to the
+    metrics collected by ``track_stream_metrics``.
+    """
+    payload = {**payload, "stream": True, "stream_options": {"include_usage": True}}
+    content_parts: List[str] = []
+    tool_calls: List[Dict[str, Any]] = []
+    token_times: List[float] = []
+    chunk_chars: List[int] = []  # Characters of content and tool-call deltas per chunk with output
+    first_chunk_tokens = None  # From usage sent with the first chunk with output, if any
+    finish_reason = None
+    usage: Dict[str, Any] = {}
+    timings: Dict[str, Any] = {}
+    response_model = None
+
+    start = time.perf_counter()
+    async with client.stream("POST", url, json=payload, headers=headers) as response:
+        if response.status_code != 200:
+            error_text = (await response.aread()).decode(errors="replace")
+            raise Exception(f"API request failed: {response.status_code} - {error_text}")
+
+        async for line in response.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            data = line[len("data:"):].strip()
+            if data == "[DONE]":
+                # Keep reading to the end of the body so the connection can be reused
+                continue
+            chunk = json.loads(data)
+            response_model = chunk.get("model", response_model)
+            if chunk.get("usage"):
+                usage = chunk["usage"]
+            if chunk.get("timings"):  # llama.cpp, including prompt cache reuse
+                timings = chunk["timings"]
+            for choice in chunk.get("choices") or []:
+                delta = choice.get("delta") or {}
+                produced = False
+                chars = 0
+                if delta.get("content"):
+                    content_parts.append(delta["content"])
+                    chars += len(delta["content"])
+                    produced = True
+                for tool_call_delta in delta.get("tool_calls") or []:
+                    _merge_tool_call_delta(tool_calls, tool_call_delta)
+                    function = tool_call_delta.get("function") or {}
+                    chars += len(function.get("name") or "") + len(function.get("arguments") or "")
+                    produced = True
+                if produced:
+                    token_times.append(time.perf_counter())
+                    chunk_chars.append(chars)
+                    if len(token_times) == 1 and chunk.get("usage"):
+                        # Continuous usage stats (e.g. vLLM) count the first chunk's tokens exactly
+                        first_chunk_tokens = chunk["usage"].get("completion_tokens")
+                if choice.get("finish_reason"):
+                    finish_reason = choice["finish_reason"]
+    end = time.perf_counter()
+
+    message: Dict[str, Any] = {"role": "assistant", "content": "".join(content_parts) or None}
+    if tool_calls:
+        message["tool_calls"] = tool_calls
+    completion = {
+        "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+        "usage": usage,
+    }
+    if response_model is not None:
+        completion["model"] = response_model
+    if timings:
+        completion["timings"] = timings
+
+    if token_times:
+        # Servers usually stream one token per chunk; fall back to counting chunks
+        completion_tokens = usage.get("completion_tokens") or len(token_times)
+        decode_time = token_times[-1] - token_times[0]
+        # Per token rather than per chunk: servers may batch tokens into one chunk, and
+        # tool-call argument deltas are not single tokens. Tokens that arrived with the
+        # first chunk were not decoded within decode_time
+        if not usage.get("completion_tokens"):
+            first_chunk_tokens = 1
+        elif first_chunk_tokens is None:
+            total_chars = sum(chunk_chars)
+            share = chunk_chars[0] / total_chars if total_chars else 1 / len(chunk_chars)
+            first_chunk_tokens = max(1, round(completion_tokens * share))
+        decoded = completion_tokens - first_chunk_tokens
+        metrics = StreamCallMetrics(
+            time_to_first_token=token_times[0] - start,
+            inter_token_latency=decode_time / decoded if decoded > 0 and decode_time > 0 else None,
+            # The first token ends prefill; the rest are decode
+            decode_tokens_per_sec=decoded / decode_time if decoded > 0 and decode_time > 0 else None,
+            completion_tokens=completion_tokens,
+            total_time=end - start,
+        )
+        calls = _current_calls.get()
+        if calls is not None:
+            calls.append(metrics)
+        logger.debug(
+            f"Streamed {completion_tokens} tokens: TTFT {metrics.time_to_first_token:.3f}s, "
+            f"{metrics.decode_tokens_per_sec or 0:.1f} tok/s"
+        )
+    return completion
@@ -0,0 +1,101 @@
+"""Dispatch of the tool calls of one model turn, running independent calls concurrently.
+
+Puzzle tools that only read state are marked read-only (see app.tool_meta). When a
+model returns several tool calls in one message, consecutive read-only calls
+run concurrently; a state-mutating call (e.g. ``move_disk``) waits for the
+calls before it and runs alone, so calls after it observe its effect. Results
+are returned in the order the model made the calls.
+
+Per-turn wall time and the summed time of the individual calls are collected
+by ``track_tool_timing``, so the report can show what concurrency saved.
+"""
+
+import asyncio
+import json
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Collection, Dict, Iterator, List
+
+
+@dataclass
+class ToolTiming:
+    """Tool execution time of the turns dispatched inside a ``track_tool_timing`` block."""
+    turns: int = 0
+    calls: int = 0
+    wall_time: float = 0.0  # Seconds from the first call of a turn starting to its last finishing
+    tool_time: float = 0.0  # Seconds of the individual calls, summed
+
+
+_current_timing: ContextVar[ToolTiming | None] = ContextVar("tool_timing", default=None)
+
+
+@contextmanager
+def track_tool_timing() -> Iterator[ToolTiming]:
+    """Collect tool execution time of the turns dispatched inside the block."""
+    timing = ToolTiming()
+    token = _current_timing.set(timing)
+    try:
+        yield timing
+    finally:
+        _current_timing.reset(token)
+
+
+def _batches(tool_calls: List[Dict[str, Any]], read_only_tools: Collection[str]) -> List[List[int]]:
+    """Indices of the calls grouped into runs of read-only calls and single mutating calls."""
+    batches: List[List[int]] = []
+    previous_read_only = False
+    for index, call in enumerate(tool_calls):
+        is_read_only = call["function"]["name"] in read_only_tools
+        if is_read_only and previous_read_only:
+            batches[-1].append(index)
+        else:
+            batches.append([index])
+        previous_read_only = is_read_only
+    return batches
+
+
+async def dispatch_tool_calls(
+    tool_calls: List[Dict[str, Any]],
+    execute: Callable[[str, Dict[str, Any]], Awaitable[Any]],
+    read_only_tools: Collection[str] = (),
+) -> List[Dict[str, Any]]:
+    """Run the tool calls of an assistant message and return their ``tool`` result messages, in call order.
+
+    ``execute(name, arguments)`` runs one call and returns its result, which
+    is JSON-encoded unless it is already a string.
+    """
+    results: List[Any] = [None] * len(tool_calls)
+    durations: List[float] = [0.0] * len(tool_calls)
+
+    async def run(index: int) -> None:
+        function = tool_calls[index]["function"]
+        arguments = json.loads(function["arguments"]) if function.get("arguments") else {}
+        start = time.perf_counter()
+        try:
+            results[index] = await execute(function["name"], arguments)
+        finally:
+            durations[index] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for batch in _batches(tool_calls, read_only_tools):
+        if len(batch) == 1:
+            await run(batch[0])
+        else:
+            await asyncio.gather(*(run(index) for index in batch))
+    timing = _current_timing.get()
+    if timing is not None:
+        timing.turns += 1
+        timing.calls += len(tool_calls)
+        timing.wall_time += time.perf_counter() - start
+        timing.tool_time += sum(durations)
+
+    return [
+        {
+            "role": "tool",
+            "tool_call_id": call["id"],
+            "content": result if isinstance(result, str) else json.dumps(result),
+        }
+        for call, result in zip(tool_calls, results)
+    ]
@@ -0,0 +1,141 @@
+"""Simulated tool latency, selectable per evaluation.
+
+Async puzzle tools stand in for real backends by sleeping through
+:func:`simulate_latency` with their nominal latency. The profile decides
+how long each call actually waits:
+
+- ``nominal``: each tool's own latency (the default)
+- ``zero``: no waiting, for fast CI runs
+- ``fixed:S``: S seconds per call
+- ``lognormal:P50,P99``: sampled from a lognormal with that median and 99th
+  percentile (seconds), seeded by the run number so runs are reproducible
+
+The profile is chosen by a model entry's ``"tool_latency"``, falling back to
+``config.TOOL_LATENCY`` (``run_evaluation.py --tool-latency``). Time spent
+in simulated waits is collected by ``track_simulated_latency`` so the report
+can show execution time with and without it.
+"""
+
+import asyncio
+import math
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Iterator
+
+import config
+
+TOOL_LATENCY_PROFILES = ("nominal", "zero", "fixed", "lognormal")
+
+_Z_99 = 2.3263  # Standard normal quantile of the 99th percentile
+
+
+class LatencyProfile:
+    """Waits each tool's nominal latency; the base of the other profiles."""
+    name = "nominal"
+
+    def delay(self, nominal: float) -> float:
+        return nominal
+
+
+class ZeroLatency(LatencyProfile):
+    name = "zero"
+
+    def delay(self, nominal: float) -> float:
+        return 0.0
+
+
+class FixedLatency(LatencyProfile):
+    def __init__(self, seconds: float):
+        if seconds < 0:
+            raise ValueError("fixed tool latency cannot be negative")
+        self.seconds = seconds
+        self.name = f"fixed:{seconds:g}"
+
+    def delay(self, nominal: float) -> float:
+        return self.seconds
+
+
+class LognormalLatency(LatencyProfile):
+    def __init__(self, p50: float, p99: float, seed: int = 0):
+        if not 0 < p50 <= p99:
+            raise ValueError("lognormal tool latency needs 0 < P50 <= P99")
+        self.mu = math.log(p50)
+        self.sigma = (math.log(p99) - self.mu) / _Z_99
+        self.name = f"lognormal:{p50:g},{p99:g}"
+        self._random = random.Random(seed)
+
+    def delay(self, nominal: float) -> float:
+        return self._random.lognormvariate(self.mu, self.sigma)
+
+
+def parse_tool_latency(spec: str, seed: int = 0) -> LatencyProfile:
+    """The profile named by ``spec``; ``seed`` seeds sampled profiles."""
+    kind, _, argument = (spec or "nominal").partition(":")
+    try:
+        if kind == "nominal":
+            return LatencyProfile()
+        if kind == "zero":
+            return ZeroLatency()
+        if kind == "fixed":
+            return FixedLatency(float(argument))
+        if kind == "lognormal":
+            p50, p99 = (float(value) for value in argument.split(","))
+            return LognormalLatency(p50, p99, seed=seed)
+    except ValueError as e:
+        raise ValueError(f"Invalid tool latency {spec!r}: {e}; use fixed:S or lognormal:P50,P99 (seconds)")
+    raise ValueError(f"Unknown tool latency {spec!r}, expected one of {', '.join(TOOL_LATENCY_PROFILES)}")
+
+
+def get_tool_latency(model_config: Any, seed: int = 0) -> LatencyProfile:
+    """The profile selected for a model entry, or ``config.TOOL_LATENCY``."""
+    spec = model_config.get("tool_latency") if isinstance(model_config, dict) else None
+    return parse_tool_latency(spec or config.TOOL_LATENCY, seed=seed)
+
+
+@dataclass
+class SimulatedLatency:
+    """Simulated tool waits of the calls made inside a ``track_simulated_latency`` block."""
+    profile: LatencyProfile
+    calls: int = 0
+    wait_time: float = 0.0  # Seconds with at least one simulated wait in progress
+    _active: int = 0
+    _busy_since: float = 0.0
+
+
+_current_latency: ContextVar[SimulatedLatency | None] = ContextVar("simulated_latency", default=None)
+
+
+@contextmanager
+def track_simulated_latency(profile: LatencyProfile) -> Iterator[SimulatedLatency]:
+    """Apply ``profile`` to the tool calls made inside the block and collect their waits."""
+    latency = SimulatedLatency(profile)
+    token = _current_latency.set(latency)
+    try:
+        yield latency
+    finally:
+        _current_latency.reset(token)
+
+
+async def simulate_latency(nominal: float) -> None:
+    """Wait as a backend would, per the active profile; ``nominal`` outside an evaluation."""
+    latency = _current_latency.get()
+    if latency is None:
+        await asyncio.sleep(nominal)
+        return
+    delay = latency.profile.delay(nominal)
+    latency.calls += 1
+    if delay <= 0:
+        return
+    # Concurrent tool calls overlap, so only time with any wait in progress is counted
+    if latency._active == 0:
+        latency._busy_since = time.perf_counter()
+    latency._active += 1
+    try:
+        await asyncio.sleep(delay)
+    finally:
+        latency._active -= 1
+        if latency._active == 0:
+            latency.wait_time += time.perf_counter() - latency._busy_since
@@ -0,0 +1,154 @@
+"""Declarative tool metadata and per-session memoization of read-only tools.
+
+Puzzle tools declare how they touch puzzle state with :func:`tool_meta`:
+
+- ``read_only``: no side effects, so calls may overlap (see app.tool_dispatch)
+- ``idempotent``: repeating a call with the same arguments gives the same
+  result as long as the state has not changed
+- ``invalidates``: the call may change the state (e.g. ``move_disk``)
+
+A read-only, idempotent tool given a ``memo`` resolver answers repeated
+calls from the session's :class:`ToolMemo` until an invalidating tool runs,
+skipping the tool's latency and span. Repeats are counted as redundant calls
+whether or not they are served from the memo (``config.TOOL_MEMO``), as a
+signal of how efficiently an agent uses its tools.
+"""
+
+import asyncio
+import copy
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from functools import wraps
+from typing import Any, Callable, Dict, Iterator, Tuple, TypeVar
+
+import config
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+_PLAIN_TYPES = (str, int, float, bool, type(None))
+
+
+@dataclass(frozen=True)
+class ToolMeta:
+    """How a tool touches the puzzle state."""
+    read_only: bool = False
+    idempotent: bool = False
+    invalidates: bool = False
+
+
+class ToolMemo:
+    """Results of a session's read-only tool calls since its state last changed."""
+
+    def __init__(self):
+        self._results: Dict[Tuple[Any, ...], Any] = {}
+
+    def __contains__(self, key: Tuple[Any, ...]) -> bool:
+        return key in self._results
+
+    def get(self, key: Tuple[Any, ...]) -> Any:
+        # Copies, so callers changing a result cannot alter what later calls get
+        return copy.deepcopy(self._results[key])
+
+    def put(self, key: Tuple[Any, ...], result: Any) -> None:
+        self._results[key] = copy.deepcopy(result)
+
+    def clear(self) -> None:
+        self._results.clear()
+
+
+@dataclass
+class ToolCallStats:
+    """Tool calls of a run, and how many repeated a read-only call with nothing changed in between."""
+    calls: int = 0
+    redundant: int = 0
+
+
+_current_stats: ContextVar[ToolCallStats | None] = ContextVar("tool_call_stats", default=None)
+
+
+@contextmanager
+def track_tool_calls() -> Iterator[ToolCallStats]:
+    """Count the metadata-carrying tool calls made inside the block."""
+    stats = ToolCallStats()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+def _record_call(redundant: bool) -> None:
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.calls += 1
+        stats.redundant += redundant
+
+
+def tool_meta(
+    *,
+    read_only: bool = False,
+    idempotent: bool = False,
+    invalidates: bool = False,
+    memo: Callable[..., ToolMemo | None] | None = None,
+) -> Callable[[F], F]:
+    """Attach :class:`ToolMeta` to a tool, memoizing it when it is read-only and idempotent.
+
+    ``memo`` is called with the tool's arguments and returns the memo of the
+    session the call operates on; invalidating tools clear it. Results are
+    keyed on the tool and its plain (str/number/bool/None) arguments, so
+    context objects do not take part.
+    """
+    meta = ToolMeta(read_only=read_only, idempotent=idempotent, invalidates=invalidates)
+
+    def decorator(func: F) -> F:
+        memoizable = memo is not None and read_only and idempotent
+
+        def lookup(args, kwargs) -> Tuple[ToolMemo | None, Tuple[Any, ...], bool]:
+            session_memo = memo(*args, **kwargs) if memo is not None else None
+            key = (
+                func.__name__,
+                tuple(a for a in args if isinstance(a, _PLAIN_TYPES)),
+                tuple(sorted((k, v) for k, v in kwargs.items() if isinstance(v, _PLAIN_TYPES))),
+            )
+            hit = memoizable and session_memo is not None and key in session_memo
+            _record_call(redundant=hit)
+            return session_memo, key, hit
+
+        def remember(session_memo: ToolMemo | None, key, result: Any) -> Any:
+            if session_memo is not None:
+                if memoizable:
+                    session_memo.put(key, result)
+                elif invalidates:
+                    session_memo.clear()
+            return result
+
+        if asyncio.iscoroutinefunction(func):
+            @wraps(func)
+            async def wrapper(*args, **kwargs):
+                session_memo, key, hit = lookup(args, kwargs)
+                if hit and config.TOOL_MEMO:
+                    return session_memo.get(key)
+                return remember(session_memo, key, await func(*args, **kwargs))
+        else:
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                session_memo, key, hit = lookup(args, kwargs)
+                if hit and config.TOOL_MEMO:
+                    return session_memo.get(key)
+                return remember(session_memo, key, func(*args, **kwargs))
+
+        wrapper.tool_meta = meta
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+def get_tool_meta(tool: Callable[..., Any]) -> ToolMeta:
+    """Metadata of a tool; tools without any are treated as state-changing."""
+    return getattr(tool, "tool_meta", ToolMeta())
+
+
+def read_only_names(tools: Dict[str, Callable[..., Any]]) -> Tuple[str, ...]:
+    """Names (as offered to the model) of the tools marked read-only."""
+    return tuple(name for name, tool in tools.items() if get_tool_meta(tool).read_only)
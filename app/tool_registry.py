@@ -0,0 +1,118 @@
+"""Single-source tool declarations with cached bindings for each framework.
+
+Each puzzle declares its tools once in ``puzzles/<name>/tools.py`` as a
+:class:`ToolRegistry` of :class:`ToolSpec` entries: the name offered to the
+model, a description and the arguments' descriptions. The registry builds
+what every framework needs from that, once per process:
+
+- ``openai_tools``: chat-completions ``tools`` schemas (raw_openai_api)
+- ``pydantic_ai_tools()``: pydantic-ai ``Tool`` objects, from function
+  schemas introspected once; new ``Tool`` instances are handed out per agent
+  because pydantic-ai keeps retry counts on them
+- ``strands_tools``: Strands tools wrapping the sync variants
+
+so constructing an agent is a lookup rather than per-run decoration and
+schema introspection, and all frameworks offer the model the same schema.
+"""
+
+import dataclasses
+import inspect
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Any, Callable, Dict, List, Tuple
+
+from app.tool_meta import read_only_names
+
+_JSON_TYPES = {str: "string", int: "integer", float: "number", bool: "boolean"}
+
+
+@dataclass(frozen=True)
+class ToolSpec:
+    """One tool, as offered to the model by every framework."""
+    name: str
+    function: Callable[..., Any]  # Async, taking the run context first
+    description: str
+    sync_function: Callable[..., Any] | None = None  # Context-free variant for sync frameworks (Strands)
+    parameters: Dict[str, str] = field(default_factory=dict)  # Argument name -> description, in order
+
+    def json_schema(self) -> Dict[str, Any]:
+        """JSON schema of the arguments; types come from the function's annotations."""
+        annotations = inspect.signature(self.function).parameters
+        properties = {}
+        for name, description in self.parameters.items():
+            annotation = annotations[name].annotation
+            properties[name] = {"type": _JSON_TYPES.get(annotation, "string"), "description": description}
+        return {"type": "object", "properties": properties, "required": list(self.parameters)}
+
+
+class ToolRegistry:
+    """The tools of a puzzle, with their framework bindings built on first use."""
+
+    def __init__(self, *specs: ToolSpec):
+        self.specs: Dict[str, ToolSpec] = {spec.name: spec for spec in specs}
+
+    @cached_property
+    def functions(self) -> Dict[str, Callable[..., Any]]:
+        """Tool name -> async function."""
+        return {name: spec.function for name, spec in self.specs.items()}
+
+    @cached_property
+    def read_only_names(self) -> Tuple[str, ...]:
+        """Names of the tools declared read-only (see app.tool_meta)."""
+        return read_only_names(self.functions)
+
+    @cached_property
+    def openai_tools(self) -> List[Dict[str, Any]]:
+        """OpenAI chat-completions ``tools``; shared, so callers must not modify it."""
+        return [
+            {
+                "type": "function",
+                "function": {"name": spec.name, "description": spec.description, "parameters": spec.json_schema()},
+            }
+            for spec in self.specs.values()
+        ]
+
+    async def call(self, name: str, ctx: Any, arguments: Dict[str, Any]) -> Any:
+        """Run a tool call made by the model against the run context ``ctx``."""
+        spec = self.specs.get(name)
+        if spec is None:
+            return {"error": f"Unknown function {name!r}"}
+        missing = [argument for argument in spec.parameters if not arguments.get(argument)]
+        if missing:
+            return {"error": f"Missing {', '.join(missing)} parameter"}
+        return await spec.function(ctx, **{argument: arguments[argument] for argument in spec.parameters})
+
+    @cached_property
+    def _pydantic_ai_schemas(self) -> Dict[str, Any]:
+        from pydantic_ai import Tool
+
+        schemas = {}
+        for name, spec in self.specs.items():
+            introspected = Tool(spec.function, takes_ctx=True).function_schema
+            # The registry's schema, so pydantic-ai offers the model what the other frameworks do
+            schemas[name] = dataclasses.replace(
+                introspected, description=spec.description, json_schema=spec.json_schema()
+            )
+        return schemas
+
+    def pydantic_ai_tools(self) -> List[Any]:
+        """Fresh pydantic-ai ``Tool`` objects for one agent, built from the cached function schemas."""
+        from pydantic_ai import Tool
+
+        return [
+            Tool(schema.function, name=name, description=schema.description, function_schema=schema)
+            for name, schema in self._pydantic_ai_schemas.items()
+        ]
+
+    @cached_property
+    def strands_tools(self) -> List[Any]:
+        """Strands tools wrapping the sync variants; shared by all agents."""
+        from strands import tool
+
+        return [
+            tool(name=spec.name, description=spec.description, inputSchema={"json": spec.json_schema()})(
+                spec.sync_function
+            )
+            for spec in self.specs.values()
+            if spec.sync_function is not None
+        ]
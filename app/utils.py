@@ -1,23 +1,30 @@
 """Shared utilities for AgentGym."""
 
 import os
+import sys
 import logging
-from typing import Optional
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Iterator, Optional
 from typing import TypedDict, Any
-import hashlib
-import json
-import diskcache
-
 import logfire
 
 
 # Helper to aggregate OpenAI usage dicts (prompt_tokens, completion_tokens, total_tokens)
-def aggregate_usages(usage_list):
+def aggregate_usages(usage_list, context_policy=None):
     agg = {}
     for k in ("prompt_tokens", "completion_tokens", "total_tokens"):
         agg[k] = sum(u.get(k, 0) for u in usage_list if u)
+    # Prompt tokens served from the provider's prompt cache (see app.prompt_cache), where reported
+    cached = [u["cached_tokens"] for u in usage_list if u and "cached_tokens" in u]
+    if cached:
+        agg["cached_tokens"] = sum(cached)
     # Optionally, include the full list for debugging
     agg["calls"] = usage_list
+    if context_policy is not None:
+        # How the history was compacted (see app.context_policy), so reports can compare policies
+        agg["context_policy"] = context_policy
     return agg
 
 # Shared result type for AgentGym agent frameworks
@@ -26,6 +33,50 @@ class AgentGymAgentResult(TypedDict):
     usage: dict[str, Any]
 
 
+@dataclass(frozen=True)
+class RunContext:
+    """Which run of a cell is executing, and the sampling seed it uses."""
+    run_number: int
+    seed: int | None
+    attempt: int = 1  # Hedged duplicates of the run are attempts 2, 3, ... (see app.hedging)
+    fanout: Any = None  # app.fanout.FanoutCell shared with the cell's other initial runs; Any avoids a circular import
+
+
+_current_run: ContextVar[RunContext | None] = ContextVar("current_run", default=None)
+
+
+@contextmanager
+def run_context(run_number: int, fanout: Any = None, attempt: int = 1) -> Iterator[RunContext]:
+    """Mark the model calls made inside the block as belonging to ``run_number``.
+
+    The seed is ``config.SAMPLING_SEED + run_number``, so each run samples
+    differently but reproducibly; it is None when seeding is disabled.
+    ``attempt`` numbers hedged duplicates of the run, which keep its seed.
+    """
+    import config
+
+    seed = config.SAMPLING_SEED + run_number if config.SAMPLING_SEED is not None else None
+    context = RunContext(run_number=run_number, seed=seed, attempt=attempt, fanout=fanout)
+    token = _current_run.set(context)
+    try:
+        yield context
+    finally:
+        _current_run.reset(token)
+
+
+def current_run() -> RunContext | None:
+    """The run being executed, or None outside an evaluation."""
+    return _current_run.get()
+
+
+def sampling_seed(model_config: dict) -> int | None:
+    """Seed to send with a model request, unless the model entry opts out with ``"seed": False``."""
+    run = current_run()
+    if run is None or model_config.get("seed", True) is False:
+        return None
+    return run.seed
+
+
 
 def setup_aws_environment(profile: str | None = None):
     """Set up AWS environment variable for AWS_PROFILE only."""
@@ -65,11 +116,26 @@ def setup_logfire(
         )
         logfire.info("Logfire configured for local development (no token provided)")
 
-    logfire.instrument_pydantic_ai()
+    instrument_loaded_frameworks()
     logfire.instrument_httpx(capture_all=True)
     logfire.instrument_aiohttp_client(capture_all=True)
 
 
+_pydantic_ai_instrumented = False
+
+
+def instrument_loaded_frameworks() -> None:
+    """Instrument pydantic-ai with Logfire once a framework module has imported it.
+
+    Instrumenting eagerly would import pydantic-ai at startup even for runs
+    that never schedule a pydantic-ai framework.
+    """
+    global _pydantic_ai_instrumented
+    if not _pydantic_ai_instrumented and "pydantic_ai" in sys.modules:
+        logfire.instrument_pydantic_ai()
+        _pydantic_ai_instrumented = True
+
+
 def setup_logging(level: int = logging.INFO):
     """Configure logging for the application."""
     # Remove all handlers associated with the root logger to ensure correct line numbers
@@ -89,28 +155,3 @@ def setup_logging(level: int = logging.INFO):
     boto_logger.setLevel(logging.INFO)  # Keep boto3 at INFO to avoid noise
     
     return logging.getLogger(__name__)
-
-
-_global_cache = diskcache.Cache('./.cache')
-
-def _make_cache_key_generic(func, args, kwargs):
-    # Canonicalize all args/kwargs to a stable JSON string, then hash
-    key_data = {
-        "func_module": func.__module__,
-        "func_name": func.__name__,
-        "args": args,
-        "kwargs": kwargs,
-    }
-    key_str = json.dumps(key_data, sort_keys=True, default=str, separators=(",", ":"))
-    return hashlib.sha256(key_str.encode()).hexdigest()
-    
-def disk_cache_async(func):
-    """Generic async disk cache decorator for any function signature."""
-    async def wrapper(*args, **kwargs):
-        key = _make_cache_key_generic(func, args, kwargs)
-        if key in _global_cache:
-            return _global_cache[key]
-        result = await func(*args, **kwargs)
-        _global_cache[key] = result
-        return result
-    return wrapper
\ No newline at end of file
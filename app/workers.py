@@ -0,0 +1,179 @@
+"""Process-pool sharding of the evaluation matrix across CPU cores."""
+
+import asyncio
+import logging
+import multiprocessing
+import queue as queue_module
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Tuple
+
+import config
+from app.journal import cell_key, result_key
+from app.reporting import EvaluationResult
+from app.scheduler import EvaluationCell, EvaluationJob, target_key
+
+logger = logging.getLogger(__name__)
+
+# How long the parent blocks on the result queue before re-checking worker health
+_POLL_INTERVAL = 1.0
+
+
+def _pinned_limits(cell: EvaluationCell, workers: int) -> List[Tuple[str, str]]:
+    """Target and puzzle limits of the cell too small to give every worker a share."""
+    pinned = []
+    target = target_key(cell.model)
+    if config.TARGET_CONCURRENCY.get(target, config.DEFAULT_TARGET_CONCURRENCY) < workers:
+        pinned.append(("target", target))
+    if config.PUZZLE_CONCURRENCY.get(cell.puzzle, workers) < workers:
+        pinned.append(("puzzle", cell.puzzle))
+    return pinned
+
+
+def shard_cells(cells: List[EvaluationCell], workers: int) -> List[List[EvaluationCell]]:
+    """Split cells round-robin so every shard gets a mix of targets.
+
+    Cells are never split, so adaptive sampling can decide on all of a
+    cell's runs within one worker. Cells under a target or puzzle limit
+    smaller than ``workers`` all go to the same worker, which enforces that
+    limit in full (see ``EvaluationRunner._make_limiter``).
+    """
+    # Group cells sharing a pinned limit, transitively
+    parent = list(range(len(cells)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    first_with: Dict[Tuple[str, str], int] = {}
+    for i, cell in enumerate(cells):
+        for limit in _pinned_limits(cell, workers):
+            if limit in first_with:
+                parent[find(i)] = find(first_with[limit])
+            else:
+                first_with[limit] = i
+    groups: Dict[int, List[EvaluationCell]] = {}
+    for i, cell in enumerate(cells):
+        groups.setdefault(find(i), []).append(cell)
+
+    # Each group goes to the least loaded shard, which is round-robin for single cells
+    shards: List[List[EvaluationCell]] = [[] for _ in range(workers)]
+    for group in groups.values():
+        min(shards, key=len).extend(group)
+    return [sorted(shard, key=lambda cell: cell.index) for shard in shards if shard]
+
+
+def _config_snapshot() -> Dict[str, Any]:
+    """Capture config settings, including command line overrides, for the workers."""
+    import config
+
+    return {name: getattr(config, name) for name in dir(config) if name.isupper()}
+
+
+def _init_worker(config_values: Dict[str, Any]) -> None:
+    """Configure settings, logging and Logfire in a freshly spawned worker."""
+    import config
+    from app.utils import setup_logfire, setup_logging
+
+    for name, value in config_values.items():
+        setattr(config, name, value)
+    setup_logging()
+    setup_logfire()
+
+
+def _run_shard(
+    shard: List[EvaluationCell],
+    completed: List[EvaluationResult],
+    shared_by: int,
+    results_queue
+) -> None:
+    """Worker entry point: run a shard and stream each result to the parent."""
+    # Imported here so each worker loads the runner (and, through it, the
+    # framework modules and their clients) in its own process
+    from run_evaluation import EvaluationRunner
+    from app.http_pool import close_http_clients
+
+    def on_result(job: EvaluationJob, result: EvaluationResult) -> None:
+        # Without the fan-out group, whose in-flight asyncio task cannot be pickled
+        results_queue.put((EvaluationJob(cell=job.cell, run_number=job.run_number), result))
+
+    async def run() -> None:
+        try:
+            runner = EvaluationRunner()
+            await runner.run_cells(shard, completed, shared_by=shared_by, on_result=on_result)
+        finally:
+            await close_http_clients()
+
+    try:
+        asyncio.run(run())
+    finally:
+        # Sentinel so the parent knows this shard is finished
+        results_queue.put(None)
+
+
+async def run_sharded(
+    cells: List[EvaluationCell],
+    completed: List[EvaluationResult],
+    workers: int,
+    on_result: Callable[[EvaluationJob, EvaluationResult], None] | None = None
+) -> List[EvaluationResult]:
+    """Run cells across a pool of worker processes.
+
+    Each worker runs its shard with the regular in-process scheduler, using its
+    share of the configured concurrency limits. Results are streamed back as
+    they finish; ``completed`` results from a resumed journal are handed to
+    the worker owning their cell. Returns the new results.
+    """
+    shards = shard_cells(cells, workers)
+    prior_by_cell: Dict[Any, List[EvaluationResult]] = {}
+    for result in completed:
+        prior_by_cell.setdefault(result_key(result)[:3], []).append(result)
+    results: List[EvaluationResult] = []
+    loop = asyncio.get_running_loop()
+
+    # spawn rather than fork: the parent already has Logfire exporter threads
+    # and an event loop running, neither of which survive a fork safely
+    mp_context = multiprocessing.get_context("spawn")
+    with mp_context.Manager() as manager, ProcessPoolExecutor(
+        max_workers=len(shards),
+        mp_context=mp_context,
+        initializer=_init_worker,
+        initargs=(_config_snapshot(),),
+    ) as pool:
+        results_queue = manager.Queue()
+        futures = [
+            pool.submit(
+                _run_shard,
+                shard,
+                [r for cell in shard for r in prior_by_cell.get(cell_key(cell), [])],
+                len(shards),
+                results_queue,
+            )
+            for shard in shards
+        ]
+        logger.info(f"🧵 Started {len(shards)} worker processes")
+
+        remaining = len(shards)
+        while remaining:
+            try:
+                item = await loop.run_in_executor(None, results_queue.get, True, _POLL_INTERVAL)
+            except queue_module.Empty:
+                if all(future.done() for future in futures) and results_queue.empty():
+                    break
+                continue
+
+            if item is None:
+                remaining -= 1
+                continue
+
+            job, result = item
+            results.append(result)
+            if on_result is not None:
+                on_result(job, result)
+
+        # Surface crashes from workers that died without finishing their shard
+        for future in futures:
+            future.result()
+
+    return results
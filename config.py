@@ -1,6 +1,7 @@
 
-import boto3
+import os
 from functools import lru_cache
+from pathlib import Path
 
 # Puzzles to evaluate
 PUZZLES = [
@@ -12,10 +13,27 @@ PUZZLES = [
 @lru_cache(maxsize=1)
 def get_aws_account_id():
     """Fetch and cache the current AWS account ID using boto3."""
+    if CASSETTE_MODE == "replay":
+        # Replays need no AWS access; cassettes are matched with account IDs redacted
+        return "000000000000"
+    import boto3  # Deferred so runs that schedule no Bedrock models never touch AWS
+
     sts = boto3.client("sts")
     return sts.get_caller_identity()["Account"]
 
 
+def resolve_model(model_config):
+    """Fill in provider placeholders of a model config right before it runs.
+
+    Bedrock ARNs are written with an ``{account_id}`` placeholder so that
+    importing this module makes no network calls; the account ID is only
+    looked up once such a model is actually scheduled.
+    """
+    if isinstance(model_config, str) and "{account_id}" in model_config:
+        return model_config.format(account_id=get_aws_account_id())
+    return model_config
+
+
 # Framework-model combinations - explicit control over which models each framework supports
 FRAMEWORK_MODEL_COMBINATIONS = [
     {
@@ -47,9 +65,9 @@ FRAMEWORK_MODEL_COMBINATIONS = [
         "models": [
             # AWS Bedrock models
             "mistral.mistral-large-2407-v1:0",
-            f"arn:aws:bedrock:us-west-2:{get_aws_account_id()}:inference-profile/us.meta.llama3-2-90b-instruct-v1:0",
-            f"arn:aws:bedrock:us-west-2:{get_aws_account_id()}:inference-profile/us.meta.llama3-3-70b-instruct-v1:0",
-            f"arn:aws:bedrock:us-west-2:{get_aws_account_id()}:inference-profile/us.meta.llama4-maverick-17b-instruct-v1:0",
+            "arn:aws:bedrock:us-west-2:{account_id}:inference-profile/us.meta.llama3-2-90b-instruct-v1:0",
+            "arn:aws:bedrock:us-west-2:{account_id}:inference-profile/us.meta.llama3-3-70b-instruct-v1:0",
+            "arn:aws:bedrock:us-west-2:{account_id}:inference-profile/us.meta.llama4-maverick-17b-instruct-v1:0",
         ],
     },
 ]
@@ -58,4 +76,124 @@ FRAMEWORK_MODEL_COMBINATIONS = [
 NUM_RUNS = 3
 
 # Timeout settings (in seconds)
-TEST_TIMEOUT = 120
+TEST_TIMEOUT = 120  # Per-evaluation deadline; overrunning runs are cancelled and reported as "Timeout"
+
+# Hedged retries: start a duplicate attempt once an evaluation outlives the
+# observed latency percentile of its framework/model, keep whichever finishes first
+HEDGING_ENABLED = False
+HEDGING_PERCENTILE = 0.95
+HEDGING_MIN_SAMPLES = 5  # Completed attempts needed before a framework/model is hedged
+HEDGING_MAX_ATTEMPTS = 2
+
+# Concurrency limits for the evaluation scheduler
+MAX_CONCURRENCY = 8  # Evaluations in flight across all targets
+DEFAULT_TARGET_CONCURRENCY = 2  # Per base_url (custom endpoints) or per Bedrock model ID/ARN
+TARGET_CONCURRENCY = {
+    "http://127.0.0.1:1234/v1": 1,  # LM Studio serves one completion at a time
+}
+# Per-puzzle limits for puzzles whose tools keep process-global state
+PUZZLE_CONCURRENCY = {}
+# Threads running synchronous agent SDKs (e.g. Strands) off the event loop; further
+# evaluations of such frameworks queue for a thread (see app/event_loop.py)
+SYNC_AGENT_THREADS = 4
+# Steps of an agent's coroutine holding the event loop longer than this (seconds) are
+# reported as loop blocking; 0.1 matches asyncio's slow-callback warning
+LOOP_BLOCK_THRESHOLD = 0.1
+
+# Rate limits per model, keyed by the model name sent to the API (Bedrock model
+# ID/ARN, which may use the {account_id} placeholder, or a custom endpoint's
+# "model"). rpm = requests per minute, tpm = tokens per minute, e.g.
+#   "mistral.mistral-large-2407-v1:0": {"rpm": 60, "tpm": 100_000}
+RATE_LIMITS = {}
+DEFAULT_RATE_LIMIT = {}  # Applied to models without an entry; empty means unlimited
+# Retries of throttled (HTTP 429 / ThrottlingException) calls, with full-jitter exponential backoff
+THROTTLE_MAX_RETRIES = 5
+THROTTLE_BACKOFF_BASE = 1.0  # seconds
+THROTTLE_BACKOFF_CAP = 30.0  # seconds
+
+# Stream raw_openai_api completions (server-sent events) to record time-to-first-token,
+# inter-token latency and decode tokens/sec per call. A model entry can override this
+# with its own "stream": True/False.
+RAW_OPENAI_STREAMING = False
+
+# Provider prompt caching (disable with --no-prompt-caching to measure its effect).
+# Bedrock: cache points are added to Converse requests of models matching a model ID
+# fragment below, in the request parts that model accepts them in.
+# Custom endpoints: a model entry with "prompt_cache": True sends llama.cpp's cache_prompt.
+# Cached prompt tokens are reported per model either way.
+PROMPT_CACHING = True
+BEDROCK_CACHE_POINTS = {
+    "anthropic.claude-3-5-haiku": ("system", "tools", "messages"),
+    "anthropic.claude-3-7-sonnet": ("system", "tools", "messages"),
+    "anthropic.claude-sonnet-4": ("system", "tools", "messages"),
+    "anthropic.claude-opus-4": ("system", "tools", "messages"),
+    "amazon.nova": ("system", "messages"),
+}
+
+# Shared keep-alive HTTP clients for OpenAI-compatible endpoints, one pool per base_url
+HTTP_MAX_CONNECTIONS = 16
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 8
+HTTP_KEEPALIVE_EXPIRY = 60.0  # seconds an idle connection is kept open
+HTTP_TIMEOUT = 300  # seconds
+HTTP2 = False  # Needs the h2 package; LM Studio and llama.cpp only speak HTTP/1.1
+
+# Connections of the shared Bedrock client; None sizes it to MAX_CONCURRENCY
+# (times HEDGING_MAX_ATTEMPTS when hedging)
+BEDROCK_MAX_POOL_CONNECTIONS = None
+
+# Append-only journal of finished results, used by --resume
+JOURNAL_PATH = "reports/journal.jsonl"
+
+# Adaptive sampling: run each (puzzle, framework, model) cell at least MIN_RUNS
+# times and stop once the Wilson interval on its pass rate is narrower than
+# CI_TARGET_WIDTH (or MAX_RUNS is reached). Replaces NUM_RUNS when enabled.
+ADAPTIVE_RUNS = False
+MIN_RUNS = 3
+MAX_RUNS = 10
+CI_TARGET_WIDTH = 0.6  # 0/3 and 3/3 stop at MIN_RUNS; borderline cells keep sampling
+CI_Z = 1.96  # 95% confidence
+
+# Disk cache of raw_openai_api model calls (inspect with `python -m app.cache stats`).
+# Entries are zlib-compressed JSON; once the cache outgrows CACHE_SIZE_LIMIT the
+# least recently (or frequently) used entries are evicted.
+CACHE_DIR = os.environ.get("AGENTGYM_CACHE_DIR", str(Path(__file__).resolve().parent / ".cache" / "model_calls"))
+CACHE_SIZE_LIMIT = 1024 ** 3  # bytes
+CACHE_EVICTION_POLICY = "least-recently-used"  # or "least-frequently-used"
+CACHE_COMPRESS_LEVEL = 6  # zlib level, 1 (fastest) to 9 (smallest)
+CACHE_TTL = None  # seconds an entry stays valid; None keeps entries until evicted
+
+# How the cache is used (override with --cache-mode): "off", "record" (always call the
+# endpoint and store), "replay" (stored responses only; a miss fails the run) or
+# "read-through" (stored responses, calling the endpoint on a miss). Keys include the
+# run number and seed, so runs of a cell never replay each other's responses.
+CACHE_MODE = "read-through"
+
+# Runs send seed SAMPLING_SEED + run_number to endpoints that accept one (OpenAI-compatible
+# APIs; Bedrock Converse has no seed). A model entry can opt out with "seed": False;
+# None disables seeding.
+SAMPLING_SEED = 0
+
+# Serve the identical first turn of a cell's initial runs from one chat-completion request
+# with n = number of runs, forking the conversations from its choices (override with --fanout).
+# Applies to raw_openai_api; endpoints that ignore n fall back to a request per run.
+FANOUT_FIRST_TURN = False
+
+# How raw_openai_api's Towers of Hanoi loop compacts the history it resends each turn
+# (override with --context-policy, or per model entry with "context_policy"):
+# "full", "last_turns:K", "collapse_state" or "drop_superseded" (see app/context_policy.py).
+CONTEXT_POLICY = "full"
+
+# Answer repeated calls of read-only puzzle tools (e.g. get_tower_state) from a per-session
+# memo until a state-changing tool such as move_disk runs (disable with --no-tool-memo).
+# Repeats are counted as redundant tool calls in the results either way.
+TOOL_MEMO = True
+
+# Simulated latency of the async puzzle tools (override with --tool-latency, or per model
+# entry with "tool_latency"): "nominal" (each tool's own), "zero" (fast CI), "fixed:S" or
+# "lognormal:P50,P99" in seconds (see app/tool_latency.py).
+TOOL_LATENCY = "nominal"
+
+# Record every model exchange (HTTP and Bedrock) of each run to a cassette, or replay
+# runs offline from the cassettes (override with --cassettes): "off", "record" or "replay".
+CASSETTE_MODE = "off"
+CASSETTE_DIR = "cassettes"
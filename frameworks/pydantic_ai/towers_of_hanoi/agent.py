@@ -1,11 +1,11 @@
 """Pydantic AI agent implementation for Towers of Hanoi."""
 
 import logging
-from pydantic_ai import Agent, RunContext, PromptedOutput
+from pydantic_ai import Agent, PromptedOutput
 from pydantic_ai.models.bedrock import BedrockConverseModel
-from puzzles.towers_of_hanoi.tools import (
-    get_tower_state, move_disk, check_if_solved, reset_puzzle
-)
+from pydantic_ai.providers.bedrock import BedrockProvider
+from app.bedrock_pool import get_bedrock_client
+from puzzles.towers_of_hanoi.tools import TOOLS, TowersOfHanoiSession
 from puzzles.towers_of_hanoi.checker import TowersOfHanoiResponse
 
 logger = logging.getLogger(__name__)
@@ -14,7 +14,13 @@ logger = logging.getLogger(__name__)
 class AgentTestContext:
     """Context for tracking tool calls during testing."""
     def __init__(self):
-        self.moves_made = []
+        # Isolated board for this run; tools resolve it from the context
+        self.session = TowersOfHanoiSession()
+
+    @property
+    def moves_made(self) -> list:
+        """Successful moves recorded by the session."""
+        return self.session.moves_made
 
 def _patched_map_tool_config(self, model_request_parameters):
     """Patched version that always uses 'auto' instead of 'any' for tool choice"""
@@ -32,7 +38,10 @@ def _patched_map_tool_config(self, model_request_parameters):
 def make_agent(model_id: str) -> Agent[AgentTestContext, TowersOfHanoiResponse]:
     """Create a Pydantic AI agent with Towers of Hanoi tools."""
     logger.info(f"Creating Pydantic AI agent with model: {model_id}")
-    model = BedrockConverseModel(model_name=model_id)
+    model = BedrockConverseModel(
+        model_name=model_id,
+        provider=BedrockProvider(bedrock_client=get_bedrock_client()),
+    )
     if "meta.llama" in model_id.lower() or "llama" in model_id.lower():
         logger.info(f"Applying Meta Llama patch for 'any'/'auto' tool calling for model: {model_id}")
         if hasattr(model, '_map_tool_config'):
@@ -41,6 +50,8 @@ def make_agent(model_id: str) -> Agent[AgentTestContext, TowersOfHanoiResponse]:
     agent = Agent(
         model=model,
         deps_type=AgentTestContext,
+        # Built from the puzzle's tool registry, whose schemas are introspected once per process
+        tools=TOOLS.pydantic_ai_tools(),
         output_type=PromptedOutput(TowersOfHanoiResponse),
         system_prompt="""
         You are a Towers of Hanoi puzzle solver. You MUST use the available tools to solve the puzzle.
@@ -73,37 +84,11 @@ def make_agent(model_id: str) -> Agent[AgentTestContext, TowersOfHanoiResponse]:
         """,
     )
     
-    @agent.tool
-    async def get_tower_state_tool(ctx: RunContext[AgentTestContext]) -> dict:
-        """Get the current state of all towers."""
-        return await get_tower_state(ctx)
-    
-    @agent.tool
-    async def move_disk_tool(ctx: RunContext[AgentTestContext], from_tower: str, to_tower: str) -> dict:
-        """Move a disk from one tower to another."""
-        result = await move_disk(ctx, from_tower, to_tower)
-        if result.get('success'):
-            # Track successful moves
-            ctx.deps.moves_made.append({"from": from_tower, "to": to_tower})
-        return result
-    
-    @agent.tool
-    async def check_if_solved_tool(ctx: RunContext[AgentTestContext]) -> dict:
-        """Check if the puzzle is solved."""
-        return await check_if_solved(ctx)
-    
-    @agent.tool 
-    async def reset_puzzle_tool(ctx: RunContext[AgentTestContext]) -> dict:
-        """Reset the puzzle to initial state."""
-        ctx.deps.moves_made = []  # Reset move tracking
-        return await reset_puzzle(ctx)
-    
     return agent
 
 # --- Added for AgentGym runner ---
 async def run_agent(model_id: str):
     """Create and run the agent for the given model_id."""
-    await reset_puzzle(None)
     agent = make_agent(model_id)
     prompt = "Solve the Towers of Hanoi puzzle. Move all disks from first tower to last tower following the rules."
     return await agent.run(prompt, deps=AgentTestContext())
@@ -1,9 +1,11 @@
 """Pydantic AI agent implementation."""
 
 import logging
-from pydantic_ai import Agent, RunContext
+from pydantic_ai import Agent
 from ..enhanced.enhanced_bedrock_model import EnhancedBedrockModel
-from puzzles.fruit_count.tools import get_count_of_oranges, get_count_of_apples
+from pydantic_ai.providers.bedrock import BedrockProvider
+from app.bedrock_pool import get_bedrock_client
+from puzzles.fruit_count.tools import TOOLS
 from puzzles.fruit_count.checker import FruitCountResponse
 
 logger = logging.getLogger(__name__)
@@ -32,7 +34,10 @@ def _patched_map_tool_config(self, model_request_parameters):
 def make_agent(model_id: str) -> Agent[AgentTestContext, FruitCountResponse]:
     """Create a Pydantic AI agent with fruit counting tools."""
     logger.info(f"Creating Pydantic AI agent with model: {model_id}")
-    model = EnhancedBedrockModel(model_name=model_id)
+    model = EnhancedBedrockModel(
+        model_name=model_id,
+        provider=BedrockProvider(bedrock_client=get_bedrock_client()),
+    )
     if "meta.llama" in model_id.lower() or "llama" in model_id.lower():
         logger.info(f"Applying Meta Llama patch for 'any'/'auto' tool calling for model: {model_id}")
         if hasattr(model, '_map_tool_config'):
@@ -40,6 +45,8 @@ def make_agent(model_id: str) -> Agent[AgentTestContext, FruitCountResponse]:
     agent = Agent(
         model=model,
         deps_type=AgentTestContext,
+        # Built from the puzzle's tool registry, whose schemas are introspected once per process
+        tools=TOOLS.pydantic_ai_tools(),
         output_type=FruitCountResponse,
         system_prompt="""
         You are a fruit counting assistant. You MUST use the available tools to get fruit counts.
@@ -51,14 +58,6 @@ def make_agent(model_id: str) -> Agent[AgentTestContext, FruitCountResponse]:
         Do not include any text before or after the JSON. The response must be a single valid JSON object.
         """,
     )
-    @agent.tool
-    async def get_count_of_oranges_tool(ctx: RunContext[AgentTestContext]) -> int:
-        """Get the current count of oranges in inventory."""
-        return await get_count_of_oranges(ctx)
-    @agent.tool
-    async def get_count_of_apples_tool(ctx: RunContext[AgentTestContext]) -> int:
-        """Get the current count of apples in inventory."""
-        return await get_count_of_apples(ctx)
     return agent
 
 # --- Added for AgentGym runner ---
@@ -1,11 +1,15 @@
 """Pydantic AI agent implementation with OpenAI-compatible endpoints."""
 
 import logging
-from pydantic_ai import Agent, RunContext
+from pydantic_ai import Agent
 from pydantic_ai.models.openai import OpenAIModel
 from pydantic_ai.providers import Provider
-from openai import AsyncOpenAI
-from puzzles.fruit_count.tools import get_count_of_oranges, get_count_of_apples
+from app.cassettes import CassetteTransport
+from app.prompt_cache import prompt_cache_enabled
+from app.rate_limit import RateLimitedTransport
+from app.utils import sampling_seed
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+from puzzles.fruit_count.tools import TOOLS
 from puzzles.fruit_count.checker import FruitCountResponse
 
 logger = logging.getLogger(__name__)
@@ -23,7 +27,13 @@ class CustomOpenAIProvider(Provider[AsyncOpenAI]):
     def __init__(self, base_url: str, api_key: str):
         self._base_url = base_url
         self._api_key = api_key
-        self._client = AsyncOpenAI(base_url=base_url, api_key=api_key)
+        # Throttling is retried by the rate-limited transport, not the SDK
+        self._client = AsyncOpenAI(
+            base_url=base_url,
+            api_key=api_key,
+            max_retries=0,
+            http_client=DefaultAsyncHttpxClient(transport=CassetteTransport(RateLimitedTransport())),
+        )
     
     @property
     def name(self) -> str:
@@ -70,6 +80,8 @@ def make_agent(model_config) -> Agent[AgentTestContext, FruitCountResponse]:
     agent = Agent(
         model=model,
         deps_type=AgentTestContext,
+        # Built from the puzzle's tool registry, whose schemas are introspected once per process
+        tools=TOOLS.pydantic_ai_tools(),
         output_type=FruitCountResponse,
         system_prompt="""You are a fruit counting assistant. You MUST use the available tools to get fruit counts.
 When asked about fruit counts:
@@ -80,16 +92,6 @@ Replace <orange_count> and <apple_count> with the actual numbers you get from th
 Do not include any text before or after the JSON. The response must be a single valid JSON object.""",
     )
     
-    @agent.tool
-    async def get_count_of_oranges_tool(ctx: RunContext[AgentTestContext]) -> int:
-        """Get the current count of oranges in inventory."""
-        return await get_count_of_oranges(ctx)
-    
-    @agent.tool
-    async def get_count_of_apples_tool(ctx: RunContext[AgentTestContext]) -> int:
-        """Get the current count of apples in inventory."""
-        return await get_count_of_apples(ctx)
-    
     return agent
 
 
@@ -97,7 +99,13 @@ async def run_agent(model_config):
     """Create and run the agent for the given model_config."""
     agent = make_agent(model_config)
     prompt = "How many oranges and apples are there?"
-    result = await agent.run(prompt, deps=AgentTestContext())
+    seed = sampling_seed(model_config)
+    model_settings = {}
+    if seed is not None:
+        model_settings["seed"] = seed
+    if prompt_cache_enabled(model_config):
+        model_settings["extra_body"] = {"cache_prompt": True}
+    result = await agent.run(prompt, deps=AgentTestContext(), model_settings=model_settings or None)
     return result.output
 
 
@@ -1,13 +1,15 @@
 """Pydantic AI agent implementation with OpenAI-compatible endpoints."""
 
 import logging
-from pydantic_ai import Agent, RunContext
+from pydantic_ai import Agent
 from pydantic_ai.models.openai import OpenAIModel
 from pydantic_ai.providers import Provider
-from openai import AsyncOpenAI
-from puzzles.towers_of_hanoi.tools import (
-    get_tower_state, move_disk, check_if_solved, reset_puzzle
-)
+from app.cassettes import CassetteTransport
+from app.prompt_cache import prompt_cache_enabled
+from app.rate_limit import RateLimitedTransport
+from app.utils import sampling_seed
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+from puzzles.towers_of_hanoi.tools import TOOLS, TowersOfHanoiSession
 from puzzles.towers_of_hanoi.checker import TowersOfHanoiResponse
 
 logger = logging.getLogger(__name__)
@@ -16,7 +18,13 @@ logger = logging.getLogger(__name__)
 class AgentTestContext:
     """Context for tracking tool calls during testing."""
     def __init__(self):
-        self.moves_made = []
+        # Isolated board for this run; tools resolve it from the context
+        self.session = TowersOfHanoiSession()
+
+    @property
+    def moves_made(self) -> list:
+        """Successful moves recorded by the session."""
+        return self.session.moves_made
 
 
 class CustomOpenAIProvider(Provider[AsyncOpenAI]):
@@ -25,7 +33,13 @@ class CustomOpenAIProvider(Provider[AsyncOpenAI]):
     def __init__(self, base_url: str, api_key: str):
         self._base_url = base_url
         self._api_key = api_key
-        self._client = AsyncOpenAI(base_url=base_url, api_key=api_key)
+        # Throttling is retried by the rate-limited transport, not the SDK
+        self._client = AsyncOpenAI(
+            base_url=base_url,
+            api_key=api_key,
+            max_retries=0,
+            http_client=DefaultAsyncHttpxClient(transport=CassetteTransport(RateLimitedTransport())),
+        )
     
     @property
     def name(self) -> str:
@@ -72,6 +86,8 @@ def make_agent(model_config) -> Agent[AgentTestContext, TowersOfHanoiResponse]:
     agent = Agent(
         model=model,
         deps_type=AgentTestContext,
+        # Built from the puzzle's tool registry, whose schemas are introspected once per process
+        tools=TOOLS.pydantic_ai_tools(),
         output_type=TowersOfHanoiResponse,
         system_prompt="""
         You are a Towers of Hanoi puzzle solver. You MUST use the available tools to solve the puzzle.
@@ -104,40 +120,20 @@ def make_agent(model_config) -> Agent[AgentTestContext, TowersOfHanoiResponse]:
         """,
     )
     
-    @agent.tool
-    async def get_tower_state_tool(ctx: RunContext[AgentTestContext]) -> dict:
-        """Get the current state of all towers."""
-        return await get_tower_state(ctx)
-    
-    @agent.tool
-    async def move_disk_tool(ctx: RunContext[AgentTestContext], from_tower: str, to_tower: str) -> dict:
-        """Move a disk from one tower to another."""
-        result = await move_disk(ctx, from_tower, to_tower)
-        if result.get('success'):
-            # Track successful moves
-            ctx.deps.moves_made.append({"from": from_tower, "to": to_tower})
-        return result
-    
-    @agent.tool
-    async def check_if_solved_tool(ctx: RunContext[AgentTestContext]) -> dict:
-        """Check if the puzzle is solved."""
-        return await check_if_solved(ctx)
-    
-    @agent.tool 
-    async def reset_puzzle_tool(ctx: RunContext[AgentTestContext]) -> dict:
-        """Reset the puzzle to initial state."""
-        ctx.deps.moves_made = []  # Reset move tracking
-        return await reset_puzzle(ctx)
-    
     return agent
 
 
 async def run_agent(model_config):
     """Create and run the agent for the given model_config."""
-    await reset_puzzle(None)
     agent = make_agent(model_config)
     prompt = "Solve the Towers of Hanoi puzzle. Move all disks from first tower to last tower following the rules."
-    result = await agent.run(prompt, deps=AgentTestContext())
+    seed = sampling_seed(model_config)
+    model_settings = {}
+    if seed is not None:
+        model_settings["seed"] = seed
+    if prompt_cache_enabled(model_config):
+        model_settings["extra_body"] = {"cache_prompt": True}
+    result = await agent.run(prompt, deps=AgentTestContext(), model_settings=model_settings or None)
     return result.output
 
 
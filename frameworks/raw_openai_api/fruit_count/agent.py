@@ -9,8 +9,13 @@ from typing import Any, Dict, List, Optional
 import httpx
 
 from puzzles.fruit_count.checker import FruitCountResponse
-from puzzles.fruit_count.tools import get_count_of_apples, get_count_of_oranges
-from app.utils import AgentGymAgentResult
+from puzzles.fruit_count.tools import TOOLS
+from app.fanout import shared_first_turn
+from app.prompt_cache import openai_usage, prompt_cache_enabled
+from app.utils import AgentGymAgentResult, sampling_seed
+from app.http_pool import get_http_client
+from app.streaming import stream_chat_completion, streaming_enabled
+from app.tool_dispatch import dispatch_tool_calls
 
 logger = logging.getLogger(__name__)
 
@@ -21,7 +26,7 @@ class AgentTestContext:
         pass
 
 
-async def call_openai_api(base_url: str, model: str, messages: List[Dict], tools: Optional[List[Dict]] = None) -> Dict[Any, Any]:
+async def call_openai_api(base_url: str, model: str, messages: List[Dict], tools: Optional[List[Dict]] = None, stream: bool = False, seed: Optional[int] = None, n: int = 1, cache_prompt: bool = False) -> Dict[Any, Any]:
     """Make a raw HTTP request to OpenAI API."""
     url = f"{base_url}/chat/completions"
 
@@ -32,6 +37,16 @@ async def call_openai_api(base_url: str, model: str, messages: List[Dict], tools
         "max_tokens": 1000
     }
 
+    if seed is not None:
+        payload["seed"] = seed
+
+    if n > 1:
+        payload["n"] = n
+
+    if cache_prompt:
+        # llama.cpp-style servers reuse the KV cache of the longest matching prefix
+        payload["cache_prompt"] = True
+
     if tools:
         payload["tools"] = tools
         payload["tool_choice"] = "auto"
@@ -42,7 +57,12 @@ async def call_openai_api(base_url: str, model: str, messages: List[Dict], tools
     }
 
     try:
-        async with httpx.AsyncClient(timeout=300) as client:
+        # Shared keep-alive client, so multi-turn loops reuse one connection
+        client = get_http_client(base_url)
+        if stream:
+            # Assembled from server-sent events, with TTFT and decode-rate metrics recorded
+            response_data = await stream_chat_completion(client, url, payload, headers)
+        else:
             response = await client.post(url, json=payload, headers=headers)
             if response.status_code != 200:
                 error_text = response.text
@@ -50,13 +70,13 @@ async def call_openai_api(base_url: str, model: str, messages: List[Dict], tools
 
             response_data = response.json()
 
-            # Check if the returned model matches what we requested
-            if "model" in response_data and response_data["model"] != model:
-                logger.warning(f"Model mismatch: requested '{model}' but API returned '{response_data['model']}'")
-            elif "model" not in response_data:
-                logger.warning(f"API response does not include model field - cannot verify if '{model}' is actually being used")
+        # Check if the returned model matches what we requested
+        if "model" in response_data and response_data["model"] != model:
+            logger.warning(f"Model mismatch: requested '{model}' but API returned '{response_data['model']}'")
+        elif "model" not in response_data:
+            logger.warning(f"API response does not include model field - cannot verify if '{model}' is actually being used")
 
-            return response_data
+        return response_data
     except httpx.RequestError as e:
         raise Exception(f"Network error connecting to {base_url}: {e}")
     except Exception as e:
@@ -76,37 +96,15 @@ async def make_agent(model_config):
     
     base_url = model_config["base_url"]
     model = model_config["model"]
+    stream = streaming_enabled(model_config)
+    seed = sampling_seed(model_config)
+    cache_prompt = prompt_cache_enabled(model_config)
     
     logger.info(f"Creating raw OpenAI API agent with endpoint: {base_url}")
     logger.info(f"Requested model: {model}")
     
-    # Define tools in OpenAI format
-    tools = [
-        {
-            "type": "function",
-            "function": {
-                "name": "get_count_of_oranges",
-                "description": "Get the current count of oranges in inventory",
-                "parameters": {
-                    "type": "object",
-                    "properties": {},
-                    "required": []
-                }
-            }
-        },
-        {
-            "type": "function", 
-            "function": {
-                "name": "get_count_of_apples",
-                "description": "Get the current count of apples in inventory",
-                "parameters": {
-                    "type": "object",
-                    "properties": {},
-                    "required": []
-                }
-            }
-        }
-    ]
+    # Schemas are built once per process by the puzzle's tool registry
+    tools = TOOLS.openai_tools
     
     messages = [
         {
@@ -125,9 +123,12 @@ Do not include any text before or after the JSON. The response must be a single
         }
     ]
     
-    # First API call
-    response = await call_openai_api(base_url, model, messages, tools)
-    usage = response.get("usage", {})
+    # First API call, possibly a choice of one request shared with the cell's other runs
+    response = await shared_first_turn(
+        base_url, model, messages, tools,
+        lambda n: call_openai_api(base_url, model, messages, tools, seed=seed, n=n, cache_prompt=cache_prompt),
+    ) or await call_openai_api(base_url, model, messages, tools, stream=stream, seed=seed, cache_prompt=cache_prompt)
+    usage = openai_usage(response)
 
     # Handle tool calls if any
     if "choices" in response and len(response["choices"]) > 0:
@@ -138,27 +139,15 @@ Do not include any text before or after the JSON. The response must be a single
             # Add assistant message with tool calls to conversation
             messages.append(message)
 
-            # Execute tool calls
-            for tool_call in message["tool_calls"]:
-                function_name = tool_call["function"]["name"]
-
-                if function_name == "get_count_of_oranges":
-                    result = await get_count_of_oranges(AgentTestContext())
-                elif function_name == "get_count_of_apples":
-                    result = await get_count_of_apples(AgentTestContext())
-                else:
-                    result = "Unknown function"
+            async def execute_tool(function_name: str, function_args: Dict[str, Any]) -> Any:
+                return await TOOLS.call(function_name, AgentTestContext(), function_args)
 
-                # Add tool result to conversation
-                messages.append({
-                    "role": "tool",
-                    "tool_call_id": tool_call["id"],
-                    "content": str(result)
-                })
+            # Execute tool calls, the independent ones concurrently, and add their results to the conversation
+            messages.extend(await dispatch_tool_calls(message["tool_calls"], execute_tool, TOOLS.read_only_names))
 
             # Make second API call with tool results
-            response = await call_openai_api(base_url, model, messages)
-            usage = response.get("usage", usage)
+            response = await call_openai_api(base_url, model, messages, stream=stream, seed=seed, cache_prompt=cache_prompt)
+            usage = openai_usage(response) or usage
 
     # Extract final response
     if "choices" in response and len(response["choices"]) > 0:
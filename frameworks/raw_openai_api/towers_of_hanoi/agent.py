@@ -4,12 +4,16 @@ import json
 import logging
 import re
 from typing import Dict, Any, List, Optional
-from puzzles.towers_of_hanoi.tools import (
-    get_tower_state, move_disk, check_if_solved, reset_puzzle, get_column_names
-)
+from puzzles.towers_of_hanoi.tools import TOOLS, TowersOfHanoiSession, check_if_solved, get_tower_state
 from puzzles.towers_of_hanoi.checker import TowersOfHanoiResponse
-from app.utils import AgentGymAgentResult, aggregate_usages
-from app.utils import disk_cache_async
+from app.context_policy import get_context_policy
+from app.fanout import shared_first_turn
+from app.prompt_cache import openai_usage, prompt_cache_enabled
+from app.utils import AgentGymAgentResult, aggregate_usages, sampling_seed
+from app.cache import disk_cache_async
+from app.http_pool import get_http_client
+from app.streaming import stream_chat_completion, streaming_enabled
+from app.tool_dispatch import dispatch_tool_calls
 
 logger = logging.getLogger(__name__)
 
@@ -18,11 +22,17 @@ logger = logging.getLogger(__name__)
 class AgentTestContext:
     """Context for tracking tool calls during testing."""
     def __init__(self):
-        self.moves_made = []
+        # Isolated board for this run; tools resolve it from the context
+        self.session = TowersOfHanoiSession()
 
+    @property
+    def moves_made(self) -> list:
+        """Successful moves recorded by the session."""
+        return self.session.moves_made
 
-@disk_cache_async
-async def call_openai_api(base_url: str, model: str, messages: List[Dict], tools: Optional[List[Dict]] = None) -> Dict[Any, Any]:
+
+@disk_cache_async(namespace=lambda base_url, model, *args, **kwargs: f"{base_url}|{model}")
+async def call_openai_api(base_url: str, model: str, messages: List[Dict], tools: Optional[List[Dict]] = None, stream: bool = False, seed: Optional[int] = None, n: int = 1, cache_prompt: bool = False) -> Dict[Any, Any]:
     """Make a raw HTTP request to OpenAI API using httpx."""
     try:
         import httpx
@@ -38,6 +48,16 @@ async def call_openai_api(base_url: str, model: str, messages: List[Dict], tools
         "max_tokens": 2000
     }
 
+    if seed is not None:
+        payload["seed"] = seed
+
+    if n > 1:
+        payload["n"] = n
+
+    if cache_prompt:
+        # llama.cpp-style servers reuse the KV cache of the longest matching prefix
+        payload["cache_prompt"] = True
+
     if tools:
         payload["tools"] = tools
         payload["tool_choice"] = "auto"
@@ -48,7 +68,12 @@ async def call_openai_api(base_url: str, model: str, messages: List[Dict], tools
     }
 
     try:
-        async with httpx.AsyncClient(timeout=300) as client:
+        # Shared keep-alive client, so multi-turn loops reuse one connection
+        client = get_http_client(base_url)
+        if stream:
+            # Assembled from server-sent events, with TTFT and decode-rate metrics recorded
+            response_data = await stream_chat_completion(client, url, payload, headers)
+        else:
             response = await client.post(url, json=payload, headers=headers)
             if response.status_code != 200:
                 error_text = response.text
@@ -56,13 +81,13 @@ async def call_openai_api(base_url: str, model: str, messages: List[Dict], tools
 
             response_data = response.json()
 
-            # Check if the returned model matches what we requested
-            if "model" in response_data and response_data["model"] != model:
-                logger.warning(f"Model mismatch: requested '{model}' but API returned '{response_data['model']}'")
-            elif "model" not in response_data:
-                logger.warning(f"API response does not include model field - cannot verify if '{model}' is actually being used")
+        # Check if the returned model matches what we requested
+        if "model" in response_data and response_data["model"] != model:
+            logger.warning(f"Model mismatch: requested '{model}' but API returned '{response_data['model']}'")
+        elif "model" not in response_data:
+            logger.warning(f"API response does not include model field - cannot verify if '{model}' is actually being used")
 
-            return response_data
+        return response_data
 
     except httpx.RequestError as e:
         raise Exception(f"Network error connecting to {base_url}: {e}")
@@ -83,82 +108,15 @@ async def make_agent(model_config):
     
     base_url = model_config["base_url"]
     model = model_config["model"]
+    stream = streaming_enabled(model_config)
+    seed = sampling_seed(model_config)
+    cache_prompt = prompt_cache_enabled(model_config)
     
     logger.info(f"Creating raw OpenAI API agent with endpoint: {base_url}")
     logger.info(f"Requested model: {model}")
     
-    # Define tools in OpenAI format
-    tools = [
-        {
-            "type": "function",
-            "function": {
-                "name": "get_tower_state",
-                "description": "Get the current state of all towers. Returns a dict mapping tower names ('A', 'B', 'C') to lists of disk sizes.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {},
-                    "required": []
-                }
-            }
-        },
-        {
-            "type": "function", 
-            "function": {
-                "name": "move_disk",
-                "description": "Move a disk from one tower to another. Returns success status and message.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "from_tower": {
-                            "type": "string",
-                            "description": "Source tower (ex. 'A', 'B', or 'C')",
-                        },
-                        "to_tower": {
-                            "type": "string", 
-                            "description": "Destination tower (ex. 'A', 'B', or 'C')",
-                        }
-                    },
-                    "required": ["from_tower", "to_tower"]
-                }
-            }
-        },
-        {
-            "type": "function",
-            "function": {
-                "name": "check_if_solved",
-                "description": "Check if the puzzle is solved. Returns dict with 'solved' (bool) and 'message' keys.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {},
-                    "required": []
-                }
-            }
-        },
-        {
-            "type": "function",
-            "function": {
-                "name": "reset_puzzle",
-                "description": "Reset the puzzle to initial state. Returns confirmation message.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {},
-                    "required": []
-                }
-            }
-        },
-        {
-            "type": "function",
-            "function": {
-                "name": "get_column_names",
-                "description": "Get the list of tower (column) names. Returns a list of column names (e.g., ['A', 'B', 'C']).",
-                "parameters": {
-                    "type": "object",
-                    "properties": {},
-                    "required": []
-                }
-            }
-        }
-    ]
+    # Schemas are built once per process by the puzzle's tool registry
+    tools = TOOLS.openai_tools
     
     messages = [
         {
@@ -203,6 +161,13 @@ async def make_agent(model_config):
     
     # Create context for tracking moves
     context = AgentTestContext()
+
+    # Compacts the history sent each turn; `messages` keeps the full transcript
+    policy = get_context_policy(
+        model_config,
+        state_tools=("get_tower_state",),
+        read_only_tools=TOOLS.read_only_names,
+    )
     
     # Conversation loop for tool calls
     max_iterations = 20  # Prevent infinite loops
@@ -214,9 +179,18 @@ async def make_agent(model_config):
         iteration += 1
         logger.info(f"API call iteration {iteration}")
 
-        # Make API call
-        response = await call_openai_api(base_url, model, messages, tools)
-        usage_list.append(response.get("usage", {}))
+        # Make API call; the first may be a choice of one request shared with the cell's other runs
+        response = None
+        if iteration == 1:
+            response = await shared_first_turn(
+                base_url, model, messages, tools,
+                lambda n: call_openai_api(base_url, model, messages, tools, seed=seed, n=n, cache_prompt=cache_prompt),
+            )
+        if response is None:
+            response = await call_openai_api(
+                base_url, model, policy.compact(messages), tools, stream=stream, seed=seed, cache_prompt=cache_prompt
+            )
+        usage_list.append(openai_usage(response))
 
         # Handle tool calls if any
         if "choices" in response and len(response["choices"]) > 0:
@@ -227,41 +201,12 @@ async def make_agent(model_config):
                 # Add assistant message with tool calls to conversation
                 messages.append(message)
 
-                # Execute tool calls
-                for tool_call in message["tool_calls"]:
-                    function_name = tool_call["function"]["name"]
-                    function_args = json.loads(tool_call["function"].get("arguments", "{}")) if tool_call["function"].get("arguments") else {}
-
+                async def execute_tool(function_name: str, function_args: Dict[str, Any]) -> Any:
                     logger.info(f"Executing tool: {function_name} with args: {function_args}")
+                    return await TOOLS.call(function_name, context, function_args)
 
-                    if function_name == "get_tower_state":
-                        result = await get_tower_state(context)
-                    elif function_name == "move_disk":
-                        from_tower = function_args.get("from_tower")
-                        to_tower = function_args.get("to_tower")
-                        if not from_tower or not to_tower:
-                            result = {"success": False, "message": "Missing from_tower or to_tower parameter"}
-                        else:
-                            result = await move_disk(context, str(from_tower), str(to_tower))
-                            # Track successful moves
-                            if result.get("success"):
-                                context.moves_made.append({"from": str(from_tower), "to": str(to_tower)})
-                    elif function_name == "check_if_solved":
-                        result = await check_if_solved(context)
-                    elif function_name == "reset_puzzle":
-                        result = await reset_puzzle(context)
-                        context.moves_made = []  # Reset move tracking
-                    elif function_name == "get_column_names":
-                        result = await get_column_names(context)
-                    else:
-                        result = {"error": "Unknown function"}
-
-                    # Add tool result to conversation
-                    messages.append({
-                        "role": "tool",
-                        "tool_call_id": tool_call["id"],
-                        "content": json.dumps(result)
-                    })
+                # Execute tool calls (read-only ones concurrently, moves in order) and add their results
+                messages.extend(await dispatch_tool_calls(message["tool_calls"], execute_tool, TOOLS.read_only_names))
 
                 # Continue conversation loop
                 continue
@@ -303,7 +248,7 @@ async def make_agent(model_config):
                                 solved=result["solved"],
                                 final_state=result["final_state"]
                             ),
-                            usage=aggregate_usages(usage_list)
+                            usage=aggregate_usages(usage_list, context_policy=policy.name)
                         )
                     else:
                         raise Exception(f"Invalid response format: {result}")
@@ -322,7 +267,7 @@ async def make_agent(model_config):
                             solved=solved_check.get("solved", False),
                             final_state=final_state
                         ),
-                        usage=aggregate_usages(usage_list)
+                        usage=aggregate_usages(usage_list, context_policy=policy.name)
                     )
 
         else:
@@ -339,13 +284,12 @@ async def make_agent(model_config):
             solved=solved_check.get("solved", False),
             final_state=final_state
         ),
-        usage=aggregate_usages(usage_list)
+        usage=aggregate_usages(usage_list, context_policy=policy.name)
     )
 
 
 async def run_agent(model_config):
     """Create and run the agent for the given model_config."""
-    await reset_puzzle(None)
     return await make_agent(model_config)
 
 
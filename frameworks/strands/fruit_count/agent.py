@@ -2,12 +2,17 @@
 
 import logging
 from pydantic import BaseModel, Field
-from strands import Agent, tool
+from strands import Agent
 
-from puzzles.fruit_count.tools import get_count_of_oranges_sync, get_count_of_apples_sync
+from puzzles.fruit_count.tools import TOOLS
+from app.bedrock_pool import PooledBotoSession
+from app.event_loop import run_sync
 
 logger = logging.getLogger(__name__)
 
+# Runs on the sync-agent threads; the runner reserves one before starting the clock
+SYNC_AGENT = True
+
 
 class FruitCountByColor(BaseModel):
     """Fruit count organized by color/type."""
@@ -30,33 +35,6 @@ class AgentTestContext:
 test_context = AgentTestContext()
 
 
-@tool
-def get_count_of_oranges() -> int:
-    """Get the current count of oranges in inventory.
-
-    Use this tool when you need to know how many oranges are currently in stock.
-    This tool provides real-time inventory count for orange fruits.
-
-    Returns:
-        int: The current number of oranges in inventory (always 25 for testing)
-    """
-    return get_count_of_oranges_sync()
-
-
-@tool
-def get_count_of_apples() -> int:
-    """Get the current count of apples in inventory.
-
-    Use this tool when you need to know how many apples are currently in stock.
-    This tool provides real-time inventory count for apple fruits.
-
-    Returns:
-        int: The current number of apples in inventory (always 30 for testing)
-    """
-    return get_count_of_apples_sync()
-
-
-
 def make_agent(model_id: str) -> Agent:
     """Create a Strands agent with fruit counting tools."""
     logger.info(f"Creating Strands agent with model: {model_id}")
@@ -65,11 +43,14 @@ def make_agent(model_id: str) -> Agent:
         from strands.models.bedrock import BedrockModel
         bedrock_model = BedrockModel(
             model_id=model_id,
-            streaming=False
+            streaming=False,
+            # Shared, rate-limited client instead of a new session and client per run
+            boto_session=PooledBotoSession(),
         )
         agent = Agent(
             model=bedrock_model,
-            tools=[get_count_of_oranges, get_count_of_apples],
+            # Shared Strands tools built once by the puzzle's tool registry
+            tools=TOOLS.strands_tools,
             system_prompt="""
             You are a fruit counting assistant. You MUST use the available tools to get fruit counts.
             When asked about fruit counts:
@@ -87,9 +68,8 @@ def make_agent(model_id: str) -> Agent:
         raise ImportError("Strands framework is required but not installed")
     return agent
 
-# --- Added for AgentGym runner ---
-async def run_agent(model_id: str):
-    """Create and run the agent for the given model_id."""
+def _run_agent_sync(model_id: str) -> dict:
+    """Run the agent and extract its answer; blocks for the Bedrock round trips."""
     agent = make_agent(model_id)
     prompt = "How many oranges and apples are there?"
     response = agent(prompt)
@@ -110,6 +90,13 @@ async def run_agent(model_id: str):
     }
 
 
+# --- Added for AgentGym runner ---
+async def run_agent(model_id: str):
+    """Create and run the agent for the given model_id."""
+    # Strands calls are synchronous; run them on the sync-agent pool so other evaluations keep going
+    return await run_sync(_run_agent_sync, model_id)
+
+
 def get_context() -> AgentTestContext:
     """Get the current test context for checking tool calls."""
     return test_context
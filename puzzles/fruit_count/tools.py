@@ -1,8 +1,11 @@
 """Tools for the fruit counting puzzle."""
 
-import asyncio
 import logging
 
+from app.tool_latency import simulate_latency
+from app.tool_meta import tool_meta
+from app.tool_registry import ToolRegistry, ToolSpec
+
 logger = logging.getLogger(__name__)
 
 
@@ -19,25 +22,43 @@ def _get_fruit_count(fruit: str) -> int:
     return count
 
 # --- Async tools ---
+@tool_meta(read_only=True, idempotent=True)
 async def get_count_of_oranges(ctx) -> int:
     """Get the current count of oranges in inventory."""
     logger.info("🍊 get_count_of_oranges tool called")
-    await asyncio.sleep(0.1)
+    await simulate_latency(0.1)
     return _get_fruit_count("orange")
 
+@tool_meta(read_only=True, idempotent=True)
 async def get_count_of_apples(ctx) -> int:
     """Get the current count of apples in inventory."""
     logger.info("🍎 get_count_of_apples tool called")
-    await asyncio.sleep(0.1)
+    await simulate_latency(0.1)
     return _get_fruit_count("apple")
 
 # --- Sync tools ---
+@tool_meta(read_only=True, idempotent=True)
 def get_count_of_oranges_sync() -> int:
     """Get the current count of oranges in inventory (sync version)."""
     logger.info("🍊 get_count_of_oranges_sync tool called")
     return _get_fruit_count("orange")
 
+@tool_meta(read_only=True, idempotent=True)
 def get_count_of_apples_sync() -> int:
     """Get the current count of apples in inventory (sync version)."""
     logger.info("🍎 get_count_of_apples_sync tool called")
     return _get_fruit_count("apple")
+
+# --- Registry (the tools as offered to the model by every framework) ---
+TOOLS = ToolRegistry(
+    ToolSpec(
+        "get_count_of_oranges", get_count_of_oranges,
+        "Get the current count of oranges in inventory",
+        sync_function=get_count_of_oranges_sync,
+    ),
+    ToolSpec(
+        "get_count_of_apples", get_count_of_apples,
+        "Get the current count of apples in inventory",
+        sync_function=get_count_of_apples_sync,
+    ),
+)
@@ -1,11 +1,15 @@
 """Tools for the Towers of Hanoi puzzle."""
 
 
-import asyncio
 import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
 from typing import List, Dict, Any
  
 from app.logfire_util import span_decorator
+from app.tool_latency import simulate_latency
+from app.tool_meta import ToolMemo, tool_meta
+from app.tool_registry import ToolRegistry, ToolSpec
 
 logger = logging.getLogger(__name__)
 
@@ -20,53 +24,106 @@ def get_default_towers() -> Dict[str, List[int]]:
         'Z': []          # Tower C starts empty
     }
 
-# Global state for the puzzle
-_TOWERS = get_default_towers()
+class TowersOfHanoiSession:
+    """Board state for a single evaluation.
 
-# --- Column names utility ---
-def _get_column_names() -> list:
-    """Return the list of tower (column) names."""
-    return list(_TOWERS.keys())
+    Every evaluation owns its own session so concurrent runs on the same event
+    loop cannot corrupt each other's towers.
+    """
 
-def _reset_towers():
-    """Reset towers to initial state."""
-    global _TOWERS
-    _TOWERS = get_default_towers()
-    logger.info("🗼 Towers reset to initial state")
+    def __init__(self):
+        self.towers = get_default_towers()
+        self.moves_made: List[Dict[str, str]] = []
+        self.memo = ToolMemo()  # Read-only tool results since the towers last changed
 
-def _is_valid_move(from_tower: str, to_tower: str) -> bool:
-    """Check if a move is valid (smaller disk on larger disk)."""
-    if not _TOWERS[from_tower]:
-        return False  # Can't move from empty tower
-    
-    if not _TOWERS[to_tower]:
-        return True  # Can always move to empty tower
-    
-    # Check if top disk of from_tower is smaller than top disk of to_tower
-    return _TOWERS[from_tower][-1] < _TOWERS[to_tower][-1]
+    def get_column_names(self) -> list:
+        """Return the list of tower (column) names."""
+        return list(self.towers.keys())
 
-def _make_move(from_tower: str, to_tower: str) -> bool:
-    """Make a move if valid, return success status."""
-    if not _is_valid_move(from_tower, to_tower):
-        return False
-    
-    disk = _TOWERS[from_tower].pop()
-    _TOWERS[to_tower].append(disk)
-    logger.info(f"🔄 Moved disk {disk} from tower {from_tower} to tower {to_tower}")
-    return True
+    def reset(self):
+        """Reset towers to initial state."""
+        self.towers = get_default_towers()
+        self.moves_made = []
+        self.memo.clear()
+        logger.info("🗼 Towers reset to initial state")
+
+    def is_valid_move(self, from_tower: str, to_tower: str) -> bool:
+        """Check if a move is valid (smaller disk on larger disk)."""
+        if not self.towers[from_tower]:
+            return False  # Can't move from empty tower
+
+        if not self.towers[to_tower]:
+            return True  # Can always move to empty tower
+
+        # Check if top disk of from_tower is smaller than top disk of to_tower
+        return self.towers[from_tower][-1] < self.towers[to_tower][-1]
+
+    def make_move(self, from_tower: str, to_tower: str) -> bool:
+        """Make a move if valid, return success status."""
+        if not self.is_valid_move(from_tower, to_tower):
+            return False
+
+        disk = self.towers[from_tower].pop()
+        self.towers[to_tower].append(disk)
+        self.moves_made.append({"from": from_tower, "to": to_tower})
+        self.memo.clear()
+        logger.info(f"🔄 Moved disk {disk} from tower {from_tower} to tower {to_tower}")
+        return True
+
+    def is_solved(self) -> bool:
+        """Check if puzzle is solved (all disks on the last tower)."""
+        return self.towers['Z'] == [3, 2, 1]
+
+    def get_tower_state(self) -> Dict[str, List[int]]:
+        """Get a snapshot of the current state of all towers."""
+        return {name: list(disks) for name, disks in self.towers.items()}
 
-def _is_solved() -> bool:
-    """Check if puzzle is solved (all disks on tower C)."""
-    return _TOWERS['Z'] == [3, 2, 1]
 
-def _get_tower_state() -> Dict[str, List[int]]:
-    """Get the current state of all towers."""
-    return dict(_TOWERS)
+# Session used by tool calls that do not carry one on their context (e.g. sync tools)
+_current_session: ContextVar[TowersOfHanoiSession | None] = ContextVar(
+    "towers_of_hanoi_session", default=None
+)
 
-def _move_disk_impl(from_tower: str, to_tower: str) -> Dict[str, Any]:
+
+@contextmanager
+def use_session(session: TowersOfHanoiSession):
+    """Make ``session`` the active session for the current context."""
+    token = _current_session.set(session)
+    try:
+        yield session
+    finally:
+        _current_session.reset(token)
+
+
+def get_session(ctx=None) -> TowersOfHanoiSession:
+    """Resolve the session a tool call operates on.
+
+    Looks at ``ctx.deps.session`` (pydantic-ai ``RunContext``), then
+    ``ctx.session`` (adapter contexts), then the session set with
+    :func:`use_session`.
+    """
+    for candidate in (getattr(getattr(ctx, "deps", None), "session", None), getattr(ctx, "session", None)):
+        if isinstance(candidate, TowersOfHanoiSession):
+            return candidate
+    session = _current_session.get()
+    if session is None:
+        raise RuntimeError("No Towers of Hanoi session: pass a context with a session or use use_session()")
+    return session
+
+
+def _ctx_memo(ctx=None, *args, **kwargs) -> ToolMemo:
+    """Memo of the session an async tool call operates on."""
+    return get_session(ctx).memo
+
+
+def _current_memo(*args, **kwargs) -> ToolMemo:
+    """Memo of the session set with :func:`use_session` (sync tools)."""
+    return get_session().memo
+
+def _move_disk_impl(session: TowersOfHanoiSession, from_tower: str, to_tower: str) -> Dict[str, Any]:
     """Implementation for moving a disk."""
     # Validate tower names
-    if from_tower not in _get_column_names() or to_tower not in _get_column_names():
+    if from_tower not in session.get_column_names() or to_tower not in session.get_column_names():
         return {
             'success': False,
             'message': "Invalid tower names."
@@ -79,20 +136,20 @@ def _move_disk_impl(from_tower: str, to_tower: str) -> Dict[str, Any]:
         }
     
     # Check if move is valid
-    if not _TOWERS[from_tower]:
+    if not session.towers[from_tower]:
         return {
             'success': False,
             'message': f"Tower {from_tower} is empty"
         }
     
-    if not _is_valid_move(from_tower, to_tower):
+    if not session.is_valid_move(from_tower, to_tower):
         return {
             'success': False,
             'message': "Invalid move: cannot place larger disk on smaller disk"
         }
     
     # Make the move
-    success = _make_move(from_tower, to_tower)
+    success = session.make_move(from_tower, to_tower)
     if success:
         return {
             'success': True,
@@ -104,9 +161,9 @@ def _move_disk_impl(from_tower: str, to_tower: str) -> Dict[str, Any]:
             'message': f"Failed to move disk from {from_tower} to {to_tower}"
         }
 
-def _check_if_solved_impl() -> Dict[str, Any]:
+def _check_if_solved_impl(session: TowersOfHanoiSession) -> Dict[str, Any]:
     """Implementation for checking if puzzle is solved."""
-    solved = _is_solved()
+    solved = session.is_solved()
     if solved:
         logger.info("🎉 Puzzle solved!")
         return {
@@ -119,15 +176,16 @@ def _check_if_solved_impl() -> Dict[str, Any]:
             'message': "Puzzle not yet solved."
         }
 
-def _reset_puzzle_impl() -> Dict[str, str]:
+def _reset_puzzle_impl(session: TowersOfHanoiSession) -> Dict[str, str]:
     """Implementation for resetting the puzzle."""
-    _reset_towers()
+    session.reset()
     return {
         'message': "Puzzle reset to initial state."
     }
 
 # --- Async tools ---
 
+@tool_meta(read_only=True, idempotent=True, memo=_ctx_memo)
 @span_decorator("get_tower_state")
 async def get_tower_state(ctx) -> Dict[str, List[int]]:
     """Get the current state of all towers.
@@ -137,11 +195,12 @@ async def get_tower_state(ctx) -> Dict[str, List[int]]:
         Disks are ordered from bottom to top (largest to smallest numbers).
     """
     logger.info("🔍 get_tower_state tool called")
-    await asyncio.sleep(0.1)  # Simulate async operation
-    state = _get_tower_state()
+    await simulate_latency(0.1)  # Simulate async operation
+    state = get_session(ctx).get_tower_state()
     logger.info(f"📊 Current tower state: {state}")
     return state
 
+@tool_meta(read_only=True, idempotent=True, memo=_ctx_memo)
 @span_decorator("get_column_names")
 async def get_column_names(ctx) -> list:
     """Get the list of tower (column) names.
@@ -149,9 +208,10 @@ async def get_column_names(ctx) -> list:
         List of column names (ex., ['A', 'B', 'C'])
     """
     logger.info("🔍 get_column_names tool called")
-    await asyncio.sleep(0.05)  # Simulate async operation
-    return _get_column_names()
+    await simulate_latency(0.05)  # Simulate async operation
+    return get_session(ctx).get_column_names()
 
+@tool_meta(invalidates=True, memo=_ctx_memo)
 @span_decorator("move_disk", attrs=["from_tower", "to_tower"], capture_return_value=True)
 async def move_disk(ctx, from_tower: str, to_tower: str) -> Dict[str, Any]:
     """Move a disk from one tower to another.
@@ -164,9 +224,10 @@ async def move_disk(ctx, from_tower: str, to_tower: str) -> Dict[str, Any]:
         Dict with 'success' (bool) and 'message' (str) keys.
     """
     logger.info(f"🎯 move_disk tool called: {from_tower} → {to_tower}")
-    await asyncio.sleep(0.1)  # Simulate async operation
-    return _move_disk_impl(from_tower, to_tower)
+    await simulate_latency(0.1)  # Simulate async operation
+    return _move_disk_impl(get_session(ctx), from_tower, to_tower)
 
+@tool_meta(read_only=True, idempotent=True, memo=_ctx_memo)
 @span_decorator("check_if_solved")
 async def check_if_solved(ctx) -> Dict[str, Any]:
     """Check if the puzzle is solved.
@@ -175,9 +236,10 @@ async def check_if_solved(ctx) -> Dict[str, Any]:
         Dict with 'solved' (bool) and 'message' (str) keys.
     """
     logger.info("🎯 check_if_solved tool called")
-    await asyncio.sleep(0.1)  # Simulate async operation
-    return _check_if_solved_impl()
+    await simulate_latency(0.1)  # Simulate async operation
+    return _check_if_solved_impl(get_session(ctx))
 
+@tool_meta(idempotent=True, invalidates=True, memo=_ctx_memo)
 @span_decorator("reset_puzzle")
 async def reset_puzzle(ctx) -> Dict[str, str]:
     """Reset the puzzle to initial state.
@@ -186,37 +248,75 @@ async def reset_puzzle(ctx) -> Dict[str, str]:
         Dict with 'message' key confirming reset.
     """
     logger.info("🔄 reset_puzzle tool called")
-    await asyncio.sleep(0.1)  # Simulate async operation
-    return _reset_puzzle_impl()
+    await simulate_latency(0.1)  # Simulate async operation
+    return _reset_puzzle_impl(get_session(ctx))
 
-# --- Sync tools (delegate to async implementations) ---
+# --- Sync tools (operate on the session set with use_session) ---
 
+@tool_meta(read_only=True, idempotent=True, memo=_current_memo)
 @span_decorator("get_tower_state_sync")
 def get_tower_state_sync() -> Dict[str, List[int]]:
     """Get the current state of all towers (sync version)."""
     logger.info("🔍 get_tower_state_sync tool called")
-    return _get_tower_state()
+    return get_session().get_tower_state()
 
+@tool_meta(read_only=True, idempotent=True, memo=_current_memo)
 @span_decorator("get_column_names_sync")
 def get_column_names_sync() -> list:
     """Get the list of tower (column) names (sync version)."""
     logger.info("🔍 get_column_names_sync tool called")
-    return _get_column_names()
+    return get_session().get_column_names()
 
+@tool_meta(invalidates=True, memo=_current_memo)
 @span_decorator("move_disk_sync", attrs=["from_tower", "to_tower"], capture_return_value=True)
 def move_disk_sync(from_tower: str, to_tower: str) -> Dict[str, Any]:
     """Move a disk from one tower to another (sync version)."""
     logger.info(f"🎯 move_disk_sync tool called: {from_tower} → {to_tower}")
-    return _move_disk_impl(from_tower, to_tower)
+    return _move_disk_impl(get_session(), from_tower, to_tower)
 
+@tool_meta(read_only=True, idempotent=True, memo=_current_memo)
 @span_decorator("check_if_solved_sync")
 def check_if_solved_sync() -> Dict[str, Any]:
     """Check if the puzzle is solved (sync version)."""
     logger.info("🎯 check_if_solved_sync tool called")
-    return _check_if_solved_impl()
+    return _check_if_solved_impl(get_session())
 
+@tool_meta(idempotent=True, invalidates=True, memo=_current_memo)
 @span_decorator("reset_puzzle_sync")
 def reset_puzzle_sync() -> Dict[str, str]:
     """Reset the puzzle to initial state (sync version)."""
     logger.info("🔄 reset_puzzle_sync tool called")
-    return _reset_puzzle_impl()
+    return _reset_puzzle_impl(get_session())
+
+# --- Registry (the tools as offered to the model by every framework) ---
+TOOLS = ToolRegistry(
+    ToolSpec(
+        "get_tower_state", get_tower_state,
+        "Get the current state of all towers. Returns a dict mapping tower names ('A', 'B', 'C') to lists of disk sizes.",
+        sync_function=get_tower_state_sync,
+    ),
+    ToolSpec(
+        "move_disk", move_disk,
+        "Move a disk from one tower to another. Returns success status and message.",
+        sync_function=move_disk_sync,
+        parameters={
+            "from_tower": "Source tower (ex. 'A', 'B', or 'C')",
+            "to_tower": "Destination tower (ex. 'A', 'B', or 'C')",
+        },
+    ),
+    ToolSpec(
+        "check_if_solved", check_if_solved,
+        "Check if the puzzle is solved. Returns dict with 'solved' (bool) and 'message' keys.",
+        sync_function=check_if_solved_sync,
+    ),
+    ToolSpec(
+        "reset_puzzle", reset_puzzle,
+        "Reset the puzzle to initial state. Returns confirmation message.",
+        sync_function=reset_puzzle_sync,
+    ),
+    ToolSpec(
+        "get_column_names", get_column_names,
+        "Get the list of tower (column) names. Returns a list of column names (e.g., ['A', 'B', 'C']).",
+        sync_function=get_column_names_sync,
+    ),
+)
@@ -1,16 +1,40 @@
 """Main evaluation runner for AgentGym."""
 
+import argparse
 import asyncio
 import os
 import time
 from datetime import datetime
 from pathlib import Path
-from typing import Dict
+from typing import Callable, Dict
 
-import logfire
-from app.utils import setup_aws_environment, setup_logging, setup_logfire
+from app.import_profile import log_import_report, timed_import
+
+# Imported through the profiler so the startup report shows their cost
+logfire = timed_import("logfire")
+config = timed_import("config")
+
+from app.cache import CACHE_MODES, CacheStats, track_cache_stats
+from app.cassettes import use_cassette
+from app.context_policy import parse_context_policy
+from app.fanout import FanoutCell, FanoutStats, track_fanout
+from app.prompt_cache import PromptUsage, track_prompt_usage
+from app.utils import run_context, setup_aws_environment, setup_logging, setup_logfire
 from app.reporting import EvaluationResult, EvaluationSummary, save_reports
-import config
+from app.scheduler import ConcurrencyLimiter, EvaluationCell, EvaluationJob, model_label
+from app.workers import run_sharded
+from app.journal import ResultJournal, cell_key, result_key
+from app.stats import wilson_interval
+from app.hedging import LatencyTracker, run_hedged
+from app.registry import PluginRegistry, get_registry
+from app.rate_limit import set_rate_limit_share, track_throttling
+from app.http_pool import close_http_clients
+from app.bedrock_pool import get_bedrock_client
+from app.streaming import summarize_calls, track_stream_metrics
+from app.event_loop import LoopBlocking, SyncSlot, acquire_sync_slot, measure_loop_blocking, use_sync_slot
+from app.tool_dispatch import ToolTiming, track_tool_timing
+from app.tool_latency import get_tool_latency, parse_tool_latency, track_simulated_latency
+from app.tool_meta import ToolCallStats, track_tool_calls
 
 logger = setup_logging()
 
@@ -18,43 +42,204 @@ logger = setup_logging()
 class EvaluationRunner:
     """Orchestrates evaluation runs across puzzles, frameworks, and models."""
     
-    def __init__(self):
+    def __init__(self, journal: ResultJournal | None = None, registry: PluginRegistry | None = None):
         self.results: list[EvaluationResult] = []
+        self.journal = journal
+        self.registry = registry or get_registry()
+        self.latencies = LatencyTracker()
+        self._completed = 0
+        self._total = 0
         
     async def run_single_evaluation(
         self,
         puzzle_name: str,
         framework_name: str,
         model_config,
-        run_number: int
+        run_number: int,
+        fanout: FanoutCell | None = None,
     ) -> EvaluationResult:
-        """Run a single evaluation and return the result, including token usage."""
+        """Run a single evaluation and return the result, including token usage.
+
+        The agent run is bounded by ``config.TEST_TIMEOUT`` and, when hedging is
+        enabled, duplicated once it outlives the p95 latency seen so far for the
+        same framework/model. ``fanout`` is the first-turn sharing group of the
+        cell's initial runs, if any.
+        """
 
         # Extract model identifier for logging
-        if isinstance(model_config, dict):
-            model_id = model_config.get("name", "custom_endpoint")
-        else:
-            model_id = model_config
+        model_id = model_label(model_config)
+        label = f"{puzzle_name}/{framework_name}/{model_id}/run_{run_number}"
 
-        logger.info(f"🚀 Running {puzzle_name}/{framework_name}/{model_id}/run_{run_number}")
+        logger.info(f"🚀 Running {label}")
+
+        try:
+            threaded = (
+                self.registry.unavailable_reason(puzzle_name, framework_name) is None
+                and self.registry.runs_on_threads(framework_name, puzzle_name)
+            )
+        except Exception:
+            threaded = False  # The import error is reported when the agent is loaded below
+        # Threaded adapters wait for a free thread before their clock and deadline start
+        sync_slots: list[SyncSlot] = [await acquire_sync_slot()] if threaded else []
 
         start_time = time.time()
 
         prompt_tokens = None
         prediction_tokens = None
+        cached_prompt_tokens = None
+        cache_write_tokens = None
+        context_policy = None
+        prompt_usage = PromptUsage()
+        tool_timing = ToolTiming()
+        tool_calls = ToolCallStats()
+        simulated = None
+        loop_blocking = LoopBlocking()  # Summed over attempts: every hedge blocks the shared loop
+        attempts = 0
+        throttle_time = 0.0
+        throttle_retries = 0
+        attempt_calls: list[list] = []  # Streamed call metrics of each attempt
+        cache_stats = CacheStats()
+        fanout_stats = FanoutStats()
+        stream_calls: list = []
+        deadline = asyncio.timeout(config.TEST_TIMEOUT)
+
+        def make_result(status: str, error_message: str | None = None) -> EvaluationResult:
+            # Cells that never ran have no time to contribute to the averages
+            execution_time = None if status == "Not Available" else time.time() - start_time
+            log_fields = dict(
+                puzzle=puzzle_name,
+                framework=framework_name,
+                model=model_id,
+                run_number=run_number,
+                execution_time=execution_time,
+                status=status,
+                attempts=max(attempts, 1),
+                throttle_time=throttle_time,
+                from_cache=cache_stats.hits > 0,
+            )
+            if status == "Pass":
+                logger.info(f"✅ {label} - PASSED ({execution_time:.2f}s)")
+                logfire.info("Evaluation completed successfully", **log_fields,
+                             prompt_tokens=prompt_tokens, prediction_tokens=prediction_tokens,
+                             cached_prompt_tokens=cached_prompt_tokens)
+            elif status == "Not Available":
+                logger.info(f"⚪ {label} - NOT AVAILABLE (no implementation)")
+                logfire.info("Evaluation not available - no implementation", **log_fields)
+            elif status == "Timeout":
+                logger.error(f"⏱️  {label} - TIMED OUT after {execution_time:.2f}s")
+                logfire.error("Evaluation timed out", **log_fields, error=error_message)
+            else:
+                logger.error(f"❌ {label} - FAILED: {error_message}")
+                logfire.error("Evaluation failed", **log_fields, error=error_message)
+
+            return EvaluationResult(
+                puzzle=puzzle_name,
+                framework=framework_name,
+                model=model_id,
+                run_number=run_number,
+                status=status,
+                error_message=error_message,
+                execution_time=execution_time,
+                prompt_tokens=prompt_tokens,
+                prediction_tokens=prediction_tokens,
+                cached_prompt_tokens=cached_prompt_tokens,
+                cache_write_tokens=cache_write_tokens,
+                context_policy=context_policy,
+                tool_time=tool_timing.tool_time if tool_timing.turns else None,
+                tool_wall_time=tool_timing.wall_time if tool_timing.turns else None,
+                tool_calls=tool_calls.calls if tool_calls.calls else None,
+                redundant_tool_calls=tool_calls.redundant if tool_calls.calls else None,
+                tool_latency=simulated.profile.name if simulated and simulated.calls else None,
+                simulated_tool_time=simulated.wait_time if simulated and simulated.calls else None,
+                attempts=max(attempts, 1),
+                throttle_time=throttle_time,
+                throttle_retries=throttle_retries,
+                cache_hits=cache_stats.hits,
+                cache_misses=cache_stats.misses,
+                cache_coalesced=cache_stats.coalesced,
+                # Latency of cached calls is not the endpoint's; such runs stay out of timing averages
+                from_cache=cache_stats.hits > 0,
+                fanout_shared=fanout_stats.shared_turns > 0,
+                fanout_saved_prompt_tokens=fanout_stats.saved_prompt_tokens,
+                fanout_saved_time=fanout_stats.saved_request_time,
+                loop_blocked_time=loop_blocking.blocked_time,
+                longest_loop_step=loop_blocking.longest_step,
+                sync_queue_time=sync_slots[0].queue_time if sync_slots else None,
+                abandoned_threads=sum(slot.abandoned_threads for slot in sync_slots),
+                # The winning attempt's calls, or the first attempt's if none won
+                **summarize_calls(stream_calls or (attempt_calls[0] if attempt_calls else []))
+            )
+
+        unavailable = self.registry.unavailable_reason(puzzle_name, framework_name)
+        if unavailable is not None:
+            return make_result("Not Available", unavailable)
 
         try:
-            # Import checker for this puzzle
-            checker_module = __import__(f"puzzles.{puzzle_name}.checker", fromlist=["check"])
-            check_func = checker_module.check
+            check_func = self.registry.checker(puzzle_name)
+            run_agent_func = self.registry.agent(framework_name, puzzle_name)
+            # Provider details such as the AWS account ID are only resolved for scheduled models
+            resolved_model = config.resolve_model(model_config)
 
-            # Import framework agent factory (reflecting new tree structure)
-            framework_module = __import__(f"frameworks.{framework_name}.{puzzle_name}.agent", fromlist=["run_agent"])
-            run_agent_func = framework_module.run_agent
+            latency_key = (framework_name, model_id)
 
-            # Create and run agent (await if coroutine)
-            with logfire.span("agent_execution"):
-                agent_result = await run_agent_func(model_config)
+            async def attempt():
+                # Counted as attempts start so timed-out runs still report their hedges
+                nonlocal attempts, throttle_time, throttle_retries, fanout_stats
+                attempts += 1
+                attempt_number = attempts
+                slot = None
+                if threaded:
+                    # The first attempt's thread was reserved before the clock; hedges wait within the deadline
+                    slot = sync_slots[0] if attempt_number == 1 else await acquire_sync_slot()
+                    if attempt_number > 1:
+                        sync_slots.append(slot)
+                attempt_start = time.time()
+                with (
+                    run_context(run_number, fanout=fanout, attempt=attempt_number),
+                    use_sync_slot(slot),
+                    track_throttling() as throttling,
+                    track_stream_metrics() as calls,
+                    track_cache_stats() as cached,
+                    track_fanout() as fanned,
+                    track_prompt_usage() as used,
+                    track_tool_timing() as tooled,
+                    track_tool_calls() as called,
+                    # Seeded by the run number, so sampled latencies repeat across reruns and hedges
+                    track_simulated_latency(get_tool_latency(model_config, seed=run_number)) as waited,
+                ):
+                    attempt_calls.append(calls)
+                    try:
+                        outcome = await measure_loop_blocking(run_agent_func(resolved_model), loop_blocking)
+                    finally:
+                        throttle_time += throttling.wait_time
+                        throttle_retries += throttling.retries
+                        cache_stats.add(cached)
+                        if attempt_number > 1 and cached.coalesced and not (cached.misses or cached.hits):
+                            # A hedge that only waited on other calls duplicated nothing
+                            logger.warning(f"⚠️  {label}: hedged attempt {attempt_number} sent no request of its own")
+                        # Hedged attempts share the run's choice; count its savings once
+                        if fanned.shared_turns and not fanout_stats.shared_turns:
+                            fanout_stats = fanned
+                # Rate-limit waits and cache hits are not model latency; keep them out of the hedging percentile
+                if not cached.hits:
+                    self.latencies.record(latency_key, time.time() - attempt_start - throttling.wait_time)
+                return outcome, calls, used, tooled, called, waited
+
+            hedge_after = None
+            if config.HEDGING_ENABLED:
+                hedge_after = self.latencies.percentile(
+                    latency_key, config.HEDGING_PERCENTILE, min_samples=config.HEDGING_MIN_SAMPLES
+                )
+
+            # Create and run agent; the deadline cancels every outstanding attempt
+            with (
+                logfire.span("agent_execution", hedge_after=hedge_after),
+                use_cassette(puzzle_name, framework_name, model_id, run_number),
+            ):
+                async with deadline:
+                    (agent_result, stream_calls, prompt_usage, tool_timing, tool_calls, simulated), _ = await run_hedged(
+                        attempt, hedge_after, max_attempts=config.HEDGING_MAX_ATTEMPTS
+                    )
 
             # Only support new AgentGymAgentResult return type
             if isinstance(agent_result, dict):
@@ -62,133 +247,211 @@ class EvaluationRunner:
                 usage = agent_result.get("usage")
                 prompt_tokens = usage.get("prompt_tokens") if usage else None
                 prediction_tokens = usage.get("completion_tokens") if usage else None
+                cached_prompt_tokens = usage.get("cached_tokens") if usage else None
+                context_policy = usage.get("context_policy") if usage else None
             else:
                 result = agent_result
+            if prompt_tokens is None and prompt_usage.calls:
+                # Bedrock adapters return no usage; it was recorded by the pooled client
+                prompt_tokens = prompt_usage.prompt_tokens
+                prediction_tokens = prompt_usage.completion_tokens
+                cached_prompt_tokens = prompt_usage.cached_tokens
+                cache_write_tokens = prompt_usage.cache_write_tokens
 
             # Check result
             with logfire.span("result_validation"):
                 check_func(result)
 
-            execution_time = time.time() - start_time
+            return make_result("Pass")
 
-            logger.info(f"✅ {puzzle_name}/{framework_name}/{model_id}/run_{run_number} - PASSED ({execution_time:.2f}s)")
+        except TimeoutError as e:
+            if deadline.expired():
+                return make_result("Timeout", f"Exceeded TEST_TIMEOUT of {config.TEST_TIMEOUT}s")
+            # A timeout raised by the agent itself (e.g. a socket timeout) is an ordinary failure
+            return make_result("Fail", str(e))
 
-            # Log success to Logfire
-            logfire.info(
-                "Evaluation completed successfully",
-                puzzle=puzzle_name,
-                framework=framework_name,
-                model=model_id,
-                run_number=run_number,
-                execution_time=execution_time,
-                status="Pass",
-                prompt_tokens=prompt_tokens,
-                prediction_tokens=prediction_tokens
-            )
+        except Exception as e:
+            return make_result("Fail", str(e))
 
-            return EvaluationResult(
-                puzzle=puzzle_name,
-                framework=framework_name,
-                model=model_id,
-                run_number=run_number,
-                status="Pass",
-                execution_time=execution_time,
-                prompt_tokens=prompt_tokens,
-                prediction_tokens=prediction_tokens
-            )
+        finally:
+            # Slots of threads still running are given back when those threads finish
+            for slot in sync_slots:
+                slot.release()
+    
+    def plan_cells(self) -> list[EvaluationCell]:
+        """Expand the configured matrix into an ordered list of cells."""
+        cells = []
+        for puzzle in config.PUZZLES:
+            for combo in config.FRAMEWORK_MODEL_COMBINATIONS:
+                for framework in combo["frameworks"]:
+                    for model in combo["models"]:
+                        cells.append(EvaluationCell(
+                            index=len(cells),
+                            puzzle=puzzle,
+                            framework=framework,
+                            model=model,
+                        ))
+        return cells
 
-        except ModuleNotFoundError as e:
-            # Framework doesn't have implementation for this puzzle
-            if f"frameworks.{framework_name}.{puzzle_name}" in str(e):
-                execution_time = time.time() - start_time
-                
-                logger.info(f"⚪ {puzzle_name}/{framework_name}/{model_id}/run_{run_number} - NOT AVAILABLE (no implementation)")
-                
-                # Log as not available to Logfire
-                logfire.info(
-                    "Evaluation not available - no implementation",
-                    puzzle=puzzle_name,
-                    framework=framework_name,
-                    model=model_id,
-                    run_number=run_number,
-                    execution_time=execution_time,
-                    status="Not Available"
-                )
+    def split_available(
+        self, cells: list[EvaluationCell]
+    ) -> tuple[list[EvaluationCell], list[EvaluationResult]]:
+        """Prune cells without an implementation from the plan.
 
-                return EvaluationResult(
-                    puzzle=puzzle_name,
-                    framework=framework_name,
-                    model=model_id,
-                    run_number=run_number,
+        Returns the runnable cells and placeholder "Not Available" results for
+        the pruned ones, which are reported without ever being scheduled.
+        """
+        runnable: list[EvaluationCell] = []
+        unavailable: list[EvaluationResult] = []
+        for cell in cells:
+            reason = self.registry.unavailable_reason(cell.puzzle, cell.framework)
+            if reason is None:
+                runnable.append(cell)
+                continue
+            unavailable.extend(
+                EvaluationResult(
+                    puzzle=cell.puzzle,
+                    framework=cell.framework,
+                    model=model_label(cell.model),
+                    run_number=run_num,
                     status="Not Available",
-                    error_message=f"No implementation for {puzzle_name} puzzle",
-                    execution_time=execution_time,
-                    prompt_tokens=prompt_tokens,
-                    prediction_tokens=prediction_tokens
+                    error_message=reason,
                 )
-            else:
-                # Different module not found error, treat as failure
-                execution_time = time.time() - start_time
-                error_msg = str(e)
+                for run_num in range(1, self._initial_runs() + 1)
+            )
+        return runnable, unavailable
 
-                logger.error(f"❌ {puzzle_name}/{framework_name}/{model_id}/run_{run_number} - FAILED: {error_msg}")
-                
-                # Log error to Logfire
-                logfire.error(
-                    "Evaluation failed",
-                    puzzle=puzzle_name,
-                    framework=framework_name,
-                    model=model_id,
-                    run_number=run_number,
-                    execution_time=execution_time,
-                    error=error_msg,
-                    status="Fail"
-                )
+    def _initial_runs(self) -> int:
+        """Runs started up front for every cell."""
+        return config.MIN_RUNS if config.ADAPTIVE_RUNS else config.NUM_RUNS
+
+    def _needs_more_runs(self, results: list[EvaluationResult]) -> bool:
+        """Adaptive mode: keep sampling until the pass-rate CI is narrow enough."""
+        if not config.ADAPTIVE_RUNS or len(results) >= config.MAX_RUNS:
+            return False
+        testable = [r for r in results if r.status != "Not Available"]
+        if not testable:
+            return False
+        passes = len([r for r in testable if r.status == "Pass"])
+        low, high = wilson_interval(passes, len(testable), config.CI_Z)
+        return high - low > config.CI_TARGET_WIDTH
+
+    def _make_limiter(self, shared_by: int = 1) -> ConcurrencyLimiter:
+        """Build the scheduler limits, split evenly when several workers share them.
 
-                return EvaluationResult(
-                    puzzle=puzzle_name,
-                    framework=framework_name,
-                    model=model_id,
-                    run_number=run_number,
-                    status="Fail",
-                    error_message=error_msg,
-                    execution_time=execution_time,
-                    prompt_tokens=prompt_tokens,
-                    prediction_tokens=prediction_tokens
+        Shares are rounded down so the workers together never exceed a limit.
+        Limits smaller than the worker count are not split: ``shard_cells``
+        puts all cells under such a limit on one worker, which gets all of it.
+        """
+        def share(limit: int) -> int:
+            return limit if limit < shared_by else limit // shared_by
+
+        return ConcurrencyLimiter(
+            global_limit=share(config.MAX_CONCURRENCY),
+            default_target_limit=share(config.DEFAULT_TARGET_CONCURRENCY),
+            target_limits={key: share(limit) for key, limit in config.TARGET_CONCURRENCY.items()},
+            puzzle_limits={key: share(limit) for key, limit in config.PUZZLE_CONCURRENCY.items()},
+        )
+
+    async def _run_job(
+        self,
+        job: EvaluationJob,
+        limiter: ConcurrencyLimiter,
+        on_result: Callable[[EvaluationJob, EvaluationResult], None] | None
+    ) -> EvaluationResult:
+        """Run one job once the scheduler grants it a slot."""
+        async with limiter.slot(job):
+            with logfire.span(
+                f"run_{job.run_number}",
+                puzzle=job.puzzle,
+                framework=job.framework,
+                model=model_label(job.model),
+            ):
+                result = await self.run_single_evaluation(
+                    job.puzzle, job.framework, job.model, job.run_number, fanout=job.fanout
                 )
+        if on_result is not None:
+            on_result(job, result)
+        return result
+
+    async def _run_cell(
+        self,
+        cell: EvaluationCell,
+        prior: list[EvaluationResult],
+        limiter: ConcurrencyLimiter,
+        on_result: Callable[[EvaluationJob, EvaluationResult], None] | None
+    ) -> list[EvaluationResult]:
+        """Run a cell's initial runs concurrently, then extend it one run at a time in adaptive mode.
+
+        ``prior`` holds results already journaled for this cell; they are not
+        re-run but count towards the adaptive stopping rule. Only new results
+        are returned.
+        """
+        done_runs = {r.run_number for r in prior}
+        initial_runs = tuple(
+            run_num for run_num in range(1, self._initial_runs() + 1) if run_num not in done_runs
+        )
+        # The runs actually scheduled share their first turn when fan-out is on
+        fanout = FanoutCell(initial_runs) if config.FANOUT_FIRST_TURN and len(initial_runs) > 1 else None
+        initial_jobs = [EvaluationJob(cell=cell, run_number=run_num, fanout=fanout) for run_num in initial_runs]
+        new_results = list(await asyncio.gather(
+            *(self._run_job(job, limiter, on_result) for job in initial_jobs)
+        ))
+
+        while self._needs_more_runs(prior + new_results):
+            next_run = max(r.run_number for r in prior + new_results) + 1
+            job = EvaluationJob(cell=cell, run_number=next_run)
+            new_results.append(await self._run_job(job, limiter, on_result))
+
+        return new_results
+
+    async def run_cells(
+        self,
+        cells: list[EvaluationCell],
+        completed: list[EvaluationResult] | None = None,
+        shared_by: int = 1,
+        on_result: Callable[[EvaluationJob, EvaluationResult], None] | None = None
+    ) -> list[EvaluationResult]:
+        """Run cells concurrently in this process and return the new results."""
+        limiter = self._make_limiter(shared_by)
+        set_rate_limit_share(shared_by)
+        if any(not isinstance(cell.model, dict) for cell in cells):
+            await self._warm_bedrock_client()
+        # Imported before any run starts its clock; an import holds the loop and would stall every run
+        for cell in cells:
+            self.registry.preload(cell.framework, cell.puzzle)
+        prior_by_cell: dict = {}
+        for result in completed or []:
+            prior_by_cell.setdefault(result_key(result)[:3], []).append(result)
+
+        per_cell = await asyncio.gather(*(
+            self._run_cell(cell, prior_by_cell.get(cell_key(cell), []), limiter, on_result)
+            for cell in cells
+        ))
+        return [result for results in per_cell for result in results]
 
+    async def _warm_bedrock_client(self) -> None:
+        """Create the shared Bedrock client up front, so no run's execution_time includes it."""
+        try:
+            await asyncio.to_thread(get_bedrock_client)
         except Exception as e:
-                execution_time = time.time() - start_time
-                error_msg = str(e)
+            # Runs will surface the same error individually
+            logger.warning(f"⚠️  Could not create Bedrock client: {e}")
 
-                logger.error(f"❌ {puzzle_name}/{framework_name}/{model_id}/run_{run_number} - FAILED: {error_msg}")
-                
-                # Log error to Logfire
-                logfire.error(
-                    "Evaluation failed",
-                    puzzle=puzzle_name,
-                    framework=framework_name,
-                    model=model_id,
-                    run_number=run_number,
-                    execution_time=execution_time,
-                    error=error_msg,
-                    status="Fail"
-                )
+    def _on_result(self, job: EvaluationJob, result: EvaluationResult) -> None:
+        """Journal and track progress as results arrive, from this process or from workers."""
+        if self.journal is not None:
+            self.journal.append(result)
+        self._completed += 1
+        suffix = "+" if config.ADAPTIVE_RUNS else ""
+        logger.info(f"📈 Progress: {self._completed}/{self._total}{suffix}")
 
-                return EvaluationResult(
-                    puzzle=puzzle_name,
-                    framework=framework_name,
-                    model=model_id,
-                    run_number=run_number,
-                    status="Fail",
-                    error_message=error_msg,
-                    execution_time=execution_time,
-                    prompt_tokens=prompt_tokens,
-                    prediction_tokens=prediction_tokens
-                )
-    
-    async def run_all_evaluations(self) -> EvaluationSummary:
-        """Run all configured evaluations."""
+    async def run_all_evaluations(self, workers: int = 1, resume: bool = False) -> EvaluationSummary:
+        """Run all configured evaluations, optionally sharded across worker processes.
+
+        With ``resume``, evaluations already recorded in the journal are not run
+        again and their journaled results are reused.
+        """
         
         logger.info("🎯 Starting AgentGym evaluation run")
         logger.info("📊 Configuration:")
@@ -196,12 +459,47 @@ class EvaluationRunner:
         logger.info(f"   Framework-model combinations: {len(config.FRAMEWORK_MODEL_COMBINATIONS)}")
         
         # Calculate total evaluations from explicit combinations
-        total_evaluations = 0
-        for puzzle in config.PUZZLES:
-            for combo in config.FRAMEWORK_MODEL_COMBINATIONS:
-                total_evaluations += len(combo["frameworks"]) * len(combo["models"]) * config.NUM_RUNS
+        all_cells = self.plan_cells()
+        cells, unavailable = self.split_available(all_cells)
+        total_evaluations = len(cells) * self._initial_runs()
         
         logger.info(f"   Total evaluations: {total_evaluations}")
+        if unavailable:
+            logger.info(f"   Skipped (no implementation): {len(all_cells) - len(cells)} cells")
+        if config.ADAPTIVE_RUNS:
+            logger.info(
+                f"   Adaptive runs: {config.MIN_RUNS}-{config.MAX_RUNS} per cell, "
+                f"target CI width {config.CI_TARGET_WIDTH}"
+            )
+        logger.info(f"   Max concurrency: {config.MAX_CONCURRENCY}")
+        logger.info(f"   Cache mode: {config.CACHE_MODE}")
+        if config.CASSETTE_MODE != "off":
+            logger.info(f"   Cassettes: {config.CASSETTE_MODE} ({config.CASSETTE_DIR})")
+        if config.CASSETTE_MODE == "record" and config.CACHE_MODE in ("read-through", "replay"):
+            logger.warning("⚠️  Calls served from the disk cache are not recorded; use --cache-mode off or record")
+        if workers > config.MAX_CONCURRENCY:
+            # Every worker needs a global slot; more would exceed MAX_CONCURRENCY
+            logger.warning(
+                f"⚠️  --workers {workers} exceeds MAX_CONCURRENCY={config.MAX_CONCURRENCY}; "
+                f"using {config.MAX_CONCURRENCY} workers"
+            )
+            workers = config.MAX_CONCURRENCY
+        logger.info(f"   Worker processes: {workers}")
+
+        # Reuse results of a previous, interrupted run or start a fresh journal
+        planned_cells = {cell_key(cell): cell for cell in all_cells}
+        completed: list[EvaluationResult] = []
+        if self.journal is not None:
+            if resume:
+                runnable = {cell_key(cell) for cell in cells}
+                completed = [r for r in self.journal.load() if result_key(r)[:3] in runnable]
+            else:
+                self.journal.reset()
+        pending_initial = total_evaluations - len(
+            [r for r in completed if r.run_number <= self._initial_runs()]
+        )
+        if resume:
+            logger.info(f"   Resuming: {len(completed)} already journaled, {pending_initial} to run")
         
         # Setup AWS environment using AWS_PROFILE from environment
         aws_profile = os.environ.get("AWS_PROFILE")
@@ -213,31 +511,28 @@ class EvaluationRunner:
             total_evaluations=total_evaluations,
             puzzles=config.PUZZLES,
             num_runs=config.NUM_RUNS,
-            framework_combinations=len(config.FRAMEWORK_MODEL_COMBINATIONS)
+            adaptive_runs=config.ADAPTIVE_RUNS,
+            cache_mode=config.CACHE_MODE,
+            cassette_mode=config.CASSETTE_MODE,
+            framework_combinations=len(config.FRAMEWORK_MODEL_COMBINATIONS),
+            workers=workers
         )
         
-        current_eval = 0
-        
-        # Run all combinations with Logfire span
-        with logfire.span("evaluation_batch", total_evaluations=total_evaluations):
-            for puzzle in config.PUZZLES:
-                with logfire.span(f"puzzle_{puzzle}"):
-                    for combo in config.FRAMEWORK_MODEL_COMBINATIONS:
-                        for framework in combo["frameworks"]:
-                            with logfire.span(f"framework_{framework}"):
-                                for model in combo["models"]:
-                                    with logfire.span(f"model_{model}"):
-                                        for run_num in range(1, config.NUM_RUNS + 1):
-                                            with logfire.span(f"run_{run_num}"):
-                                                current_eval += 1
-                                                
-                                                logger.info(f"📈 Progress: {current_eval}/{total_evaluations}")
-                                                
-                                                result = await self.run_single_evaluation(
-                                                    puzzle, framework, model, run_num
-                                                )
-                                                
-                                                self.results.append(result)
+        self._completed = 0
+        self._total = pending_initial
+
+        # Run all combinations concurrently with Logfire span
+        with logfire.span("evaluation_batch", total_evaluations=total_evaluations, workers=workers):
+            if workers > 1:
+                new_results = await run_sharded(cells, completed, workers, on_result=self._on_result)
+            else:
+                new_results = await self.run_cells(cells, completed, on_result=self._on_result)
+
+        # Sort into plan order, so reports stay stable regardless of completion order
+        self.results.extend(sorted(
+            completed + new_results + unavailable,
+            key=lambda r: (planned_cells[result_key(r)[:3]].index, r.run_number)
+        ))
         
         # Create summary
         summary = EvaluationSummary(
@@ -251,8 +546,10 @@ class EvaluationRunner:
         failed_runs = len(self.results) - passed_runs
         success_rate = (passed_runs / len(self.results) * 100) if self.results else 0
         
-        # Calculate average execution time, handling None values
-        execution_times = [r.execution_time for r in self.results if r.execution_time is not None]
+        # Calculate average execution time of live runs, handling None values
+        execution_times = [
+            r.execution_time for r in self.results if r.execution_time is not None and not r.from_cache
+        ]
         avg_execution_time = sum(execution_times) / len(execution_times) if execution_times else 0
         
         logfire.info(
@@ -277,15 +574,92 @@ class EvaluationRunner:
         total_runs = summary.total_runs
         passed_runs = len([r for r in summary.results if r.status == "Pass"])
         failed_runs = len([r for r in summary.results if r.status == "Fail"])
+        timed_out_runs = len([r for r in summary.results if r.status == "Timeout"])
         not_available_runs = len([r for r in summary.results if r.status == "Not Available"])
-        success_rate = (passed_runs / (passed_runs + failed_runs) * 100) if (passed_runs + failed_runs) > 0 else 0
+        testable = passed_runs + failed_runs + timed_out_runs
+        success_rate = (passed_runs / testable * 100) if testable > 0 else 0
+        extra_attempts = sum(r.attempts - 1 for r in summary.results)
+        throttle_time = sum(r.throttle_time for r in summary.results)
+        throttle_retries = sum(r.throttle_retries for r in summary.results)
+        cache_hits = sum(r.cache_hits for r in summary.results)
+        cache_misses = sum(r.cache_misses for r in summary.results)
+        cache_coalesced = sum(r.cache_coalesced for r in summary.results)
+        cached_runs = len([r for r in summary.results if r.from_cache])
+        cache_reported = [r for r in summary.results if r.cached_prompt_tokens is not None]
+        cached_prompt = sum(r.cached_prompt_tokens for r in cache_reported)
+        cache_reported_prompt = sum(r.prompt_tokens or 0 for r in cache_reported)
+        tool_runs = [r for r in summary.results if r.tool_time is not None]
+        tool_time = sum(r.tool_time for r in tool_runs)
+        tool_wall_time = sum(r.tool_wall_time for r in tool_runs)
+        call_runs = [r for r in summary.results if r.tool_calls is not None]
+        latency_runs = [r for r in summary.results if r.simulated_tool_time is not None]
+        simulated_time = sum(r.simulated_tool_time for r in latency_runs)
+        latency_profiles = ", ".join(sorted({r.tool_latency for r in latency_runs}))
+        tool_calls = sum(r.tool_calls for r in call_runs)
+        redundant_calls = sum(r.redundant_tool_calls for r in call_runs)
+        fanout_runs = len([r for r in summary.results if r.fanout_shared])
+        fanout_tokens = sum(r.fanout_saved_prompt_tokens for r in summary.results)
+        fanout_time = sum(r.fanout_saved_time for r in summary.results)
+        blocking_runs = [r for r in summary.results if r.loop_blocked_time]
+        blocked_time = sum(r.loop_blocked_time for r in blocking_runs)
+        queued_runs = [r for r in summary.results if r.sync_queue_time]
+        queue_time = sum(r.sync_queue_time for r in queued_runs)
+        abandoned_threads = sum(r.abandoned_threads for r in summary.results)
         
         print("📊 Overall Statistics:")
         print(f"   Total runs: {total_runs}")
         print(f"   Passed: {passed_runs}")
         print(f"   Failed: {failed_runs}")
+        print(f"   Timed out: {timed_out_runs}")
         print(f"   Not Available: {not_available_runs}")
         print(f"   Success rate: {success_rate:.1f}% (excluding not available)")
+        if extra_attempts:
+            print(f"   Hedged attempts (overhead): {extra_attempts}")
+        if throttle_time or throttle_retries:
+            print(f"   Throttled: {throttle_time:.1f}s waiting, {throttle_retries} retries")
+        if cache_hits or cache_coalesced or cache_misses:
+            print(
+                f"   Cache: {cache_hits} hits, {cache_coalesced} coalesced, {cache_misses} misses "
+                f"({cache_hits + cache_coalesced} endpoint calls saved)"
+            )
+        if cached_runs:
+            print(f"   Served from cache: {cached_runs} runs (excluded from timing averages)")
+        if cache_reported_prompt:
+            print(
+                f"   Prompt cache: {cached_prompt} of {cache_reported_prompt} prompt tokens cached "
+                f"({cached_prompt / cache_reported_prompt * 100:.1f}%, {len(cache_reported)} runs reporting)"
+            )
+        if tool_runs:
+            print(
+                f"   Tool calls: {tool_wall_time:.1f}s wall time for {tool_time:.1f}s of tool time "
+                f"({max(tool_time - tool_wall_time, 0):.1f}s saved by concurrent dispatch)"
+            )
+        if latency_runs:
+            print(
+                f"   Simulated tool latency ({latency_profiles}): {simulated_time:.1f}s over {len(latency_runs)} runs "
+                f"(included in execution times)"
+            )
+        if tool_calls:
+            print(
+                f"   Redundant tool calls: {redundant_calls} of {tool_calls} "
+                f"({redundant_calls / tool_calls * 100:.1f}%"
+                f"{', answered from the tool memo' if config.TOOL_MEMO else ''})"
+            )
+        if blocking_runs:
+            print(
+                f"   Event loop blocked: {blocked_time:.1f}s by {len(blocking_runs)} runs "
+                f"(longest step {max(r.longest_loop_step for r in blocking_runs):.2f}s)"
+            )
+        if queued_runs or abandoned_threads:
+            print(
+                f"   Sync-agent threads: {queue_time:.1f}s queued by {len(queued_runs)} runs "
+                f"(not in execution times), {abandoned_threads} abandoned by cancelled attempts"
+            )
+        if fanout_runs:
+            print(
+                f"   Shared first turns: {fanout_runs} runs "
+                f"({fanout_tokens} prefill tokens and {fanout_time:.1f}s of requests saved)"
+            )
         
         # Group by puzzle and framework
         puzzle_stats: Dict[str, Dict[str, list]] = {}
@@ -308,7 +682,7 @@ class EvaluationRunner:
             
             for framework_name, statuses in frameworks.items():
                 passes = statuses.count("Pass")
-                fails = statuses.count("Fail")
+                fails = statuses.count("Fail") + statuses.count("Timeout")
                 testable_runs = passes + fails
                 rate = (passes / testable_runs * 100) if testable_runs > 0 else 0
 
@@ -319,6 +693,8 @@ class EvaluationRunner:
                         status_display.append("✅")
                     elif status == "Fail":
                         status_display.append("❌")
+                    elif status == "Timeout":
+                        status_display.append("⏱️")
                     elif status == "Not Available":
                         status_display.append("⚪")
                     else:
@@ -329,17 +705,117 @@ class EvaluationRunner:
                 print(f"   {framework_name:20} [{status_str}] ({rate_str})")
 
 
+def _context_policy(spec: str) -> str:
+    """Validate a --context-policy value up front rather than failing every run."""
+    try:
+        parse_context_policy(spec)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+    return spec
+
+
+def _tool_latency(spec: str) -> str:
+    """Validate a --tool-latency value up front rather than failing every run."""
+    try:
+        parse_tool_latency(spec)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+    return spec
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="Run AgentGym evaluations.")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Shard the evaluation matrix across N worker processes (default: 1, run in-process)",
+    )
+    parser.add_argument(
+        "--adaptive",
+        action="store_true",
+        help="Stop sampling a cell once its pass-rate confidence interval is narrow enough "
+             "(between MIN_RUNS and MAX_RUNS runs, see config.py)",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help=f"Skip evaluations already recorded in the result journal ({config.JOURNAL_PATH})",
+    )
+    parser.add_argument(
+        "--cache-mode",
+        choices=CACHE_MODES,
+        help=f"How cached model calls are served (default: CACHE_MODE in config.py, {config.CACHE_MODE})",
+    )
+    parser.add_argument(
+        "--cassettes",
+        choices=("record", "replay"),
+        help=f"Record all model traffic to cassettes in {config.CASSETTE_DIR}/, "
+             "or replay runs offline from them",
+    )
+    parser.add_argument(
+        "--no-prompt-caching",
+        action="store_true",
+        help="Don't ask providers to cache prompt prefixes (to measure what caching saves)",
+    )
+    parser.add_argument(
+        "--context-policy",
+        type=_context_policy,
+        help="How agent loops compact their history: full, last_turns:K, collapse_state or drop_superseded "
+             f"(default: CONTEXT_POLICY in config.py, {config.CONTEXT_POLICY})",
+    )
+    parser.add_argument(
+        "--tool-latency",
+        type=_tool_latency,
+        help="Simulated latency of puzzle tools: nominal, zero, fixed:S or lognormal:P50,P99 (seconds) "
+             f"(default: TOOL_LATENCY in config.py, {config.TOOL_LATENCY})",
+    )
+    parser.add_argument(
+        "--no-tool-memo",
+        action="store_true",
+        help="Run every read-only tool call instead of answering repeats from the session's memo "
+             "(redundant calls are still counted)",
+    )
+    parser.add_argument(
+        "--fanout",
+        action="store_true",
+        help="Serve the first turn of a cell's runs from one request with n choices "
+             "(OpenAI-compatible endpoints that support n)",
+    )
+    return parser.parse_args(argv)
+
+
 async def main():
     """Main entry point for evaluation runner."""
     
+    args = parse_args()
+    if args.adaptive:
+        config.ADAPTIVE_RUNS = True
+    if args.cache_mode:
+        config.CACHE_MODE = args.cache_mode
+    if args.cassettes:
+        config.CASSETTE_MODE = args.cassettes
+    if args.fanout:
+        config.FANOUT_FIRST_TURN = True
+    if args.tool_latency:
+        config.TOOL_LATENCY = args.tool_latency
+    if args.no_tool_memo:
+        config.TOOL_MEMO = False
+    if args.context_policy:
+        config.CONTEXT_POLICY = args.context_policy
+    if args.no_prompt_caching:
+        config.PROMPT_CACHING = False
+    
     # Initialize Logfire monitoring
     setup_logfire()
+    log_import_report("Startup imports")
     
-    runner = EvaluationRunner()
+    runner = EvaluationRunner(journal=ResultJournal(Path(config.JOURNAL_PATH)))
     
     try:
         with logfire.span("agentgym_evaluation"):
-            summary = await runner.run_all_evaluations()
+            summary = await runner.run_all_evaluations(workers=args.workers, resume=args.resume)
             
             # Print results to console
             runner.print_summary(summary)
@@ -351,14 +827,19 @@ async def main():
             logger.info("🎉 Evaluation complete!")
             logger.info(f"📄 Reports saved to: {reports_dir.absolute()}")
             
-    except KeyboardInterrupt:
-        logger.info("⚠️  Evaluation interrupted by user")
-        logfire.warning("Evaluation interrupted by user")
     except Exception as e:
         logger.error(f"💥 Evaluation failed: {e}")
         logfire.error("Evaluation failed with exception", error=str(e))
         raise
+    finally:
+        await close_http_clients()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        # asyncio.run cancels main() on Ctrl-C and raises KeyboardInterrupt here, not inside it
+        logger.info("⚠️  Evaluation interrupted by user")
+        logger.info(f"💾 Completed results are kept in {config.JOURNAL_PATH}; re-run with --resume to continue")
+        logfire.warning("Evaluation interrupted by user")